@@ -0,0 +1,99 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_agent.agent_components import AgentRun, AgentInit, AgentMakeToolbelt, AgentNumpyMemory, AgentDefineTool, AgentToolOutput
+from xai_components.xai_converse.converse_components import ConverseDefineAgent, ConverseEmitResponse, ConverseRun, ConverseMakeServer
+from xai_components.xai_openai.openai_components import OpenAIAuthorize
+from xai_components.xai_utils.utils import Print, DictGetItem, GetCurrentTime
+
+@xai_component(type='xircuits_workflow')
+class AgentTemplate(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = ConverseDefineAgent()
+        self.c_0.__id__ = '72f82eb9-cd83-411b-8c67-37b1acd73b63'
+        self.c_1 = AgentRun()
+        self.c_1.__id__ = 'd24f8b95-46d9-4dc7-9390-3f7e0c2a687c'
+        self.c_2 = ConverseEmitResponse()
+        self.c_2.__id__ = 'e43c7caa-26de-4543-9bfc-0c15f5449612'
+        self.c_3 = Print()
+        self.c_3.__id__ = 'b4361e28-d561-4d7a-bcf7-2bae79ec332f'
+        self.c_4 = AgentInit()
+        self.c_4.__id__ = '601b9bd0-7937-4b15-97f4-a1520c6274b6'
+        self.c_5 = ConverseRun()
+        self.c_5.__id__ = 'd23d0fe4-5b24-423c-9e86-b7f0524bf700'
+        self.c_6 = AgentMakeToolbelt()
+        self.c_6.__id__ = '363608ce-4ae1-40e7-a24b-bebd31c480e5'
+        self.c_7 = AgentNumpyMemory()
+        self.c_7.__id__ = '814a8084-69f0-4cab-bcaa-b2b60dd8419c'
+        self.c_8 = ConverseMakeServer()
+        self.c_8.__id__ = '9c595812-f7f4-41fa-a623-79625fa890f4'
+        self.c_9 = OpenAIAuthorize()
+        self.c_9.__id__ = 'a201a404-bd23-487f-8f92-422b9de01cdb'
+        self.c_10 = AgentDefineTool()
+        self.c_10.__id__ = '972bf2ed-5217-4b6d-9051-860a6c1e847e'
+        self.c_11 = DictGetItem()
+        self.c_11.__id__ = 'd66bfb60-2910-4739-87b5-ea450c983f08'
+        self.c_12 = GetCurrentTime()
+        self.c_12.__id__ = 'ca1fce1d-0c76-44c2-b5d8-a1c6f15f53c2'
+        self.c_13 = AgentToolOutput()
+        self.c_13.__id__ = 'b3bbdf9a-bdfe-453f-91f8-80bfeb039bd5'
+        self.c_0.name.value = 'default'
+        self.c_1.agent_name.value = 'default_agent'
+        self.c_1.conversation.connect(self.c_0.conversation)
+        self.c_2.value.connect(self.c_1.last_response)
+        self.c_3.msg.connect(self.c_1.last_response)
+        self.c_4.agent_name.value = 'default_agent'
+        self.c_4.agent_provider.value = 'openai'
+        self.c_4.agent_model.value = 'gpt-4o'
+        self.c_4.agent_memory.connect(self.c_7.memory)
+        self.c_4.system_prompt.value = 'You are a simple assistant, with access to tools to help your user.\n\n{tool_instruction}\n\nYou have access to the following tools: \n\n{memory}\n{tools}\n'
+        self.c_4.max_thoughts.value = 10
+        self.c_4.toolbelt_spec.connect(self.c_6.toolbelt_spec)
+        self.c_8.auth_token.value = 'opensesame'
+        self.c_8.max_timeout.value = 90
+        self.c_9.from_env.value = True
+        self.c_10.tool_name.value = 'get_current_time'
+        self.c_10.description.value = 'Gets the current time in ISO format in the Japan time zone where the user current lives.\n\nExample:\n\nUSER:\nWhat time is it in Tokyo right now?\n\nASSISTANT:\n<tool name="get_current_time">\n{"time_zone": "Asia/Tokyo"}\n</tool>\n\nSYSTEM:\n2024-12-12T16:25:44.687245\n\nASSISTANT:\nIt is currently 4:25PM December 12th, 2024.'
+        self.c_11.the_dict.connect(self.c_10.tool_args)
+        self.c_11.key.value = 'time_zone'
+        self.c_12.time_zone.connect(self.c_11.out_item)
+        self.c_13.results[0].connect(self.c_12.time_str)
+        self.c_0.next = self.c_1
+        self.c_1.next = self.c_2
+        self.c_1.on_thought = SubGraphExecutor(self.c_3)
+        self.c_2.next = None
+        self.c_3.next = None
+        self.c_4.next = self.c_5
+        self.c_5.next = None
+        self.c_6.next = self.c_7
+        self.c_7.next = self.c_4
+        self.c_8.next = self.c_6
+        self.c_9.next = self.c_8
+        self.c_10.next = self.c_11
+        self.c_11.next = self.c_12
+        self.c_12.next = self.c_13
+        self.c_13.next = None
+        self.__start_nodes__.append(self.c_10)
+        self.__start_nodes__.append(self.c_0)
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_9).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = AgentTemplate()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,33 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_template.example_components import CompulsoryHyperparameter
+
+@xai_component(type='xircuits_workflow')
+class CompulsoryPorts(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = CompulsoryHyperparameter()
+        self.c_0.__id__ = 'f82fe8e8-3fce-4ae4-8331-972cf1bb88b6'
+        self.c_0.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = CompulsoryPorts()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
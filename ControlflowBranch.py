@@ -0,0 +1,63 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_controlflow.branches import BranchComponent
+from xai_components.xai_utils.utils import Print
+
+@xai_component(type='xircuits_workflow')
+class ControlflowBranch(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = BranchComponent()
+        self.c_0.__id__ = '1bd27d94-d445-4a5e-bff8-1753b5e1da67'
+        self.c_1 = Print()
+        self.c_1.__id__ = 'def3df99-5d73-4ff4-b612-7ebbccb247f7'
+        self.c_2 = Print()
+        self.c_2.__id__ = 'd6c7f861-c2f0-41a0-99bc-b133da7306a3'
+        self.c_3 = BranchComponent()
+        self.c_3.__id__ = 'ea6b1ce4-ebfc-49c6-8a86-700ef6580e7e'
+        self.c_4 = Print()
+        self.c_4.__id__ = '47a2c21e-336f-41b2-8f2d-4764cf983ee3'
+        self.c_5 = Print()
+        self.c_5.__id__ = 'b533d1d2-0f2d-4e0f-99f9-5f6b6672e21a'
+        self.c_6 = Print()
+        self.c_6.__id__ = 'abc63198-4531-49b4-8f5d-fd692dd6a024'
+        self.c_0.condition.value = True
+        self.c_1.msg.value = 'This will be printed if the first branch is false!'
+        self.c_2.msg.value = 'You can chain multiple branches together!'
+        self.c_3.condition.value = True
+        self.c_4.msg.value = 'The 2nd branch is False!'
+        self.c_5.msg.value = 'The 2nd branch is True!'
+        self.c_6.msg.value = 'Finally, this will be executed once the final branch flow is complete!'
+        self.c_0.next = self.c_6
+        self.c_0.when_true = SubGraphExecutor(self.c_2)
+        self.c_0.when_false = SubGraphExecutor(self.c_1)
+        self.c_1.next = None
+        self.c_2.next = self.c_3
+        self.c_3.when_true = SubGraphExecutor(self.c_5)
+        self.c_3.when_false = SubGraphExecutor(self.c_4)
+        self.c_3.next = None
+        self.c_4.next = None
+        self.c_5.next = None
+        self.c_6.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = ControlflowBranch()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
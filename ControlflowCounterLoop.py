@@ -0,0 +1,61 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_controlflow.branches import DefineVariableComponent, LoopComponent, CounterComponent, ComparisonComponent, SetVariableComponent
+from xai_components.xai_utils.utils import Print
+
+@xai_component(type='xircuits_workflow')
+class ControlflowCounterLoop(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = DefineVariableComponent()
+        self.c_0.__id__ = 'aa379da2-68a4-45b3-b86a-56de90e59713'
+        self.c_1 = LoopComponent()
+        self.c_1.__id__ = 'e5a5c7fe-6b52-4207-ac8d-5838084dbf7d'
+        self.c_2 = CounterComponent()
+        self.c_2.__id__ = '929c2f08-f5a1-40dc-8fa2-744c433708b1'
+        self.c_3 = Print()
+        self.c_3.__id__ = '1eab7696-c68f-423b-b439-a6fa7c912a59'
+        self.c_4 = ComparisonComponent()
+        self.c_4.__id__ = '21554675-6486-4eec-8fa7-f57abb70d1ea'
+        self.c_5 = SetVariableComponent()
+        self.c_5.__id__ = 'af8237a9-0555-4f06-8e14-1779388c7e95'
+        self.c_0.name.value = 'is_running'
+        self.c_0.value.value = True
+        self.c_1.condition.connect(self.c_0.ref)
+        self.c_2.start_number.value = 5
+        self.c_2.step.value = -1
+        self.c_3.msg.connect(self.c_2.out_number)
+        self.c_4.a.connect(self.c_2.out_number)
+        self.c_4.b.value = 1
+        self.c_4.op.value = '>'
+        self.c_5.name.value = 'is_running'
+        self.c_5.value.connect(self.c_4.out)
+        self.c_0.next = self.c_1
+        self.c_1.next = None
+        self.c_1.body = SubGraphExecutor(self.c_2)
+        self.c_2.next = self.c_3
+        self.c_3.next = self.c_4
+        self.c_4.next = self.c_5
+        self.c_5.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = ControlflowCounterLoop()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,49 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_controlflow.branches import BranchComponent
+from xai_components.xai_utils.utils import Print
+
+@xai_component(type='xircuits_workflow')
+class ControlflowExample(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = BranchComponent()
+        self.c_0.__id__ = '81b23b24-1bf5-45d9-b955-c0f309a52d1f'
+        self.c_1 = Print()
+        self.c_1.__id__ = 'a78e6da4-5bc8-49f5-8d03-353678fb130e'
+        self.c_2 = Print()
+        self.c_2.__id__ = '9691f88e-a4d4-481e-b911-b20f8757bb58'
+        self.c_3 = Print()
+        self.c_3.__id__ = '4acc1826-cb0f-4ad0-b498-8211eeb8b86b'
+        self.c_0.condition.value = True
+        self.c_1.msg.value = 'This will be printed if the condition is false!'
+        self.c_2.msg.value = 'This will be printed if the condition is true!'
+        self.c_3.msg.value = 'This will always be executed at the end of the branch!'
+        self.c_0.next = self.c_3
+        self.c_0.when_true = SubGraphExecutor(self.c_2)
+        self.c_0.when_false = SubGraphExecutor(self.c_1)
+        self.c_1.next = None
+        self.c_2.next = None
+        self.c_3.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = ControlflowExample()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
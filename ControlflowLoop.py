@@ -0,0 +1,48 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_controlflow.branches import LoopComponent
+from xai_components.xai_utils.utils import Print, SleepComponent
+
+@xai_component(type='xircuits_workflow')
+class ControlflowLoop(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = Print()
+        self.c_0.__id__ = 'b497a6d7-3117-409e-a5d2-cf71c8dc69d8'
+        self.c_1 = LoopComponent()
+        self.c_1.__id__ = '1d9df774-6b7b-47bb-a0bd-67385c4d6725'
+        self.c_2 = Print()
+        self.c_2.__id__ = '0ecc4ac6-49d8-45cc-a0a5-3a326f7c771c'
+        self.c_3 = SleepComponent()
+        self.c_3.__id__ = '948a4659-dcec-42e6-8a85-c4cfb306971f'
+        self.c_0.msg.value = 'Dormammu '
+        self.c_1.condition.value = True
+        self.c_2.msg.value = "I've come to bargain!"
+        self.c_3.sleep_timer.value = 1
+        self.c_0.next = self.c_1
+        self.c_1.next = None
+        self.c_1.body = SubGraphExecutor(self.c_2)
+        self.c_2.next = self.c_3
+        self.c_3.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = ControlflowLoop()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,53 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_utils.utils import MakeList, Print, MakeDict
+
+@xai_component(type='xircuits_workflow')
+class DynamicPorts(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = MakeList()
+        self.c_0.__id__ = '83fe3db6-c9f0-44a8-a9c1-7a3f1783d42c'
+        self.c_1 = Print()
+        self.c_1.__id__ = 'af8ba09a-50a0-49b0-bf6c-abfc4ddc2d04'
+        self.c_2 = MakeDict()
+        self.c_2.__id__ = 'e8a87548-2370-4679-8a7e-d1bfdacebf60'
+        self.c_3 = Print()
+        self.c_3.__id__ = '5fe7aea6-3def-497b-9eb1-d8e68c9128b1'
+        self.c_0.list_values[0] = 'apple'
+        self.c_0.list_values[1] = 'pear'
+        self.c_0.list_values[2] = 'banana'
+        self.c_1.msg.connect(self.c_0.output_list)
+        self.c_2.keys_list[0] = 'apple'
+        self.c_2.keys_list[1] = 'pear'
+        self.c_2.keys_list[2] = 'banana'
+        self.c_2.values_list[0] = 3
+        self.c_2.values_list[1] = 1
+        self.c_2.values_list[2] = 5
+        self.c_3.msg.connect(self.c_2.output_dict)
+        self.c_0.next = self.c_1
+        self.c_1.next = self.c_2
+        self.c_2.next = self.c_3
+        self.c_3.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = DynamicPorts()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,45 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_events.event_components import OnEvent, FireEvent
+from xai_components.xai_utils.utils import Print
+
+@xai_component(type='xircuits_workflow')
+class Events(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = OnEvent()
+        self.c_0.__id__ = '38330410-9b93-4e2a-a20a-3f48201c11c3'
+        self.c_1 = Print()
+        self.c_1.__id__ = '4e94abbe-9fb4-4517-b0ad-9110960892a3'
+        self.c_2 = FireEvent()
+        self.c_2.__id__ = '777c7ae0-20d7-44e6-a2d1-a5edc254008a'
+        self.c_0.eventName.value = 'FooBar'
+        self.c_1.msg.connect(self.c_0.payload)
+        self.c_2.eventName.value = 'FooBar'
+        self.c_2.payload.value = {'a': 'apple', 'b': 'banana', 'c': 2022}
+        self.c_0.next = self.c_1
+        self.c_1.next = None
+        self.c_2.next = None
+        self.__start_nodes__.append(self.c_0)
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_2).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = Events()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,73 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_controlflow.branches import ExceptionHandler, LoopComponent, CounterComponent, SetVariableComponent, EvaluateExpressionWithVariables
+from xai_components.xai_utils.utils import ConcatString, Print
+
+@xai_component(type='xircuits_workflow')
+class ExceptionHandlerExample(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = ExceptionHandler()
+        self.c_0.__id__ = 'ee43c69a-2b84-46a3-b765-a29555d7f222'
+        self.c_1 = ConcatString()
+        self.c_1.__id__ = 'becd7f0d-ca18-43b7-b406-579f4f4a2598'
+        self.c_2 = Print()
+        self.c_2.__id__ = '43f9d65e-45ed-4886-a29f-1fa93dccb19c'
+        self.c_3 = LoopComponent()
+        self.c_3.__id__ = '0d15dd46-015c-46b4-86a8-5c51d1d1bc92'
+        self.c_4 = CounterComponent()
+        self.c_4.__id__ = 'bae481a8-ee07-4901-985f-bc89cbef1566'
+        self.c_5 = SetVariableComponent()
+        self.c_5.__id__ = 'e23f586f-1ccc-49ff-9a3e-4f31f6a00419'
+        self.c_6 = EvaluateExpressionWithVariables()
+        self.c_6.__id__ = '64553227-fb69-4002-93a5-6cb3e8f1f5fe'
+        self.c_7 = Print()
+        self.c_7.__id__ = 'a2f54566-62a8-47f9-8fb3-5444b12e5a3c'
+        self.c_8 = Print()
+        self.c_8.__id__ = '6be33308-07b2-4e9c-8e77-02e2d67a35e4'
+        self.c_1.a.value = 'The exception occurred:\n'
+        self.c_1.b.connect(self.c_0.exception)
+        self.c_2.msg.connect(self.c_1.out)
+        self.c_3.condition.value = True
+        self.c_4.start_number.value = 5
+        self.c_4.step.value = -1
+        self.c_5.name.value = 'x'
+        self.c_5.value.connect(self.c_4.out_number)
+        self.c_6.expression.value = '{y} / {x}'
+        self.c_6.values_dict.value = {'y': 5}
+        self.c_7.msg.connect(self.c_6.result)
+        self.c_8.msg.value = 'Done!'
+        self.c_0.next = self.c_8
+        self.c_0.body = SubGraphExecutor(self.c_3)
+        self.c_0.handler = SubGraphExecutor(self.c_1)
+        self.c_1.next = self.c_2
+        self.c_2.next = None
+        self.c_3.body = SubGraphExecutor(self.c_4)
+        self.c_3.next = None
+        self.c_4.next = self.c_5
+        self.c_5.next = self.c_6
+        self.c_6.next = self.c_7
+        self.c_7.next = None
+        self.c_8.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = ExceptionHandlerExample()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,39 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_utils.utils import ConcatString, Print
+
+@xai_component(type='xircuits_workflow')
+class HelloXircuits(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = ConcatString()
+        self.c_0.__id__ = '16949768-609b-4f49-9637-1362acd39ebe'
+        self.c_1 = Print()
+        self.c_1.__id__ = 'c67603e4-dfda-4c58-b6ab-0952eba75254'
+        self.c_0.a.value = 'Hello '
+        self.c_0.b.value = 'Xircuits!'
+        self.c_1.msg.connect(self.c_0.out)
+        self.c_0.next = self.c_1
+        self.c_1.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = HelloXircuits()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,63 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_controlflow.branches import ForEach
+from xai_components.xai_utils.utils import ConcatString, PrettyPrint, RunParallelProcess, SleepComponent, AwaitFutures
+
+@xai_component(type='xircuits_workflow')
+class ParallelProcesses(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = ForEach()
+        self.c_0.__id__ = 'cba1e57f-12ce-43d8-97de-a85488974261'
+        self.c_1 = ConcatString()
+        self.c_1.__id__ = 'd235034d-43c0-4514-9126-062c95b8a770'
+        self.c_2 = PrettyPrint()
+        self.c_2.__id__ = 'c03fddf1-788a-4483-b14c-94d5d7e3b790'
+        self.c_3 = ForEach()
+        self.c_3.__id__ = 'cbba1c24-254d-46a5-b977-2b43e593fdea'
+        self.c_4 = RunParallelProcess()
+        self.c_4.__id__ = '16e46549-f371-465d-a66a-c520498f3d2a'
+        self.c_5 = SleepComponent()
+        self.c_5.__id__ = '9fa51310-ccda-41c8-b91c-b827502a0f25'
+        self.c_6 = AwaitFutures()
+        self.c_6.__id__ = '3af44e62-b3dd-452a-a369-f080d0b06c56'
+        self.c_0.items.value = ['Hello, ', 'Hola, ', 'Hallo, ']
+        self.c_1.a.connect(self.c_0.current_item)
+        self.c_1.b.connect(self.c_3.current_item)
+        self.c_2.msg.connect(self.c_1.out)
+        self.c_3.items.value = ['Eduardo', 'Fahreza', 'Paul', 'Mansour']
+        self.c_4.n_workers.value = 12
+        self.c_5.sleep_timer.value = 30
+        self.c_6.futures.connect(self.c_4.futures)
+        self.c_0.next = self.c_6
+        self.c_0.body = SubGraphExecutor(self.c_3)
+        self.c_1.next = self.c_2
+        self.c_2.next = None
+        self.c_3.body = SubGraphExecutor(self.c_4)
+        self.c_3.next = None
+        self.c_4.body = SubGraphExecutor(self.c_5)
+        self.c_4.next = None
+        self.c_5.next = self.c_1
+        self.c_6.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = ParallelProcesses()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
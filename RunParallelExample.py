@@ -0,0 +1,62 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_controlflow.branches import ForEach
+from xai_components.xai_utils.utils import Print, RunParallelThread, SleepComponent, GetRandomNumber, AwaitFutures
+
+@xai_component(type='xircuits_workflow')
+class RunParallelExample(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = ForEach()
+        self.c_0.__id__ = 'ed518145-cc6d-473d-bd20-2f2da5067bf4'
+        self.c_1 = Print()
+        self.c_1.__id__ = '2be07ce5-c504-4a8e-9acf-098cf192effc'
+        self.c_2 = RunParallelThread()
+        self.c_2.__id__ = '2019284b-aaec-4c00-a472-6d42028e06d5'
+        self.c_3 = SleepComponent()
+        self.c_3.__id__ = 'ccf2477e-3e94-4dab-83e0-74f25d990358'
+        self.c_4 = GetRandomNumber()
+        self.c_4.__id__ = '65e0eecf-5fe2-464c-85f4-d09bdd5ac810'
+        self.c_5 = RunParallelThread()
+        self.c_5.__id__ = '0fbe5ef3-82ff-4f21-9dbd-f87467a1e605'
+        self.c_6 = AwaitFutures()
+        self.c_6.__id__ = '2636c8f8-d8a5-4c5a-ab96-94af8c4ee686'
+        self.c_0.items.value = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+        self.c_1.msg.connect(self.c_0.current_item)
+        self.c_3.sleep_timer.connect(self.c_4.value)
+        self.c_4.greater_than.value = 1
+        self.c_4.less_than.value = 2
+        self.c_5.n_workers.value = 3
+        self.c_6.futures.connect(self.c_5.futures)
+        self.c_0.next = self.c_6
+        self.c_0.body = SubGraphExecutor(self.c_5)
+        self.c_1.next = None
+        self.c_2.body = SubGraphExecutor(self.c_1)
+        self.c_2.next = None
+        self.c_3.next = self.c_2
+        self.c_4.next = self.c_3
+        self.c_5.body = SubGraphExecutor(self.c_4)
+        self.c_5.next = None
+        self.c_6.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = RunParallelExample()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,81 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_flask.flask_components import FlaskDefinePostRoute, FlaskGetRequestJson, FlaskReturnJSONResponse, FlaskDefineGetRoute, FlaskReturnStringResponse, FlaskCreateApp, FlaskStartServer
+from xai_components.xai_utils.utils import PrettyPrint, GetDictValue, ConcatString
+
+@xai_component(type='xircuits_workflow')
+class ServiceTemplate(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = FlaskDefinePostRoute()
+        self.c_0.__id__ = 'a8ce717e-a15b-4b13-92e0-a570abd6eae0'
+        self.c_1 = PrettyPrint()
+        self.c_1.__id__ = 'ba49a330-43dc-4566-9298-5c79862da327'
+        self.c_2 = FlaskGetRequestJson()
+        self.c_2.__id__ = '97583624-4c0f-4b0c-b2f4-5265c70e5f4f'
+        self.c_3 = FlaskReturnJSONResponse()
+        self.c_3.__id__ = '2e497024-67ed-42b2-8634-7e9ee574fdfa'
+        self.c_4 = PrettyPrint()
+        self.c_4.__id__ = 'd8603cb8-6e1f-47ee-87db-9283eef0d157'
+        self.c_5 = FlaskDefineGetRoute()
+        self.c_5.__id__ = '3f819a13-6722-4eb7-87cf-69dbd15d3533'
+        self.c_6 = GetDictValue()
+        self.c_6.__id__ = '5da48ec0-1a49-458a-b25e-16e654168f91'
+        self.c_7 = ConcatString()
+        self.c_7.__id__ = '3dce0d71-6d3a-4cf7-846a-22e29afd4df1'
+        self.c_8 = FlaskReturnStringResponse()
+        self.c_8.__id__ = '63ad0784-a739-4ffb-acca-7668f2abe8d0'
+        self.c_9 = PrettyPrint()
+        self.c_9.__id__ = '1721725d-e8b0-48cc-8330-d0b6994e8b63'
+        self.c_10 = FlaskCreateApp()
+        self.c_10.__id__ = 'b366e373-2a86-425f-8490-7b10c3637a7c'
+        self.c_11 = FlaskStartServer()
+        self.c_11.__id__ = '8e350f06-1cf1-435e-84a2-7cd0cc4c3532'
+        self.c_0.route.value = '/body-example'
+        self.c_1.msg.connect(self.c_0.parameters)
+        self.c_3.response.connect(self.c_2.value)
+        self.c_4.msg.connect(self.c_2.value)
+        self.c_5.route.value = '/hello/<name>'
+        self.c_6.obj.connect(self.c_5.parameters)
+        self.c_6.name.value = 'name'
+        self.c_7.a.value = 'Hello '
+        self.c_7.b.connect(self.c_6.value)
+        self.c_8.response.connect(self.c_7.out)
+        self.c_9.msg.connect(self.c_5.parameters)
+        self.c_10.name.value = 'Example'
+        self.c_0.next = self.c_1
+        self.c_1.next = self.c_2
+        self.c_2.next = self.c_4
+        self.c_3.next = None
+        self.c_4.next = self.c_3
+        self.c_5.next = self.c_9
+        self.c_6.next = self.c_7
+        self.c_7.next = self.c_8
+        self.c_8.next = None
+        self.c_9.next = self.c_6
+        self.c_10.next = self.c_11
+        self.c_11.next = None
+        self.__start_nodes__.append(self.c_5)
+        self.__start_nodes__.append(self.c_0)
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_10).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = ServiceTemplate()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
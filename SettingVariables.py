@@ -0,0 +1,53 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_controlflow.branches import DefineVariableComponent, SetVariableComponent, GetVariableComponent
+from xai_components.xai_utils.utils import Print
+
+@xai_component(type='xircuits_workflow')
+class SettingVariables(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = DefineVariableComponent()
+        self.c_0.__id__ = '7c1e9493-62da-4753-b168-02c9c3aa30dd'
+        self.c_1 = Print()
+        self.c_1.__id__ = '7ee71ea7-9443-4eec-b123-1e86692a101f'
+        self.c_2 = SetVariableComponent()
+        self.c_2.__id__ = '81758a2e-387a-4fdf-88ee-e8642380ac88'
+        self.c_3 = GetVariableComponent()
+        self.c_3.__id__ = 'b156dd2d-26c3-4adc-8240-de94918e2e6a'
+        self.c_4 = Print()
+        self.c_4.__id__ = '13f894e2-5100-4ee5-a61d-32c2f84ad3e6'
+        self.c_0.name.value = 'foo'
+        self.c_0.value.value = 123
+        self.c_1.msg.connect(self.c_0.ref)
+        self.c_2.name.value = 'foo'
+        self.c_2.value.value = 'bar'
+        self.c_3.name.value = 'foo'
+        self.c_4.msg.connect(self.c_3.value)
+        self.c_0.next = self.c_1
+        self.c_1.next = self.c_2
+        self.c_2.next = self.c_3
+        self.c_3.next = self.c_4
+        self.c_4.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = SettingVariables()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
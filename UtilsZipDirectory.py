@@ -0,0 +1,40 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_utils.utils import ZipDirectory
+
+@xai_component(type='xircuits_workflow')
+class UtilsZipDirectory(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = ZipDirectory()
+        self.c_0.__id__ = '143f7c95-2cda-4aa8-8f14-0dc5f335a53a'
+        self.c_1 = ZipDirectory()
+        self.c_1.__id__ = 'fb45817f-c2bf-423c-bc9e-a8b1b1ff7b28'
+        self.c_0.dir_name.value = 'xai_components'
+        self.c_0.include_dir.value = False
+        self.c_1.dir_name.value = 'examples'
+        self.c_1.include_dir.value = False
+        self.c_0.next = self.c_1
+        self.c_1.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = UtilsZipDirectory()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,46 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_utils.utils import ConcatString, Print
+
+@xai_component(type='xircuits_workflow')
+class WorkflowComponentsExample(Component):
+    example_input: InArg[str]
+    output: OutArg[str]
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = ConcatString()
+        self.c_0.__id__ = 'f7110306-6036-4cdc-aad9-f59a5c0c69dc'
+        self.c_1 = Print()
+        self.c_1.__id__ = 'c4f2098f-e161-4ecf-a4f8-06504eaed9d1'
+        self.c_0.b.connect(self.example_input)
+        self.c_0.a.value = 'This component echo the input string: \n'
+        self.c_1.msg.connect(self.c_0.out)
+        self.output.connect(self.c_0.out)
+        self.c_0.next = self.c_1
+        self.c_1.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = WorkflowComponentsExample()
+    flow.next = None
+    flow.example_input.value = args.example_input
+    flow.do(ctx)
+    print('output:')
+    pprint.pprint(flow.output.value)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('--example_input', type=str)
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -0,0 +1,38 @@
+from argparse import ArgumentParser
+from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.xai_template.example_components import HelloContext
+
+@xai_component(type='xircuits_workflow')
+class XircuitsContext(Component):
+
+    def __init__(self, id: str=None):
+        super().__init__()
+        self.__id__ = id
+        self.__start_nodes__ = []
+        self.c_0 = HelloContext()
+        self.c_0.__id__ = 'e59804a3-fe17-49af-9e8d-2867ef0725fb'
+        self.c_1 = HelloContext()
+        self.c_1.__id__ = '2d5d3c9f-9508-4fec-962f-783d8b122e64'
+        self.c_0.context_dict.value = {'foo': 'bar'}
+        self.c_1.context_dict.value = {'baz': 123}
+        self.c_0.next = self.c_1
+        self.c_1.next = None
+
+    def execute(self, ctx):
+        for node in self.__start_nodes__:
+            if hasattr(node, 'init'):
+                node.init(ctx)
+        SubGraphExecutor(self.c_0).do(ctx)
+
+def main(args):
+    import pprint
+    ctx = {}
+    ctx['args'] = args
+    flow = XircuitsContext()
+    flow.next = None
+    flow.do(ctx)
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    args, _ = parser.parse_known_args()
+    main(args)
+    print('\nFinished Executing')
\ No newline at end of file
@@ -36,4 +36,57 @@ export async function requestAPI<T>(
   }
 
   return data;
-}
\ No newline at end of file
+}
+/**
+ * Listen to a server-sent events end point of the extension
+ *
+ * @param endPoint API end point streaming `text/event-stream`
+ * @param onEvent Called with the event name and its JSON decoded data
+ * @param signal Aborts the stream
+ * @returns Resolves when the stream ends
+ */
+export async function streamAPI(
+  endPoint: string,
+  onEvent: (event: string, data: any) => void,
+  signal?: AbortSignal
+): Promise<void> {
+  const settings = ServerConnection.makeSettings();
+  const requestUrl = URLExt.join(settings.baseUrl, 'xircuits', endPoint);
+
+  const response = await ServerConnection.makeRequest(requestUrl, { signal }, settings);
+  if (!response.ok || !response.body) {
+    throw new ServerConnection.ResponseError(response);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) {
+      return;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line, comment lines start with ':'
+    let separator: number;
+    while ((separator = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, separator);
+      buffer = buffer.slice(separator + 2);
+
+      let event = 'message';
+      const data = [];
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event:')) {
+          event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+          data.push(line.slice(5).trimStart());
+        }
+      }
+      if (data.length > 0) {
+        onEvent(event, JSON.parse(data.join('\n')));
+      }
+    }
+  }
+}
@@ -1,5 +1,5 @@
 import { Notification } from '@jupyterlab/apputils';
-import { requestAPI } from "../server/handler";
+import { requestAPI, streamAPI } from "../server/handler";
 
 let componentsCache = {
   data: null
@@ -36,3 +36,73 @@ export async function ComponentList() {
 export async function refreshComponentListCache() {
   componentsCache.data = await fetchComponents();
 }
+
+/**
+ * Apply the changed component files pushed by the server to the cached list.
+ */
+function applyComponentChanges(changes) {
+  if (!componentsCache.data) {
+    return;
+  }
+  const key = (header: string, task: string) => `${header}\n${task}`;
+
+  const removed = new Set<string>();
+  changes.forEach(change => change.removed.forEach(([header, task]) => removed.add(key(header, task))));
+  const components = componentsCache.data.filter(c => !removed.has(key(c.header, c.task)));
+
+  for (const change of changes) {
+    // The server resolves the palette color of every changed component
+    for (const component of change.components) {
+      const index = components.findIndex(c => c.header === component.header && c.task === component.task);
+      if (index === -1) {
+        components.push(component);
+      } else {
+        components[index] = component;
+      }
+    }
+    if (change.error) {
+      const error_info = change.error;
+      Notification.error(`Error found in: ${error_info.full_path}\nLine:${error_info.line}\n${error_info.message}`, { autoClose: 6000 });
+    }
+  }
+  componentsCache.data = components;
+}
+
+/**
+ * Follow the server's component file watcher and keep the cached list up to date,
+ * instead of re-fetching the whole palette. `onChange` is called after every update.
+ * Returns a function that stops watching.
+ */
+export function watchComponentChanges(onChange: () => void): () => void {
+  const controller = new AbortController();
+  let retryDelay = 1000;
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        await streamAPI('components/events', (event, data) => {
+          retryDelay = 1000;
+          if (event === 'components') {
+            applyComponentChanges(data.changes);
+            onChange();
+          }
+        }, controller.signal);
+      } catch (error) {
+        if (controller.signal.aborted) {
+          return;
+        }
+        console.warn('Component change stream interrupted', error);
+      }
+      // Changes may have been missed while disconnected
+      await new Promise(resolve => setTimeout(resolve, retryDelay));
+      retryDelay = Math.min(retryDelay * 2, 60000);
+      if (!controller.signal.aborted) {
+        await refreshComponentListCache();
+        onChange();
+      }
+    }
+  };
+  connect();
+
+  return () => controller.abort();
+}
@@ -1,4 +1,4 @@
-import { ComponentList, refreshComponentListCache } from "./Component";
+import { ComponentList, refreshComponentListCache, watchComponentChanges } from "./Component";
 import React, { useEffect, useRef, useState } from "react";
 import ReactDOM from 'react-dom';
 import styled from "@emotion/styled";
@@ -184,11 +184,9 @@ export default function Sidebar(props: SidebarProps) {
 
     
     useEffect(() => {
-        const intervalId = setInterval(() => {
-            fetchComponentList();
-        }, 600000); // every 10 minutes should re-fetch the component list
-        return () => clearInterval(intervalId);
-    }, [category, componentList]);
+        // The server pushes changed component files, no need to re-fetch the whole list
+        return watchComponentChanges(() => fetchComponentList());
+    }, []);
 
     useEffect(() => {
         const intervalId = setInterval(async () => {
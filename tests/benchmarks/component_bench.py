@@ -0,0 +1,80 @@
+"""
+Measures how long it takes to instantiate and deep copy components, how much
+memory a component with its ports takes, and how long reading a value through
+a chain of connected ports takes.
+
+Run from the repository root:
+    python tests/benchmarks/component_bench.py
+"""
+import gc
+import time
+import tracemalloc
+from copy import deepcopy
+
+from xai_components.base import InArg, InCompArg, OutArg, Component, SubGraphExecutor, dynalist
+
+RUNS = 5
+INSTANCES = 20000
+COPIES = 2000
+READS = 1000000
+
+
+class WideComponent(Component):
+    a: InArg[str]
+    b: InArg[int]
+    c: InArg[float]
+    d: InArg[dynalist]
+    e: InCompArg[str]
+    f: InCompArg[dict]
+    out_a: OutArg[str]
+    out_b: OutArg[int]
+    out_c: OutArg[list]
+
+    def execute(self, ctx) -> None:
+        self.out_b.value = self.b.value
+
+
+def build_body(length):
+    components = [WideComponent() for _ in range(length)]
+    for previous, component in zip(components, components[1:]):
+        component.b.connect(previous.out_b)
+        previous.next = component
+    return SubGraphExecutor(components[0])
+
+
+def best_of(fn):
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Keep the cyclic GC out of the timings
+gc.disable()
+
+instantiate = best_of(lambda: [WideComponent() for _ in range(INSTANCES)])
+print(f"instantiate: {instantiate / INSTANCES * 1e6:.2f} us per component")
+
+body = build_body(10)
+copy = best_of(lambda: [deepcopy(body) for _ in range(COPIES)])
+print(f"deepcopy of a 10 component body: {copy / COPIES * 1e6:.1f} us")
+
+tracemalloc.start()
+before = tracemalloc.get_traced_memory()[0]
+components = [WideComponent() for _ in range(INSTANCES)]
+used = tracemalloc.get_traced_memory()[0] - before
+tracemalloc.stop()
+print(f"memory: {used / INSTANCES:.0f} bytes per component")
+
+source = OutArg(1)
+port = source
+for _ in range(4):
+    connected = InArg()
+    connected.connect(port)
+    port = connected
+read = best_of(lambda: [port.value for _ in range(READS)])
+print(f"read through 4 connected ports: {read / READS * 1e9:.0f} ns")
+
+gc.enable()
@@ -0,0 +1,38 @@
+"""
+Measures how long a chain of independent sleeping components takes to run
+when compiled with the dynamic and with the dataflow schedule.
+
+Run from the repository root:
+    XIRCUITS_DATAFLOW_WORKERS=8 python tests/benchmarks/dataflow_bench.py
+"""
+import contextlib
+import importlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from synthetic_workflows import write_sleep_workflow
+from xai_components.base import set_verbosity
+from xircuits.compiler import compile
+
+COMPONENTS = 16
+SECONDS = 0.1
+
+set_verbosity('quiet')
+with tempfile.TemporaryDirectory() as tmp_dir:
+    sys.path.insert(0, tmp_dir)
+    source = write_sleep_workflow(os.path.join(tmp_dir, "sleep.xircuits"), COMPONENTS, SECONDS)
+    for schedule in ('dynamic', 'dataflow'):
+        module_name = f"sleep_{schedule}"
+        compile(source, os.path.join(tmp_dir, module_name + ".py"), use_cache=False, schedule=schedule)
+        flow = getattr(importlib.import_module(module_name), module_name)()
+        flow.next = None
+
+        # SleepComponent announces every sleep
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            flow.do({})
+            elapsed = time.perf_counter() - start
+        print(f"{schedule}: {elapsed:.2f} s for {COMPONENTS} x {SECONDS} s")
@@ -0,0 +1,55 @@
+"""
+Measures CodeGenerator.generate on large synthetic canvases and checks that the
+number of ast.parse calls stays constant as the canvas grows.
+
+Run from the repository root:
+    python tests/benchmarks/generator_bench.py
+"""
+import ast
+import gc
+import io
+import json
+import os
+import tempfile
+import time
+
+from synthetic_workflows import build_chain_workflow
+from xircuits.compiler.generator import CodeGenerator
+from xircuits.compiler.parser import XircuitsFileParser
+
+SIZES = [250, 1000, 2000]
+RUNS = 3
+
+parse_calls = 0
+_ast_parse = ast.parse
+
+
+def counting_parse(*args, **kwargs):
+    global parse_calls
+    parse_calls += 1
+    return _ast_parse(*args, **kwargs)
+
+
+ast.parse = counting_parse
+
+calls_per_size = []
+print(f"{'components':>10} {'generate (ms)':>14} {'ast.parse calls':>16}")
+# As in parser_scaling_bench.py, keep the cyclic GC out of the timings
+gc.disable()
+with tempfile.TemporaryDirectory() as tmp_dir:
+    output_path = os.path.join(tmp_dir, "bench_workflow.py")
+    for size in SIZES:
+        source = json.dumps(build_chain_workflow(size))
+        best = float("inf")
+        for _ in range(RUNS):
+            graph = XircuitsFileParser().parse(io.StringIO(source))
+            parse_calls = 0
+            with open(output_path, "w", encoding="utf-8") as out_f:
+                start = time.perf_counter()
+                CodeGenerator(graph, {}).generate(out_f)
+                best = min(best, time.perf_counter() - start)
+        calls_per_size.append(parse_calls)
+        print(f"{size:>10} {best * 1000:>14.1f} {parse_calls:>16}")
+gc.enable()
+
+assert len(set(calls_per_size)) == 1, f"ast.parse calls grow with the canvas size: {calls_per_size}"
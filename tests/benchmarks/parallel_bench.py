@@ -0,0 +1,54 @@
+"""
+Measures how long RunParallelThread and RunParallelProcess take per task
+with a large context, for each copy strategy.
+
+Run from the repository root:
+    python tests/benchmarks/parallel_bench.py
+"""
+import time
+from concurrent.futures import wait
+
+from xai_components.base import InArg, Component, SubGraphExecutor, set_verbosity
+from xai_components.xai_utils.utils import RunParallelThread, RunParallelProcess, shutdown_process_pool
+
+TASKS = 20
+
+
+class Noop(Component):
+    x: InArg[int]
+
+    def execute(self, ctx) -> None:
+        pass
+
+
+def build(component_class, copy_strategy):
+    component = component_class()
+    component.n_workers.value = 2
+    component.copy_strategy.value = copy_strategy
+    body = Noop()
+    body.next = None
+    component.body = SubGraphExecutor(body)
+    component.next = None
+    return component
+
+
+if __name__ == '__main__':
+    set_verbosity('quiet')
+    ctx = {
+        'table': {i: str(i) * 5 for i in range(200000)},
+        'blob': bytes(20000000)
+    }
+    for component_class in (RunParallelThread, RunParallelProcess):
+        for copy_strategy in ('deepcopy', 'copy_on_write'):
+            component = build(component_class, copy_strategy)
+            # Warm up the workers
+            component.do(ctx)
+            wait(component.futures.value)
+
+            start = time.perf_counter()
+            for _ in range(TASKS):
+                component.do(ctx)
+            wait(component.futures.value)
+            elapsed = time.perf_counter() - start
+            print(f"{component_class.__name__} {copy_strategy}: {elapsed / TASKS * 1e3:.1f} ms per task")
+    shutdown_process_pool()
@@ -0,0 +1,48 @@
+"""
+Checks that XircuitsFileParser.parse grows linearly with the number of links.
+
+Run from the repository root:
+    python tests/benchmarks/parser_scaling_bench.py
+"""
+import gc
+import io
+import json
+import time
+
+from synthetic_workflows import build_chain_workflow
+from xircuits.compiler.parser import XircuitsFileParser
+
+SIZES = [250, 500, 1000, 2000, 4000]
+RUNS = 5
+# Time per link may drift a little with cache effects, but a quadratic parser
+# would grow ~16x between the smallest and the largest graph.
+MAX_PER_LINK_GROWTH = 2.0
+
+
+def time_parse(source):
+    # Like timeit, keep the cyclic GC out of the measurement: its full collections
+    # scale with the live heap and would hide the parser's own complexity.
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            XircuitsFileParser().parse(io.StringIO(source))
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+per_link = []
+print(f"{'components':>10} {'links':>8} {'parse (ms)':>11} {'us/link':>8}")
+for size in SIZES:
+    workflow = build_chain_workflow(size)
+    n_links = len([l for l in workflow["layers"] if l["type"] == "diagram-links"][0]["models"])
+    elapsed = time_parse(json.dumps(workflow))
+    per_link.append(elapsed / n_links)
+    print(f"{size:>10} {n_links:>8} {elapsed * 1000:>11.2f} {per_link[-1] * 1e6:>8.2f}")
+
+growth = per_link[-1] / per_link[0]
+print(f"Per-link time growth from {SIZES[0]} to {SIZES[-1]} components: {growth:.2f}x")
+assert growth < MAX_PER_LINK_GROWTH, f"Parse time is not linear in graph size ({growth:.2f}x per link)"
@@ -0,0 +1,41 @@
+"""
+Measures how long a long chain of components takes to run when compiled with
+the dynamic and with the static schedule.
+
+Run from the repository root:
+    python tests/benchmarks/schedule_bench.py
+"""
+import gc
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+from synthetic_workflows import write_chain_workflow
+from xai_components.base import set_verbosity
+from xircuits.compiler import compile
+
+COMPONENTS = 200
+RUNS = 2000
+
+set_verbosity('quiet')
+with tempfile.TemporaryDirectory() as tmp_dir:
+    sys.path.insert(0, tmp_dir)
+    source = write_chain_workflow(os.path.join(tmp_dir, "chain.xircuits"), COMPONENTS)
+    for schedule in ('dynamic', 'static'):
+        module_name = f"chain_{schedule}"
+        compile(source, os.path.join(tmp_dir, module_name + ".py"), use_cache=False, schedule=schedule)
+        flow = getattr(importlib.import_module(module_name), module_name)()
+        flow.next = None
+        flow.c_0.b.value = ""
+
+        # Keep the cyclic GC out of the timings
+        gc.disable()
+        best = float("inf")
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            flow.do({})
+            best = min(best, time.perf_counter() - start)
+        gc.enable()
+        print(f"{schedule}: {best / COMPONENTS * 1e9:.0f} ns per component")
@@ -0,0 +1,140 @@
+"""
+Builders for large synthetic .xircuits workflows used by the compiler benchmarks.
+"""
+import itertools
+import json
+
+_ids = itertools.count()
+
+
+def _new_id(prefix):
+    return f"{prefix}-{next(_ids)}"
+
+
+def _port(name, label, is_in, data_type=""):
+    return {
+        "id": _new_id("port"),
+        "name": name,
+        "label": label,
+        "varName": label,
+        "dataType": data_type,
+        "in": is_in,
+        "links": [],
+    }
+
+
+def _node(name, node_type, ports, path=None):
+    extras = {"type": node_type}
+    if path is not None:
+        extras["path"] = path
+    return {"id": _new_id("node"), "name": name, "extras": extras, "ports": ports}
+
+
+def _link(links, source, source_port, target, target_port, link_type):
+    link_id = _new_id("link")
+    links.append({
+        "id": link_id,
+        "type": link_type,
+        "source": source["id"],
+        "sourcePort": source_port["id"],
+        "target": target["id"],
+        "targetPort": target_port["id"],
+    })
+    source_port["links"].append(link_id)
+    target_port["links"].append(link_id)
+
+
+def _diagram(nodes, links):
+    return {
+        "id": _new_id("diagram"),
+        "layers": [
+            {"id": _new_id("layer"), "type": "diagram-links", "models": {l["id"]: l for l in links}},
+            {"id": _new_id("layer"), "type": "diagram-nodes", "models": {n["id"]: n for n in nodes}},
+        ],
+    }
+
+
+def build_chain_workflow(n_components):
+    """
+    A Start -> ConcatString x n -> Finish chain. Every component concatenates a
+    string literal onto the output of the previous component, so the workflow has
+    roughly three links and five ports per component.
+    """
+    nodes = []
+    links = []
+
+    def link(source, source_port, target, target_port, link_type):
+        _link(links, source, source_port, target, target_port, link_type)
+
+    start = _node("Start", "Start", [_port("out-0", "▶", False)])
+    finish = _node("Finish", "Finish", [_port("in-0", "▶", True)])
+    nodes.extend([start, finish])
+
+    previous, previous_flow, previous_out = start, start["ports"][0], None
+    for i in range(n_components):
+        component = _node("ConcatString", "debug", [
+            _port("in-0", "▶", True),
+            _port("parameter-string-a", "a", True, "string"),
+            _port("parameter-string-b", "b", True, "string"),
+            _port("out-0", "▶", False),
+            _port("parameter-out-string-out", "out", False),
+        ], path="xai_components/xai_utils/utils.py")
+        in_flow, a, b, out_flow, out = component["ports"]
+
+        literal = _node("Literal String", "string", [_port("out-0", f"item {i}", False)])
+        link(literal, literal["ports"][0], component, a, "parameter-link")
+        if previous_out is not None:
+            link(previous, previous_out, component, b, "parameter-link")
+        link(previous, previous_flow, component, in_flow, "triangle-link")
+
+        nodes.extend([component, literal])
+        previous, previous_flow, previous_out = component, out_flow, out
+
+    link(previous, previous_flow, finish, finish["ports"][0], "triangle-link")
+
+    return _diagram(nodes, links)
+
+
+def build_sleep_workflow(n_components, seconds):
+    """
+    A Start -> SleepComponent x n -> Finish chain. The components only share
+    the control flow, none of them reads the output of another.
+    """
+    nodes = []
+    links = []
+
+    start = _node("Start", "Start", [_port("out-0", "▶", False)])
+    finish = _node("Finish", "Finish", [_port("in-0", "▶", True)])
+    nodes.extend([start, finish])
+
+    previous, previous_flow = start, start["ports"][0]
+    for i in range(n_components):
+        component = _node("SleepComponent", "debug", [
+            _port("in-0", "▶", True),
+            _port("parameter-float-sleep_timer", "sleep_timer", True, "float"),
+            _port("out-0", "▶", False),
+        ], path="xai_components/xai_utils/utils.py")
+        in_flow, sleep_timer, out_flow = component["ports"]
+
+        literal = _node("Literal Float", "float", [_port("out-0", str(seconds), False)])
+        _link(links, literal, literal["ports"][0], component, sleep_timer, "parameter-link")
+        _link(links, previous, previous_flow, component, in_flow, "triangle-link")
+
+        nodes.extend([component, literal])
+        previous, previous_flow = component, out_flow
+
+    _link(links, previous, previous_flow, finish, finish["ports"][0], "triangle-link")
+
+    return _diagram(nodes, links)
+
+
+def write_chain_workflow(path, n_components):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(build_chain_workflow(n_components), f)
+    return path
+
+
+def write_sleep_workflow(path, n_components, seconds):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(build_sleep_workflow(n_components, seconds), f)
+    return path
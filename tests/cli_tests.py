@@ -9,6 +9,9 @@ import json
 from pathlib import Path
 import pytest
 
+from helpers import (workflow_link, workflow_node, workflow_port, write_chain_workflow, write_component_library,
+                     write_workflow)
+
 # Setup test directory
 @pytest.fixture(scope="function")
 def test_directory():
@@ -728,3 +731,400 @@ def test_33_terminal_run_import_check():
     assert "Compiled" in output, "Expected 'Compiled' not found in output."
     assert "Finished Executing" in output, "Expected 'Finished Executing' not found in output."
     assert Path("sqlite_sample.py").exists(), "Expected compiled .py file not found."
+
+def test_34_compile_cache_reuses_unchanged_workflow():
+    """Compiling an unchanged workflow twice should serve the second compile from the cache."""
+    run_command("xircuits init")
+
+    example_file = "xai_components/xai_controlflow/ControlflowBranch.xircuits"
+    py_file = example_file.replace(".xircuits", ".py")
+
+    stdout, stderr, rc = run_command(f"xircuits compile {example_file} --non-recursive")
+    assert rc == 0, "First compile failed."
+    cache_dir = Path(".xircuits") / "compile_cache"
+    cached_entries = list(cache_dir.glob("*.py"))
+    assert len(cached_entries) == 1, f"Expected one compile cache entry, found {cached_entries}"
+    first_output = Path(py_file).read_text()
+
+    os.remove(py_file)
+    stdout, stderr, rc = run_command(f"xircuits compile {example_file} --non-recursive")
+    assert rc == 0, "Cached compile failed."
+    assert Path(py_file).read_text() == first_output, "Cached output differs from the generated output."
+
+    stdout, stderr, rc = run_command(f"xircuits compile {example_file} --non-recursive --no-cache")
+    assert rc == 0, "Compile with --no-cache failed."
+    assert len(list(cache_dir.glob("*.py"))) == 1, "--no-cache should not add cache entries."
+
+
+def test_35_recursive_compile_builds_nested_workflows_in_parallel():
+    """A wide level of sub-workflows is compiled on the process pool, before the workflow using them."""
+    run_command("xircuits init")
+
+    sub_workflows = [f"Sub{i}" for i in range(8)]
+    for name in sub_workflows:
+        write_chain_workflow(f"{name}.xircuits",
+                             [("Print", "debug", "xai_components/xai_utils/utils.py", {"msg": f"hello from {name}"})])
+    write_chain_workflow("Parent.xircuits", [(name, "xircuits_workflow", f"{name}.py", {}) for name in sub_workflows])
+
+    stdout, stderr, rc = run_command("xircuits compile Parent.xircuits --jobs 2", timeout=60)
+    assert rc == 0, f"Recursive compile failed: {stderr}"
+    compiled = [line.split()[1] for line in stdout.splitlines() if line.startswith("Compiled ")]
+    assert len(compiled) == 9, f"Expected nine compiled workflows, got {compiled}"
+    assert compiled[-1].endswith("Parent.xircuits"), "The parent must be compiled after its sub-workflows."
+    for name in sub_workflows:
+        assert f"class {name}(Component)" in Path(f"{name}.py").read_text()
+
+    stdout, stderr, rc = run_command("python Parent.py", timeout=30)
+    assert rc == 0, f"Running the compiled parent failed: {stderr}"
+    for name in sub_workflows:
+        assert f"hello from {name}" in stdout
+
+    # Unchanged sub-workflows are skipped, unless the cache is bypassed
+    stdout, stderr, rc = run_command("xircuits compile Parent.xircuits --jobs 2", timeout=60)
+    assert rc == 0
+    assert stdout.count("Skipped ") == 8, "Unchanged sub-workflows should be skipped."
+    stdout, stderr, rc = run_command("xircuits compile Parent.xircuits --jobs 2 --no-cache", timeout=60)
+    assert rc == 0
+    assert "Skipped " not in stdout, "--no-cache must recompile every sub-workflow."
+
+def compile_and_run(workflow, script, compile_args="", run_args="", env=""):
+    """Compile `workflow` into `script` with `xircuits compile`, run the script and return its output."""
+    stdout, stderr, rc = run_command(f"xircuits compile {workflow} {script} {compile_args}")
+    assert rc == 0, stderr
+    stdout, stderr, rc = run_command(f"{env} python {script} {run_args}", timeout=60)
+    assert rc == 0, stderr
+    return stdout, stderr
+
+def test_36_verbosity_flag_stays_out_of_workflow_arguments():
+    """--verbosity controls the step output and is not passed on to the components in ctx['args']."""
+    run_command("xircuits init")
+    component_path = write_component_library("argcheck", '''
+from xai_components.base import Component, xai_component
+
+@xai_component
+class ShowArgs(Component):
+    def execute(self, ctx) -> None:
+        print("args:", sorted(vars(ctx["args"])))
+''')
+    write_chain_workflow("ArgCheck.xircuits", [("ShowArgs", "debug", component_path, {})])
+
+    stdout, _ = compile_and_run("ArgCheck.xircuits", "ArgCheck.py")
+    assert "args: []" in stdout and "Executing: ShowArgs" in stdout
+
+    stdout, _ = compile_and_run("ArgCheck.xircuits", "ArgCheck.py", run_args="--verbosity quiet")
+    assert "args: []" in stdout, "The verbosity flag leaked into ctx['args']."
+    assert "Executing:" not in stdout
+
+def test_37_static_schedule_runs_straight_line_code_and_logs_steps():
+    """With the default verbosity, a static workflow runs without the executor and still logs every step."""
+    run_command("xircuits init")
+    component_path = write_component_library("caller", '''
+import sys
+from xai_components.base import Component, xai_component
+
+@xai_component
+class ShowCaller(Component):
+    def execute(self, ctx) -> None:
+        # Component.do runs the component under the executor, the flow's execute in straight-line code
+        print("called from:", sys._getframe(1).f_code.co_name)
+''')
+    component = ("ShowCaller", "debug", component_path, {})
+    write_chain_workflow("Caller.xircuits", [component, component])
+
+    dynamic, _ = compile_and_run("Caller.xircuits", "Dynamic.py", "--schedule dynamic")
+    assert dynamic.count("called from: do") == 2
+
+    static, _ = compile_and_run("Caller.xircuits", "Static.py", "--schedule static")
+    assert static.count("called from: execute") == 2, "The static schedule fell back to the executor."
+    normalized = static.replace("called from: execute", "called from: do").replace("Static", "Dynamic")
+    assert normalized == dynamic, \
+        "The static schedule should log the same steps as the dynamic one."
+
+    stdout, _ = compile_and_run("Caller.xircuits", "Static.py", "--schedule static",
+                                env="XIRCUITS_DEBUG=1 XIRCUITS_DEBUG_FILE=debug.jsonl")
+    assert stdout.count("called from: do") == 2, "Debugged runs need the executor."
+
+
+def test_38_dataflow_schedule_overlaps_independent_components():
+    """The dataflow schedule gives the same results as the dynamic one, and runs independent components together."""
+    run_command("xircuits init")
+    component_path = write_component_library("nap", '''
+import sys
+import time
+from xai_components.base import Component, InArg, OutArg, xai_component
+
+@xai_component
+class Nap(Component):
+    label: InArg[str]
+    out: OutArg[str]
+
+    def execute(self, ctx) -> None:
+        started = time.monotonic()
+        time.sleep(0.5)
+        # One write per line, so that lines from concurrent naps do not interleave
+        sys.stdout.write(f"napped {self.label.value}\\n")
+        sys.stderr.write(f"{self.label.value} {started} {time.monotonic()}\\n")
+        self.out.value = self.label.value.lower()
+
+@xai_component
+class Join(Component):
+    a: InArg[str]
+    b: InArg[str]
+
+    def execute(self, ctx) -> None:
+        print("joined", self.a.value, self.b.value)
+''')
+    # Start -> Nap A -> Nap B -> Nap C -> Join(A.out, C.out) -> Finish
+    start = workflow_node("Start", "Start", [workflow_port("out-0", "▶", False)])
+    finish = workflow_node("Finish", "Finish", [workflow_port("in-0", "▶", True)])
+    nodes, links = [start, finish], []
+    previous, previous_flow = start, start["ports"][0]
+    naps = {}
+    for label in "ABC":
+        in_flow, out_flow = workflow_port("in-0", "▶", True), workflow_port("out-0", "▶", False)
+        label_port = workflow_port("parameter-string-label", "label", True, "string")
+        out = workflow_port("parameter-out-string-out", "out", False, "string")
+        nap = workflow_node("Nap", "debug", [in_flow, out_flow, label_port, out], path=component_path)
+        literal = workflow_node("Literal String", "string", [workflow_port("out-0", label, False)])
+        workflow_link(links, literal, literal["ports"][0], nap, label_port, "parameter-link")
+        workflow_link(links, previous, previous_flow, nap, in_flow, "triangle-link")
+        nodes += [nap, literal]
+        naps[label] = nap
+        previous, previous_flow = nap, out_flow
+    in_flow, out_flow = workflow_port("in-0", "▶", True), workflow_port("out-0", "▶", False)
+    a = workflow_port("parameter-string-a", "a", True, "string")
+    b = workflow_port("parameter-string-b", "b", True, "string")
+    join = workflow_node("Join", "debug", [in_flow, out_flow, a, b], path=component_path)
+    workflow_link(links, naps["A"], naps["A"]["ports"][3], join, a, "parameter-link")
+    workflow_link(links, naps["C"], naps["C"]["ports"][3], join, b, "parameter-link")
+    workflow_link(links, previous, previous_flow, join, in_flow, "triangle-link")
+    workflow_link(links, join, out_flow, finish, finish["ports"][0], "triangle-link")
+    nodes.append(join)
+    write_workflow("Naps.xircuits", nodes, links)
+
+    outputs, spans = {}, {}
+    for schedule in ("dynamic", "dataflow"):
+        name = schedule.capitalize()
+        stdout, stderr = compile_and_run("Naps.xircuits", f"{name}.py", f"--schedule {schedule}")
+        outputs[schedule] = sorted(stdout.replace(name, "Flow").splitlines())
+        spans[schedule] = {label: (float(started), float(ended)) for label, started, ended in
+                           (line.split() for line in stderr.splitlines() if line[:2] in ("A ", "B ", "C "))}
+
+    assert "joined a c" in outputs["dataflow"]
+    assert outputs["dataflow"] == outputs["dynamic"], \
+        "The dataflow schedule should run the same components with the same results."
+    for schedule, overlapping in (("dynamic", False), ("dataflow", True)):
+        last_start = max(started for started, _ in spans[schedule].values())
+        first_end = min(ended for _, ended in spans[schedule].values())
+        assert (last_start < first_end) == overlapping, \
+            f"Independent naps should {'' if overlapping else 'not '}overlap under the {schedule} schedule."
+
+
+def test_39_lazy_imports_wait_until_the_flow_runs():
+    """With lazy imports, a nested workflow imports its component modules when it runs, not when it is created."""
+    run_command("xircuits init")
+    component_source = '''
+import sys
+from xai_components.base import Component, xai_component
+
+@xai_component
+class {name}(Component):
+    def execute(self, ctx) -> None:
+        {body}
+'''
+    loaded = '"xai_components.xai_heavy.heavy" in sys.modules'
+    probe = write_component_library("probe", component_source.format(
+        name="Probe", body=f'print("heavy loaded before the sub-workflow:", {loaded})'))
+    heavy = write_component_library("heavy", component_source.format(name="Heavy", body='print("heavy ran")'))
+    write_chain_workflow("Sub.xircuits", [("Heavy", "debug", heavy, {})])
+    write_chain_workflow("Parent.xircuits", [("Probe", "debug", probe, {}), ("Sub", "xircuits_workflow", "Sub.py", {})])
+
+    stdout, _ = compile_and_run("Parent.xircuits", "Parent.py")
+    assert "heavy loaded before the sub-workflow: True" in stdout
+
+    stdout, _ = compile_and_run("Parent.xircuits", "Parent.py", "--lazy-imports --no-cache")
+    assert "heavy loaded before the sub-workflow: False" in stdout, "Creating the flows imported the components."
+    assert "heavy ran" in stdout
+
+    stdout, stderr, rc = run_command("python Parent.py --help")
+    assert rc == 0, stderr
+    assert "heavy" not in stdout
+
+    stdout, stderr, rc = run_command("xircuits run Parent.xircuits --lazy-imports")
+    assert rc == 0, stderr
+    assert "Imported 3 of 3 component modules" in stdout
+
+
+def test_40_bench_imports_enforces_the_import_budget():
+    """`xircuits bench imports` ranks the modules, writes the measurements and fails when one is over budget or broken."""
+    run_command("xircuits init")
+    for name, body in (("slow", "time.sleep(0.5)"), ("fast", "pass"), ("broken", "import not_a_module")):
+        write_component_library(name, f"import time\n{body}\n")
+    modules = " ".join(f"xai_components.xai_{name}.{name}" for name in ("fast", "broken", "slow"))
+
+    stdout, stderr, rc = run_command(f"xircuits bench imports {modules} --repeat 1 --budget-ms 250 --json bench.json",
+                                     timeout=60)
+    assert rc == 1, "A module over the budget must fail the command."
+    assert "1 component modules exceed the import budget." in stdout
+    assert "1 component modules failed to import." in stdout
+    report = stdout.splitlines()
+    slow = next(line for line in report if line.endswith("xai_components.xai_slow.slow  over budget"))
+    fast = next(line for line in report if line.endswith("xai_components.xai_fast.fast"))
+    assert report.index(slow) < report.index(fast), "The slowest import comes first."
+    assert any("xai_components.xai_broken.broken: ModuleNotFoundError" in line for line in report)
+
+    results = {r["module"]: r for r in json.loads(Path("bench.json").read_text())}
+    assert results["xai_components.xai_slow.slow"]["seconds"] >= 0.5
+    assert results["xai_components.xai_fast.fast"]["seconds"] < 0.25
+    assert results["xai_components.xai_broken.broken"]["seconds"] is None
+
+    # Without the flag, the budget comes from the [BENCH] section of the configuration
+    config = Path(".xircuits/config.ini")
+    config.write_text(config.read_text().replace("IMPORT_BUDGET_MS =", "IMPORT_BUDGET_MS = 250"))
+    stdout, stderr, rc = run_command(f"xircuits bench imports {modules} --repeat 1", timeout=60)
+    assert rc == 1, "The configured budget should apply."
+    importable = "xai_components.xai_fast.fast xai_components.xai_slow.slow"
+    stdout, stderr, rc = run_command(f"xircuits bench imports {importable} --repeat 1 --budget-ms 5000", timeout=60)
+    assert rc == 0, "The --budget-ms flag overrides the configured budget."
+    assert "over budget" not in stdout
+    stdout, stderr, rc = run_command(f"xircuits bench imports {modules} --repeat 1 --budget-ms 5000", timeout=60)
+    assert rc == 1, "A module that cannot be imported must fail the command within any budget."
+    assert "exceed the import budget" not in stdout
+
+
+RUN_WITH_RUNNER_SCRIPT = '''
+import sys
+from xircuits.runner import run_with_runner
+print("runner status:", run_with_runner(".", sys.argv[1], []))
+'''
+
+def test_41_warm_runner_runs_workflows_and_writes_their_reports():
+    """Workflows run on a warm runner, and profiles and debug logs are still written by the time the caller returns."""
+    from xircuits.runner import runner_address
+
+    run_command("xircuits init")
+    Path("run_with_runner.py").write_text(RUN_WITH_RUNNER_SCRIPT)
+    # Outside of xai_components, where compiling it would look like a component change to the runner
+    example_file, script = "HelloTutorial.xircuits", "HelloTutorial.py"
+    shutil.copy("xai_components/xai_template/HelloTutorial.xircuits", example_file)
+    stdout, stderr, rc = run_command(f"xircuits compile {example_file} {script}")
+    assert rc == 0, stderr
+
+    for mode in ("fork", "inprocess"):
+        log_file = Path(f"runner-{mode}.log")
+        with open(log_file, "w") as log:
+            runner = subprocess.Popen(["xircuits", "serve-runner", "--mode", mode], stdout=log,
+                                      stderr=subprocess.STDOUT, env=dict(os.environ, PYTHONUNBUFFERED="1"))
+        try:
+            deadline = time.time() + 60
+            while not os.path.exists(runner_address(Path.cwd())):
+                assert runner.poll() is None and time.time() < deadline, log_file.read_text()
+                time.sleep(0.2)
+
+            stdout, stderr, rc = run_command(f"xircuits run {example_file}", timeout=30)
+            assert rc == 0, stderr
+            assert "Hello Xircuits!" in stdout
+            assert log_file.read_text().count("Running ") == 1, "The run should go to the runner."
+
+            # xircuits run keeps profiled and debugged runs off the runner
+            stdout, stderr, rc = run_command(f"xircuits run {example_file} --profile {mode}.csv", timeout=30)
+            assert rc == 0, stderr
+            assert Path(f"{mode}.csv").exists() and Path(f"{mode}.folded").exists()
+            stdout, stderr, rc = run_command(
+                f"XIRCUITS_DEBUG=1 XIRCUITS_DEBUG_FILE={mode}.jsonl xircuits run {example_file}", timeout=30)
+            assert rc == 0, stderr
+            assert Path(f"{mode}.jsonl").read_text().splitlines(), "The debug log is empty."
+            assert log_file.read_text().count("Running ") == 1
+
+            # Sent to the runner anyway, the reports are written before the status comes back
+            stdout, stderr, rc = run_command(
+                f"XIRCUITS_PROFILE=direct-{mode}.csv XIRCUITS_DEBUG=1 XIRCUITS_DEBUG_FILE=direct-{mode}.jsonl "
+                f"python run_with_runner.py {script}", timeout=30)
+            assert rc == 0, stderr
+            if mode == "fork":
+                assert "runner status: 0" in stdout
+                assert Path(f"direct-{mode}.csv").exists(), "The worker exited without writing the profile."
+                assert Path(f"direct-{mode}.jsonl").read_text().splitlines(), \
+                    "The worker exited without flushing the debug log."
+            else:
+                assert "runner status: None" in stdout, "The in-process runner should hand profiled runs back."
+        finally:
+            runner.terminate()
+            runner.wait(timeout=30)
+        assert not os.path.exists(runner_address(Path.cwd())), "The runner should remove its socket."
+
+
+def child_commands(pid):
+    """The command lines of the child processes of `pid`."""
+    commands = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            ppid = int(stat.read_text().rsplit(")", 1)[1].split()[1])
+            if ppid == pid:
+                commands.append((stat.parent / "cmdline").read_bytes().replace(b"\0", b" ").decode())
+        except (OSError, IndexError, ValueError):
+            continue
+    return commands
+
+
+@pytest.mark.skipif(not Path("/proc").is_dir(), reason="Lists the runner's children through /proc")
+def test_42_inprocess_runner_starts_every_run_afresh():
+    """The in-process runner shuts the worker pools of a run down and reports the lazy imports of that run alone."""
+    from xircuits.runner import runner_address
+
+    run_command("xircuits init")
+    Path("run_with_runner.py").write_text(RUN_WITH_RUNNER_SCRIPT)
+    pooled = write_component_library("pooled", '''
+from xai_components.base import Component, SubGraphExecutor, xai_component
+from xai_components.xai_utils.utils import Print, RunParallelProcess
+
+@xai_component
+class ParallelHello(Component):
+    def execute(self, ctx) -> None:
+        body = Print()
+        body.msg.value = "hello from a worker"
+        body.next = None
+        parallel = RunParallelProcess()
+        parallel.n_workers.value = 2
+        parallel.body = SubGraphExecutor(body)
+        parallel.next = None
+        parallel.do(ctx)
+        parallel.futures.value[0].result()
+''')
+    write_chain_workflow("Pooled.xircuits", [("ParallelHello", "debug", pooled, {})])
+    write_chain_workflow("Greeting.xircuits",
+                         [("Print", "debug", "xai_components/xai_utils/utils.py", {"msg": "hello"})])
+    for workflow in ("Pooled", "Greeting"):
+        stdout, stderr, rc = run_command(f"xircuits compile {workflow}.xircuits {workflow}.py --lazy-imports")
+        assert rc == 0, stderr
+
+    for preload in ("", "--no-preload"):
+        log_file = Path("runner.log")
+        with open(log_file, "w") as log:
+            runner = subprocess.Popen(f"xircuits serve-runner --mode inprocess {preload}".split(), stdout=log,
+                                      stderr=subprocess.STDOUT, env=dict(os.environ, PYTHONUNBUFFERED="1"))
+        try:
+            deadline = time.time() + 60
+            while not os.path.exists(runner_address(Path.cwd())):
+                assert runner.poll() is None and time.time() < deadline, log_file.read_text()
+                time.sleep(0.2)
+
+            for _ in range(2):
+                stdout, stderr, rc = run_command("XIRCUITS_IMPORT_REPORT=1 python run_with_runner.py Pooled.py",
+                                                 timeout=60)
+                assert rc == 0, stderr
+                assert "runner status: 0" in stdout, log_file.read_text()
+                assert "hello from a worker" in stdout
+                assert "Imported 1 of 1 component modules" in stdout
+                assert not [c for c in child_commands(runner.pid) if "forkserver" in c], \
+                    "The worker pool of the run outlived it."
+
+            stdout, stderr, rc = run_command("XIRCUITS_IMPORT_REPORT=1 python run_with_runner.py Greeting.py",
+                                             timeout=30)
+            assert rc == 0, stderr
+            assert "Imported 1 of 1 component modules" in stdout, "The report lists modules of an earlier run."
+            assert "xai_pooled" not in stdout
+            assert log_file.read_text().count("Running ") == 3
+        finally:
+            runner.terminate()
+            runner.wait(timeout=30)
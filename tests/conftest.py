@@ -0,0 +1,11 @@
+import subprocess
+
+import pytest
+
+
+@pytest.fixture
+def working_dir(tmp_path, monkeypatch):
+    """An initialized Xircuits working directory, which is also the current directory"""
+    subprocess.run(["xircuits", "init"], cwd=tmp_path, check=True, capture_output=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
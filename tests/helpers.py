@@ -0,0 +1,90 @@
+"""
+Builders for the small workflows and component libraries written by the tests,
+and a runner for the scripts that need an interpreter of their own.
+"""
+import itertools
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+_ids = itertools.count()
+
+
+def workflow_port(name, label, is_in, data_type=""):
+    return {"id": f"port-{next(_ids)}", "name": name, "label": label, "varName": label,
+            "dataType": data_type, "in": is_in, "links": []}
+
+
+def workflow_node(name, node_type, ports, path=None):
+    extras = {"type": node_type}
+    if path is not None:
+        extras["path"] = path
+    return {"id": f"node-{next(_ids)}", "name": name, "extras": extras, "ports": ports}
+
+
+def workflow_link(links, source, source_port, target, target_port, link_type):
+    link = {"id": f"link-{next(_ids)}", "type": link_type, "source": source["id"],
+            "sourcePort": source_port["id"], "target": target["id"], "targetPort": target_port["id"]}
+    links.append(link)
+    source_port["links"].append(link["id"])
+    target_port["links"].append(link["id"])
+
+
+def write_workflow(path, nodes, links):
+    diagram = {"id": f"diagram-{next(_ids)}", "layers": [
+        {"id": "links", "type": "diagram-links", "models": {l["id"]: l for l in links}},
+        {"id": "nodes", "type": "diagram-nodes", "models": {n["id"]: n for n in nodes}},
+    ]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(diagram, f)
+
+
+def write_chain_workflow(path, components):
+    """
+    Write a Start -> components -> Finish workflow. `components` is a list of
+    (name, node type, path, {input name: literal}) tuples; literals are passed as strings.
+    """
+    start = workflow_node("Start", "Start", [workflow_port("out-0", "▶", False)])
+    finish = workflow_node("Finish", "Finish", [workflow_port("in-0", "▶", True)])
+    nodes, links = [start, finish], []
+    previous, previous_flow = start, start["ports"][0]
+    for name, node_type, component_path, inputs in components:
+        in_flow = workflow_port("in-0", "▶", True)
+        out_flow = workflow_port("out-0", "▶", False)
+        ports = [in_flow, out_flow]
+        component = workflow_node(name, node_type, ports, path=component_path)
+        for input_name, value in inputs.items():
+            port = workflow_port(f"parameter-string-{input_name}", input_name, True, "string")
+            ports.append(port)
+            literal = workflow_node("Literal String", "string", [workflow_port("out-0", value, False)])
+            workflow_link(links, literal, literal["ports"][0], component, port, "parameter-link")
+            nodes.append(literal)
+        workflow_link(links, previous, previous_flow, component, in_flow, "triangle-link")
+        nodes.append(component)
+        previous, previous_flow = component, out_flow
+    workflow_link(links, previous, previous_flow, finish, finish["ports"][0], "triangle-link")
+    write_workflow(path, nodes, links)
+
+
+def write_component_library(name, source, working_dir="."):
+    """
+    Write the component library `xai_components/xai_<name>` with one module,
+    `<name>.py`, holding `source`. Returns the module's path as workflows refer to it.
+    """
+    library = Path(working_dir) / "xai_components" / f"xai_{name}"
+    library.mkdir(parents=True, exist_ok=True)
+    (library / "__init__.py").write_text("")
+    (library / f"{name}.py").write_text(source)
+    return f"xai_components/xai_{name}/{name}.py"
+
+
+def run_python(*args, env=None, timeout=60):
+    """
+    Run the current interpreter with `args` in the current directory, with
+    `env` added to the environment. Returns (stdout, stderr, return code).
+    """
+    completed = subprocess.run([sys.executable, *args], env=dict(os.environ, **(env or {})),
+                               capture_output=True, text=True, timeout=timeout)
+    return completed.stdout, completed.stderr, completed.returncode
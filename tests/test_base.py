@@ -0,0 +1,202 @@
+import asyncio
+import csv
+import json
+import pickle
+import threading
+from copy import copy, deepcopy
+from pathlib import Path
+
+from helpers import run_python
+from xai_components.base import (AsyncComponent, BaseComponent, Component, InArg, InCompArg, OutArg,
+                                 SubGraphExecutor, dynalist, run_async)
+from xircuits.compiler import compile as compile_workflow
+
+
+def test_connected_port_chains_follow_rewiring():
+    """Ports connected through other ports read the end of the chain, also after the chain is rewired."""
+    first, second = OutArg("first"), OutArg("second")
+    middle = InArg(None)
+    middle.connect(first)
+    end = InArg(None)
+    end.connect(middle)
+    assert end.value == "first"
+
+    first.value = "changed"
+    assert end.value == "changed"
+
+    middle.connect(second)
+    assert end.value == "second", "Ports reading through a reconnected port must follow it."
+    # A connected port keeps reading through whatever it is given
+    middle.value = OutArg("literal")
+    assert end.value == "literal"
+
+    # Cycles fall back to reading through the getters instead of looping while wiring
+    a, b = InArg(None), InArg(None)
+    a.connect(b)
+    b.connect(a)
+
+    copied = deepcopy(end)
+    middle.value = OutArg("after copy")
+    assert copied.value == "literal", "A deep copy keeps its own chain."
+
+    items = InArg(dynalist(), dynalist.getter)
+    items[0].connect(first)
+    items[1] = "literal"
+    assert items.value == ["changed", "literal"]
+
+
+def test_slotted_ports_and_port_schema():
+    """Ports carry no instance dict, components get their ports from a per-class schema, and copies keep values."""
+    class Sample(Component):
+        text: InArg[str]
+        required: InCompArg[int]
+        items: InArg[dynalist]
+        out: OutArg[str]
+        note: str
+
+    for port_class in (InArg, InCompArg, OutArg):
+        assert not hasattr(port_class("x"), "__dict__"), f"{port_class.__name__} should be slotted."
+
+    first, second = Sample(), Sample()
+    assert Sample.__dict__["_xai_port_schema"] is Sample._port_schema(), "The schema should be built once per class."
+    assert [entry[0] for entry in Sample._port_schema()] == ["text", "required", "items", "out", "note"]
+    assert first.text is not second.text and first.items.value == [] and first.note is None
+    assert isinstance(first.required, InCompArg) and isinstance(first.out, OutArg)
+
+    first.out.value = "hello"
+    second.text.connect(first.out)
+    assert second.text.value == "hello"
+
+    copied = deepcopy(second)
+    first.out.value = "changed"
+    assert copied.text.value == "hello", "A deep copy reads from its own copy of the chain."
+    assert copy(second).text is second.text
+
+    restored = pickle.loads(pickle.dumps(second.text))
+    assert restored.value == "changed"
+
+
+DEBUG_LOGGER_SCRIPT = '''
+import threading
+from xai_components.base import InArg, OutArg, Component, SubGraphExecutor, StructuredDebugLogger
+
+class Double(Component):
+    x: InArg[int]
+    y: OutArg[int]
+
+    def execute(self, ctx) -> None:
+        self.y.value = self.x.value * 2
+
+first, second = Double(), Double()
+first.x.value = 1
+second.x.connect(first.y)
+first.next, second.next = second, None
+SubGraphExecutor(first).do({"kept": 1, "dropped": 2})
+print("logger created:", hasattr(StructuredDebugLogger, "logger"))
+print("writer thread:", any(t.name == "xircuits-debug-logger" for t in threading.enumerate()))
+'''
+
+def test_debug_logger_only_exists_when_enabled(tmp_path, monkeypatch):
+    """Without XIRCUITS_DEBUG nothing is set up; with it every step is logged as a JSON line."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("XIRCUITS_DEBUG", raising=False)
+    Path("debug_run.py").write_text(DEBUG_LOGGER_SCRIPT)
+
+    stdout, stderr, rc = run_python("debug_run.py")
+    assert rc == 0, stderr
+    assert "logger created: False" in stdout and "writer thread: False" in stdout
+
+    stdout, stderr, rc = run_python("debug_run.py", env={"XIRCUITS_DEBUG": "1", "XIRCUITS_DEBUG_FILE": "debug.jsonl",
+                                                         "XIRCUITS_DEBUG_CTX_KEYS": "kept"})
+    assert rc == 0, stderr
+    assert "logger created: True" in stdout
+    entries = [json.loads(line) for line in Path("debug.jsonl").read_text().splitlines()]
+    assert [e["type"] for e in entries] == ["before_execution", "after_execution"] * 2
+    assert entries[2]["component"]["inputs"] == {"x": 2} and entries[3]["component"]["outputs"] == {"y": 4}
+    assert all(e["ctx"] == {"kept": 1} for e in entries)
+
+
+def test_profile_report_includes_flow_and_class_totals(working_dir):
+    """The profile measures the workflow itself and the CSV report ends with per-class totals."""
+    compile_workflow("xai_components/xai_template/HelloTutorial.xircuits", "HelloTutorial.py", use_cache=False)
+    stdout, stderr, rc = run_python("HelloTutorial.py", env={"XIRCUITS_PROFILE": "profile.csv"})
+    assert rc == 0, stderr
+
+    sections = Path("profile.csv").read_text().split("\n\n")
+    assert len(sections) == 2, "Expected a components section and a classes section."
+    components = list(csv.DictReader(sections[0].splitlines()))
+    classes = list(csv.DictReader(sections[1].splitlines()))
+
+    assert {c["class"] for c in components} == {"HelloTutorial", "ConcatString", "Print"}
+    assert {c["class"] for c in classes} == {"HelloTutorial", "ConcatString", "Print"}
+    flow = [c for c in classes if c["class"] == "HelloTutorial"][0]
+    assert flow["calls"] == "1"
+    assert float(flow["wall_time"]) >= sum(float(c["wall_time"]) for c in classes if c is not flow)
+
+    stacks = Path("profile.folded").read_text().splitlines()
+    assert stacks and all(line.startswith("HelloTutorial") for line in stacks), "The workflow should root every stack."
+
+
+def test_async_components_reuse_one_event_loop():
+    """Async components share the calling thread's event loop, also in the native async executor."""
+    loops = []
+    wrapper_threads = []
+
+    class Step(AsyncComponent):
+        x: InArg[int]
+        y: OutArg[int]
+
+        async def execute(self, ctx) -> None:
+            loops.append((asyncio.get_running_loop(), threading.get_ident()))
+            await asyncio.sleep(0)
+            self.y.value = self.x.value + 1
+
+    class Wrapper(Component):
+        body: BaseComponent
+
+        def execute(self, ctx) -> None:
+            # Owns a nested body, so the async executor runs it on a worker thread
+            wrapper_threads.append(threading.get_ident())
+            SubGraphExecutor(self.body).do(ctx)
+
+    def chain():
+        steps = [Step() for _ in range(3)]
+        steps[0].x.value = 0
+        for previous, step in zip(steps, steps[1:]):
+            step.x.connect(previous.y)
+            previous.next = step
+        steps[-1].next = None
+        return steps
+
+    steps = chain()
+    SubGraphExecutor(steps[0], use_async=False).do({})
+    assert steps[-1].y.value == 3
+    assert len({id(loop) for loop, _ in loops}) == 1, "Every call should reuse the thread's loop."
+    assert not loops[0][0].is_closed()
+
+    loops.clear()
+    steps = chain()
+    wrapper = Wrapper()
+    wrapper.body = Step()
+    wrapper.body.x.connect(steps[-1].y)
+    wrapper.body.next = None
+    steps[-1].next = wrapper
+    wrapper.next = None
+    SubGraphExecutor(steps[0], use_async=True).do({})
+    assert wrapper.body.y.value == 4
+    assert wrapper_threads[0] != loops[0][1], "The wrapper should have run on a worker thread."
+    assert len({id(loop) for loop, _ in loops}) == 1, "Offloaded components should hand coroutines back to the run's loop."
+
+    async def nested():
+        # Called while a loop is running in this thread
+        return run_async(asyncio.sleep(0, result="done"))
+    assert asyncio.run(nested()) == "done"
+
+
+def test_profiler_modules_are_imported_only_when_profiling(tmp_path, monkeypatch):
+    """Workflows that are not profiled do not import the modules the profiler writes its report with."""
+    monkeypatch.chdir(tmp_path)
+    stdout, stderr, rc = run_python("-c", "import sys, xai_components.base; "
+                                          "print(sorted({'csv', 'multiprocessing'} & set(sys.modules)))")
+    assert rc == 0, stderr
+    assert stdout.strip() == "[]"
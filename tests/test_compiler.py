@@ -0,0 +1,89 @@
+import ast
+import json
+from pathlib import Path
+
+from helpers import write_chain_workflow
+from xircuits.compiler import cache as cache_module
+from xircuits.compiler import compile as compile_workflow
+from xircuits.compiler.graph_index import GraphIndex
+from xircuits.compiler.parser import XircuitsFileParser
+
+
+def test_parser_resolves_every_link_port(working_dir):
+    """Each parsed port matches the link and port it came from in the workflow file."""
+    workflows = sorted(Path("xai_components").glob("**/*.xircuits"))
+    assert workflows, "No example workflows found."
+    for workflow in workflows:
+        data = json.loads(workflow.read_text(encoding="utf-8"))
+        nodes = [l for l in data["layers"] if l["type"] == "diagram-nodes"][0]["models"]
+        links = [l for l in data["layers"] if l["type"] == "diagram-links"][0]["models"]
+
+        parser = XircuitsFileParser()
+        with open(workflow, "r", encoding="utf-8") as f:
+            parser.parse(f)
+
+        for node_id, node in parser.traversed_nodes.items():
+            expected = []
+            for port in nodes[node_id]["ports"]:
+                for link_id in port["links"]:
+                    link = links[link_id]
+                    source_port = [p for p in nodes[link["source"]]["ports"] if p["id"] == link["sourcePort"]][0]
+                    expected.append((port["name"], link["type"], link["source"], link["target"],
+                                     source_port["label"].replace("★", "")))
+            actual = [(p.name, p.type, p.source.id, p.target.id, p.sourceLabel) for p in node.ports]
+            assert actual == expected, f"Ports of {node.name} in {workflow} differ from the file."
+
+
+def test_graph_index_matches_parsed_graph(working_dir):
+    """The generator's node index holds exactly the parsed nodes, grouped by role."""
+    for workflow in sorted(Path("xai_components").glob("**/*.xircuits")):
+        parser = XircuitsFileParser()
+        with open(workflow, "r", encoding="utf-8") as f:
+            graph = parser.parse(f)
+        index = GraphIndex.build(graph)
+
+        parsed = parser.traversed_nodes
+        assert sorted(n.id for n in index.nodes) == sorted(parsed), f"Node set differs for {workflow}"
+        assert {n.id for n in index.component_nodes} == {i for i, n in parsed.items() if n.file is not None}
+        assert {n.id for n in index.argument_nodes} == \
+               {i for i, n in parsed.items() if n.file is None and n.name.startswith("Argument ")}
+        for node in index.nodes:
+            ports = index.ports[node.id]
+            grouped = ports.argument_in + ports.data_in + ports.dynamic_in + ports.flow_out
+            assert all(p in node.ports for p in grouped)
+            assert ports.flow_out == [p for p in node.ports if p.direction == "out" and p.type == "triangle-link"]
+
+
+def test_generated_statements_are_valid_python(working_dir):
+    """Every example workflow generates a module Python can compile, with the expected wiring statements."""
+    for workflow in sorted(Path("xai_components").glob("**/*.xircuits")):
+        py_file = str(workflow).replace(".xircuits", ".py")
+        compile_workflow(str(workflow), py_file, use_cache=False)
+        source = Path(py_file).read_text(encoding="utf-8")
+        compile(source, py_file, "exec")
+        assert ast.unparse(ast.parse(source)).strip() == source.strip(), f"{py_file} is not in canonical form."
+
+    source = Path("xai_components/xai_template/HelloTutorial.py").read_text(encoding="utf-8")
+    assert "self.c_0.a.value = 'Hello '" in source
+    assert "self.c_1.msg.connect(self.c_0.out)" in source
+    assert "self.c_0.next = self.c_1" in source
+
+
+def test_compile_cache_keeps_the_latest_entry_per_output(working_dir, monkeypatch):
+    """Editing a workflow replaces its cache entry, and the cache never grows beyond MAX_ENTRIES."""
+    cache_dir = Path(".xircuits") / "compile_cache"
+
+    def compile_greeting(message, output="Greeting.py"):
+        write_chain_workflow("Greeting.xircuits",
+                             [("Print", "debug", "xai_components/xai_utils/utils.py", {"msg": message})])
+        compile_workflow("Greeting.xircuits", output)
+        return sorted(p.name for p in cache_dir.glob("*.py"))
+
+    first = compile_greeting("hello")
+    assert len(first) == 1
+    edited = compile_greeting("hello again")
+    assert len(edited) == 1 and edited != first, "An edit should replace the entry of the same output."
+    assert len(compile_greeting("hello again", "Other.py")) == 2, "Other outputs keep their own entries."
+
+    monkeypatch.setattr(cache_module, "MAX_ENTRIES", 1)
+    assert len(compile_greeting("goodbye", "Third.py")) == 1, "The oldest entries should go beyond MAX_ENTRIES."
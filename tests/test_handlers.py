@@ -0,0 +1,215 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from xircuits.handlers import compile_xircuits
+from xircuits.handlers import component_watcher as watcher_module
+from xircuits.handlers import components as components_module
+from xircuits.handlers.components import (ComponentIndex, ComponentsRouteHandler, list_component_files,
+                                          shutdown_extract_pool)
+
+pytest_plugins = ("pytest_jupyter.jupyter_server",)
+
+
+def test_compile_service_serializes_compiles_of_the_same_output(monkeypatch):
+    """Compile requests writing the same module never overlap, and identical queued requests are shared."""
+    calls = []
+    active = []
+    lock = threading.Lock()
+
+    def fake_compile(kind):
+        def job(input_file_path, *args, **kwargs):
+            with lock:
+                overlapping = input_file_path in active
+                active.append(input_file_path)
+            time.sleep(0.1)
+            with lock:
+                active.remove(input_file_path)
+                calls.append((kind, input_file_path, overlapping, kwargs.get("max_workers")))
+        return job
+
+    monkeypatch.setattr(compile_xircuits, "compile", fake_compile("compile"))
+    monkeypatch.setattr(compile_xircuits, "recursive_compile", fake_compile("recursive"))
+
+    async def requests():
+        service = compile_xircuits.CompileService(max_workers=4)
+        await asyncio.gather(
+            service.compile("/flows/Hello.xircuits", "/flows/Hello.py", {}),
+            service.recursive_compile("/flows/Hello.xircuits", {}),
+            service.recursive_compile("/flows/Hello.xircuits", {}),
+            service.compile("/flows/Other.xircuits", "/flows/Other.py", {}),
+        )
+        assert not service.running and not service.pending
+
+    asyncio.run(requests())
+
+    assert sorted((kind, path) for kind, path, _, _ in calls) == [
+        ("compile", "/flows/Hello.xircuits"),
+        ("compile", "/flows/Other.xircuits"),
+        ("recursive", "/flows/Hello.xircuits"),
+    ], "Identical queued requests should share one compile."
+    assert not any(overlapping for _, _, overlapping, _ in calls), "Compiles of the same output overlapped."
+    assert [workers for kind, _, _, workers in calls if kind == "recursive"] == [1], \
+        "Nested workflows should not start a process pool in the server."
+
+
+@pytest.mark.parametrize("file_events", [False, True], ids=["polling", "watchdog"])
+def test_component_watcher_publishes_changed_components(file_events, tmp_path, monkeypatch):
+    """Adding, editing and deleting a component file is published with the components' palette colors."""
+    monkeypatch.chdir(tmp_path)
+
+    library = Path("components") / "xai_watched"
+    library.mkdir(parents=True)
+    # Missing directories, such as an unset BASE_PATH, are part of a normal installation
+    directories = [str(Path("components").absolute()), str(Path("missing").absolute())]
+    monkeypatch.setattr(watcher_module, "get_component_directories", lambda: directories)
+    monkeypatch.setattr(watcher_module, "component_index", ComponentIndex(cache_path="component_index.json"))
+    if file_events:
+        pytest.importorskip("watchdog")
+    else:
+        monkeypatch.setattr(watcher_module, "Observer", None)
+    threads_before = set(threading.enumerate())
+
+    component_source = '''
+from xai_components.base import InArg, Component, xai_component
+
+@xai_component
+class {name}(Component):
+    msg: InArg[str]
+
+    def execute(self, ctx) -> None:
+        pass
+'''
+
+    async def watch():
+        watcher = watcher_module.ComponentWatcher(poll_interval_ms=50)
+        queue = watcher.subscribe()
+        assert (watcher.observer is not None) == file_events, "The watcher used the wrong source of changes."
+        try:
+            await asyncio.sleep(0.3)
+            assert queue.empty(), "The initial snapshot must not be published."
+
+            (library / "watched.py").write_text(component_source.format(name="Watched"))
+            added = await asyncio.wait_for(queue.get(), 10)
+            (library / "watched.py").write_text(component_source.format(name="Renamed"))
+            renamed = await asyncio.wait_for(queue.get(), 10)
+            (library / "watched.py").unlink()
+            deleted = await asyncio.wait_for(queue.get(), 10)
+        finally:
+            watcher.unsubscribe(queue)
+        return added, renamed, deleted
+
+    added, renamed, deleted = asyncio.run(watch())
+    assert set(threading.enumerate()) <= threads_before, "Unsubscribing should stop the watcher's threads."
+
+    change = added["changes"][0]
+    assert change["file"].endswith("watched.py") and change["removed"] == [] and change["error"] is None
+    assert [c["task"] for c in change["components"]] == ["Watched"]
+    assert change["components"][0]["color"].startswith("rgb("), "Changed components must carry their palette color."
+
+    change = renamed["changes"][0]
+    assert change["removed"] == [["ADVANCED", "Watched"]]
+    assert [c["task"] for c in change["components"]] == ["Renamed"]
+
+    change = deleted["changes"][0]
+    assert change["removed"] == [["ADVANCED", "Renamed"]] and change["components"] == []
+
+
+def test_component_index_only_extracts_changed_files(working_dir, monkeypatch):
+    """The persisted component index is reused across instances until a file changes."""
+    component_files = list_component_files(["xai_components"])
+    assert component_files, "No component files found."
+
+    extracted = []
+    extract_library = components_module.extract_library
+    monkeypatch.setattr(components_module, "extract_library",
+                        lambda files: extracted.extend(f[0].name for f in files) or extract_library(files))
+
+    index = ComponentIndex()
+    assert asyncio.run(index.update(component_files, parallel=False)) == {}
+    index.save()
+    assert len(extracted) == len(component_files)
+    assert Path(".xircuits/component_index.json").exists()
+    etag = index.fingerprint(component_files)
+
+    # A new server process loads the index instead of parsing the files again
+    extracted.clear()
+    index = ComponentIndex()
+    asyncio.run(index.update(component_files, parallel=False))
+    assert extracted == []
+    assert index.fingerprint(list_component_files(["xai_components"])) == etag
+
+    utils = Path("xai_components/xai_utils/utils.py")
+    utils.write_text(utils.read_text() + "\n# changed\n")
+    component_files = list_component_files(["xai_components"])
+    asyncio.run(index.update(component_files, parallel=False))
+    assert extracted == ["utils.py"], "Only the changed file should be extracted again."
+    assert index.fingerprint(component_files) != etag
+
+
+def test_parallel_extraction_matches_serial_and_reports_broken_files(working_dir):
+    """Libraries extracted on worker processes give the serial result, and a broken file only fails itself."""
+    Path("xai_components/xai_utils/broken.py").write_text("@xai_component\nclass Broken(:\n")
+    component_files = list_component_files(["xai_components"])
+
+    serial = ComponentIndex(cache_path="serial.json")
+    serial_errors = asyncio.run(serial.update(component_files, parallel=False))
+    parallel = ComponentIndex(cache_path="parallel.json")
+    try:
+        parallel_errors = asyncio.run(parallel.update(component_files, parallel=True))
+    finally:
+        shutdown_extract_pool()
+
+    assert list(serial_errors) == [str(Path("xai_components/xai_utils/broken.py").absolute())]
+    assert {k: (e["type"], e["lineno"]) for k, e in parallel_errors.items()} == \
+           {k: (e["type"], e["lineno"]) for k, e in serial_errors.items()}
+    assert parallel.entries == serial.entries
+    assert any(c["task"] == "Print" for c in
+               parallel.entries[str(Path("xai_components/xai_utils/utils.py").absolute())]["components"])
+
+
+
+@pytest.fixture
+def jp_server_config():
+    """Server configuration of the tests talking to the Xircuits API"""
+    return {"ServerApp": {"jpserver_extensions": {"xircuits": True}}}
+
+async def test_components_api_pages_filters_and_serves_details(working_dir, jp_fetch, monkeypatch):
+    """The palette honours ETags, pagination and filters, and details come from the index without a rebuild."""
+    response = await jp_fetch("xircuits", "components/")
+    palette = json.loads(response.body)["components"]
+    etag = response.headers["Etag"]
+    response = await jp_fetch("xircuits", "components/", headers={"If-None-Match": etag}, raise_error=False)
+    assert response.code == 304, "An unchanged palette should not be sent again."
+
+    response = await jp_fetch("xircuits", "components/", params={"offset": "2", "limit": "5"})
+    page = json.loads(response.body)
+    assert page["total"] == len(palette) and page["offset"] == 2 and page["limit"] == 5
+    assert page["components"] == palette[2:7]
+
+    response = await jp_fetch("xircuits", "components/", params={"library": "utils", "summary": "true"})
+    utils = json.loads(response.body)
+    assert utils["total"] == len([c for c in palette if c.get("file_path", "").startswith("xai_components/xai_utils/")])
+    assert utils["components"] and all("docstring" not in c for c in utils["components"])
+
+    response = await jp_fetch("xircuits", "components/", params={"limit": "x"}, raise_error=False)
+    assert response.code == 400
+
+    async def no_rebuild(self, component_files):
+        raise AssertionError("The detail request rebuilt the palette.")
+    monkeypatch.setattr(ComponentsRouteHandler, "build_palette", no_rebuild)
+
+    for task, header in (("Print", "ADVANCED"), ("Literal String", "GENERAL")):
+        response = await jp_fetch("xircuits", "components/detail", params={"task": task, "header": header})
+        detail = json.loads(response.body)
+        assert detail == [c for c in palette if c["task"] == task and c["header"] == header][0]
+
+    response = await jp_fetch("xircuits", "components/detail", params={"task": "Print"},
+                              headers={"If-None-Match": etag}, raise_error=False)
+    assert response.code == 304
+    response = await jp_fetch("xircuits", "components/detail", params={"task": "NoSuchComponent"}, raise_error=False)
+    assert response.code == 404
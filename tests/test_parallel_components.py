@@ -0,0 +1,314 @@
+import asyncio
+import random
+import time
+from concurrent.futures import wait
+from pathlib import Path
+
+import pytest
+
+from helpers import run_python
+from xai_components.base import AsyncComponent, Component, InArg, OutArg, SubGraphExecutor
+from xai_components.xai_controlflow.branches import ConcurrentBranches
+from xai_components.xai_utils.utils import ParallelForEach, RunParallelThread
+
+
+def test_concurrent_branches_collect_results_timeouts_and_errors():
+    """Branches run concurrently; a slow branch times out and a failing one reports its error, in branch order."""
+    class Wait(AsyncComponent):
+        seconds: InArg[float]
+        done: OutArg[float]
+
+        async def execute(self, ctx) -> None:
+            if self.seconds.value < 0:
+                raise ValueError("negative wait")
+            await asyncio.sleep(self.seconds.value)
+            self.done.value = self.seconds.value
+
+    def branch(seconds):
+        component = Wait()
+        component.seconds.value = seconds
+        component.next = None
+        return SubGraphExecutor(component)
+
+    concurrent = ConcurrentBranches()
+    concurrent.branch_1 = branch(0.3)
+    concurrent.branch_2 = branch(5)
+    concurrent.branch_3 = branch(-1)
+    concurrent.branch_4 = branch(0.3)
+    concurrent.timeout.value = 0.6
+    concurrent.next = None
+
+    started = time.perf_counter()
+    concurrent.do({})
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.5, f"Branches did not run concurrently ({elapsed:.2f}s)."
+    assert concurrent.results.value == [0.3, None, None, 0.3]
+    assert concurrent.errors.value == [None, "Timed out after 0.6 seconds", "negative wait", None]
+
+    # With one branch at a time the waits add up
+    limited = ConcurrentBranches()
+    limited.branch_1 = branch(0.2)
+    limited.branch_2 = branch(0.2)
+    limited.max_concurrency.value = 1
+    limited.next = None
+    started = time.perf_counter()
+    limited.do({})
+    assert time.perf_counter() - started >= 0.4
+    assert limited.results.value == [0.2, 0.2] and limited.errors.value == [None, None]
+
+
+PROCESS_POOL_SCRIPT = '''
+from xai_components.base import SubGraphExecutor, finish_run
+from xai_components.xai_utils import utils
+from xai_components.xai_utils.utils import RunParallelProcess, AwaitFutures, Print, get_process_pool
+
+def parallel_print(message, n_workers=2):
+    body = Print()
+    body.msg.value = message
+    body.next = None
+    component = RunParallelProcess()
+    component.n_workers.value = n_workers
+    component.body = SubGraphExecutor(body)
+    component.next = None
+    return component
+
+if __name__ == '__main__':
+    first, second = parallel_print("first run"), parallel_print("second run")
+    first.do({})
+    pool = get_process_pool(2)
+    second.do({})
+    print("shared pool:", get_process_pool(2) is pool)
+
+    waiter = AwaitFutures()
+    waiter.futures.value = first.futures.value + second.futures.value
+    waiter.shutdown_workers.value = True
+    waiter.next = None
+    waiter.do({})
+    print("new pool after shutdown:", get_process_pool(2) is not pool)
+
+    smaller, larger = parallel_print("smaller run"), parallel_print("larger run", n_workers=3)
+    smaller.do({})
+    larger.do({})
+    print("larger pool:", get_process_pool(2)._max_workers)
+    finish_run()
+    print("pools after the run:", utils._process_pool, utils._retired_pools)
+    print("runs done:", all(f.done() for f in smaller.futures.value + larger.futures.value))
+'''
+
+def test_parallel_processes_share_one_worker_pool(tmp_path, monkeypatch):
+    """RunParallelProcess runs share a worker pool, which grows on demand and is shut down with the run."""
+    monkeypatch.chdir(tmp_path)
+    Path("process_pool.py").write_text(PROCESS_POOL_SCRIPT)
+
+    stdout, stderr, rc = run_python("process_pool.py")
+    assert rc == 0, stderr
+    assert "first run" in stdout and "second run" in stdout
+    assert "shared pool: True" in stdout
+    assert "new pool after shutdown: True" in stdout
+    assert "smaller run" in stdout and "larger run" in stdout
+    assert "larger pool: 3" in stdout
+    assert "pools after the run: None []" in stdout
+    assert "runs done: True" in stdout
+
+
+COPY_ON_WRITE_SCRIPT = '''
+import os, pickle, time
+from multiprocessing import shared_memory
+from xai_components.base import Component, InArg, SubGraphExecutor, xai_component, finish_run
+from xai_components.xai_utils.utils import RunParallelProcess, get_process_pool
+
+@xai_component
+class ShowValue(Component):
+    key: InArg[str]
+
+    def execute(self, ctx):
+        # Keeping the values alive in the worker tells reused values from reloaded ones by their id
+        import seen
+        value = ctx[self.key.value]
+        seen.values.append(value)
+        print(f"{self.key.value}: {len(value)} in {os.getpid()} as {id(value)}", flush=True)
+
+def parallel_show(key):
+    body = ShowValue()
+    body.key.value = key
+    body.next = None
+    component = RunParallelProcess()
+    component.n_workers.value = 1
+    component.copy_strategy.value = "copy_on_write"
+    component.body = SubGraphExecutor(body)
+    component.next = None
+    return component
+
+def run(component, ctx):
+    component.do(ctx)
+    component.futures.value[-1].result()
+
+def exists(name):
+    try:
+        shared_memory.SharedMemory(name=name).close()
+        return True
+    except FileNotFoundError:
+        return False
+
+def released(names):
+    # The segments of a task are released once its future is done
+    for _ in range(50):
+        if not any(exists(name) for name in names):
+            return True
+        time.sleep(0.1)
+    return False
+
+if __name__ == '__main__':
+    ctx = {"big": "x" * (2 << 20), "medium": "y" * (500 << 10)}
+    show_big, show_medium = parallel_show("big"), parallel_show("medium")
+    run(show_big, ctx)
+    values = get_process_pool(1).task_values
+    big_segments = [name for name, segment in values.segments.items() if segment[0].size > 2 << 20]
+    print("big value segments:", len(big_segments))
+    run(show_medium, {"medium": ctx["medium"]})
+    run(show_big, ctx)
+
+    task, _, segments = values.encode_task(show_big.body, ctx)
+    values.task_done(segments)
+    print("unchanged task size:", len(pickle.dumps(task)))
+
+    all_segments = list(values.segments)
+    run(show_big, {"big": "z" * (2 << 20), "medium": ctx["medium"]})
+    print("replaced value released:", released(big_segments))
+    all_segments += list(values.segments)
+    finish_run()
+    print("all released:", released(all_segments))
+'''
+
+def test_copy_on_write_processes_pass_on_only_changed_values(tmp_path, monkeypatch):
+    """Workers keep the values of every body, unchanged values cross over by reference and segments get released."""
+    monkeypatch.chdir(tmp_path)
+    Path("copy_on_write.py").write_text(COPY_ON_WRITE_SCRIPT)
+    Path("seen.py").write_text("values = []\n")
+
+    stdout, stderr, rc = run_python("copy_on_write.py")
+    assert rc == 0, stderr
+    assert "big value segments: 1" in stdout, "A value over the threshold should get a segment of its own."
+    big_runs = [line for line in stdout.splitlines() if line.startswith("big:")]
+    assert len(big_runs) == 3 and big_runs[0] == big_runs[1], \
+        "The worker should reuse the value it loaded, although another body ran in between."
+    assert big_runs[2] != big_runs[0]
+    assert f"medium: {500 << 10} in" in stdout
+    size = int(stdout.split("unchanged task size:")[1].split()[0])
+    assert size < 2000, "Unchanged values should cross the process boundary by reference only."
+    assert "replaced value released: True" in stdout
+    assert "all released: True" in stdout
+
+
+def test_copy_strategies_of_parallel_threads():
+    """copy_on_write shares context values and body inputs, deepcopy copies them, and keys set by the body stay its own."""
+    seen = []
+
+    class Inspect(Component):
+        data: InArg[list]
+
+        def execute(self, ctx) -> None:
+            seen.append((self.data.value, ctx["table"]))
+            ctx["set_by_body"] = True
+
+    shared_table = {"rows": [1, 2, 3]}
+    outside = OutArg([1, 2])
+
+    def run(copy_strategy):
+        seen.clear()
+        body = Inspect()
+        body.data.connect(outside)
+        body.next = None
+        component = RunParallelThread()
+        component.n_workers.value = 2
+        component.copy_strategy.value = copy_strategy
+        component.body = SubGraphExecutor(body)
+        component.next = None
+        ctx = {"table": shared_table}
+        component.do(ctx)
+        component.do(ctx)
+        wait(component.futures.value)
+        assert "set_by_body" not in ctx, "Keys set by the body must not leak into the caller's context."
+        assert len(seen) == 2
+        return seen
+
+    for data, table in run("copy_on_write"):
+        assert data is outside.value and table is shared_table
+    for data, table in run("deepcopy"):
+        assert data == outside.value and data is not outside.value
+        assert table == shared_table and table is not shared_table
+
+    component = RunParallelThread()
+    component.copy_strategy.value = "share_everything"
+    with pytest.raises(ValueError):
+        component.execute({})
+
+
+PARALLEL_FOREACH_SCRIPT = '''
+import sys
+from xai_components.base import SubGraphExecutor
+from xai_components.xai_utils.utils import ConcatString, ParallelForEach, shutdown_process_pool
+
+if __name__ == '__main__':
+    loop = ParallelForEach()
+    body = ConcatString()
+    body.a.connect(loop.current_item)
+    body.b.value = "!"
+    body.next = None
+    loop.body = SubGraphExecutor(body)
+    loop.result.connect(body.out)
+    loop.items.value = [str(i) for i in range(20)]
+    loop.backend.value = sys.argv[1]
+    loop.n_workers.value = 2
+    loop.chunk_size.value = 3
+    loop.next = None
+    loop.do({})
+    print("results:", loop.results.value)
+    shutdown_process_pool()
+'''
+
+def test_parallel_foreach_keeps_item_order_on_every_backend(tmp_path, monkeypatch):
+    """ParallelForEach collects one result per item in item order, whichever chunk finishes first."""
+    class SlowSquare(Component):
+        x: InArg[int]
+        out: OutArg[int]
+
+        def execute(self, ctx) -> None:
+            time.sleep(random.random() / 100)
+            self.out.value = self.x.value ** 2
+
+    class AsyncSlowSquare(AsyncComponent):
+        x: InArg[int]
+        out: OutArg[int]
+
+        async def execute(self, ctx) -> None:
+            await asyncio.sleep(random.random() / 100)
+            self.out.value = self.x.value ** 2
+
+    for backend, body_class in (("thread", SlowSquare), ("async", AsyncSlowSquare)):
+        loop = ParallelForEach()
+        body = body_class()
+        body.x.connect(loop.current_item)
+        body.next = None
+        loop.body = SubGraphExecutor(body)
+        loop.result.connect(body.out)
+        loop.items.value = iter(range(50))
+        loop.backend.value = backend
+        loop.n_workers.value = 4
+        loop.max_pending.value = 3
+        loop.next = None
+        loop.do({})
+        assert loop.results.value == [i ** 2 for i in range(50)], f"Results out of order with the {backend} backend."
+
+    monkeypatch.chdir(tmp_path)
+    Path("parallel_foreach.py").write_text(PARALLEL_FOREACH_SCRIPT)
+    stdout, stderr, rc = run_python("parallel_foreach.py", "process")
+    assert rc == 0, stderr
+    assert f"results: {[str(i) + '!' for i in range(20)]}" in stdout
+
+    loop = ParallelForEach()
+    loop.backend.value = "gpu"
+    loop.items.value = []
+    with pytest.raises(ValueError):
+        loop.execute({})
@@ -2,65 +2,111 @@ from argparse import Namespace
 from typing import TypeVar, Generic, Tuple, NamedTuple, Callable, List
 from copy import deepcopy
 
-import os, json, datetime
-
-from asgiref.sync import async_to_sync, sync_to_async
+import os, json, datetime, weakref, random, threading, queue, atexit, sys, time, logging
+import asyncio, contextvars, dis, inspect, importlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 T = TypeVar('T')
 
 
-class OutArg(Generic[T]):
-    def __init__(self, value: T = None, getter: Callable[[T], any] = lambda x: x) -> None:
-        self._value = value
-        self._getter = getter
+def _identity(x):
+    return x
 
-    @property
-    def value(self):
-        return self._getter(self._value)
 
-    @value.setter
-    def value(self, value: T):
-        self._value = value
+def _connected(x):
+    return x.value
 
-    def connect(self, ref: 'OutArg[T]'):
-        self._value = ref
-        self._getter = lambda x: x.value
 
-    def __copy__(self):
-        return type(self)(self._value, self._getter)
+class _Port:
+    """
+    Common implementation of the component ports.
 
-    def __deepcopy__(self, memo):
-        id_self = id(self)
-        _copy = memo.get(id_self)
-        if _copy is None:
-            _copy = type(self)(
-                deepcopy(self._value, memo),
-                deepcopy(self._getter, memo)
-            )
-            memo[id_self] = _copy
-        return _copy
+    A port reads its value as `getter(value)`, and a connected port reads the
+    value of the port it is connected to. Connected ports may be connected in
+    turn, so every port remembers the end of its chain as `_source` when it is
+    wired and reads from there directly. When a port is connected again, the
+    ports connected to it look up their new source.
+    """
+    # Components hold many ports, keep them small
+    __slots__ = ('_value', '_getter', '_source', '_dependents', '__weakref__')
 
-
-class InArg(Generic[T]):
-    def __init__(self, value: T = None, getter: Callable[[T], any] = lambda x: x) -> None:
+    def __init__(self, value: T = None, getter: Callable[[T], any] = _identity) -> None:
         self._value = value
         self._getter = getter
+        self._source = self
+        self._dependents = None
+        if getter is _connected:
+            self._link()
 
     @property
     def value(self):
-        return self._getter(self._value)
+        source = self._source
+        if source._getter is _identity:
+            return source._value
+        return source._getter(source._value)
 
     @value.setter
     def value(self, value: T):
-        self._value = value
+        if self._getter is _connected:
+            # A connected port keeps reading through whatever it is given
+            self._unlink()
+            self._value = value
+            self._link()
+        else:
+            self._value = value
 
-    def connect(self, ref: OutArg[T]):
+    def connect(self, ref: 'OutArg[T]'):
+        if self._getter is _connected:
+            self._unlink()
         self._value = ref
-        self._getter = lambda x: x.value
+        self._getter = _connected
+        self._link()
+
+    def _link(self):
+        ref = self._value
+        if isinstance(ref, _Port):
+            if ref._dependents is None:
+                ref._dependents = weakref.WeakSet()
+            ref._dependents.add(self)
+        self._relink()
+
+    def _unlink(self):
+        ref = self._value
+        if isinstance(ref, _Port) and ref._dependents is not None:
+            ref._dependents.discard(self)
+
+    def _relink(self):
+        # Every port reading through this one has to find its source again
+        pending = [self]
+        visited = set()
+        while pending:
+            port = pending.pop()
+            if id(port) in visited:
+                continue
+            visited.add(id(port))
+            port._source = port._find_source()
+            if port._dependents:
+                pending.extend(port._dependents)
+
+    def _find_source(self):
+        port = self
+        visited = set()
+        while port._getter is _connected and isinstance(port._value, _Port):
+            if id(port) in visited:
+                # Connected in a cycle, read through the getters as before
+                return self
+            visited.add(id(port))
+            port = port._value
+        return port
 
     def __copy__(self):
         return type(self)(self._value, self._getter)
 
+    def __reduce__(self):
+        # Pickled like a copy, the wiring is rebuilt when unpickled
+        return type(self), (self._value, self._getter)
+
     def __deepcopy__(self, memo):
         id_self = id(self)
         _copy = memo.get(id_self)
@@ -72,6 +118,14 @@ class InArg(Generic[T]):
             memo[id_self] = _copy
         return _copy
 
+
+class OutArg(_Port, Generic[T]):
+    __slots__ = ()
+
+
+class InArg(_Port, Generic[T]):
+    __slots__ = ()
+
     def _put_at_index(self, idx: int, obj):
         v = self._value
         if v is None:
@@ -98,36 +152,8 @@ class InArg(Generic[T]):
         # Enables: port[i] = <literal or port>
         self._put_at_index(idx, value)
 
-class InCompArg(Generic[T]):
-    def __init__(self, value: T = None, getter: Callable[[T], any] = lambda x: x) -> None:
-        self._value = value
-        self._getter = getter
-
-    @property
-    def value(self):
-        return self._getter(self._value)
-
-    @value.setter
-    def value(self, value: T):
-        self._value = value
-
-    def connect(self, ref: OutArg[T]):
-        self._value = ref
-        self._getter = lambda x: x.value
-
-    def __copy__(self):
-        return type(self)(self._value, self._getter)
-
-    def __deepcopy__(self, memo):
-        id_self = id(self)
-        _copy = memo.get(id_self)
-        if _copy is None:
-            _copy = type(self)(
-                deepcopy(self._value, memo),
-                deepcopy(self._getter, memo)
-            )
-            memo[id_self] = _copy
-        return _copy
+class InCompArg(_Port, Generic[T]):
+    __slots__ = ()
 
 
 def xai_component(*args, **kwargs):
@@ -154,26 +180,50 @@ class ExecutionContext:
 class BaseComponent:
     def __init__(self, id: str = None):
         self.__id__ = id
-        all_ports = self.__annotations__
-        for key, type_arg in all_ports.items():
-            if hasattr(type_arg, '__origin__'):
-                port_class = type_arg.__origin__
-                port_type = type_arg.__args__[0]
+        for key, port_class, initial_value, port_getter in self._port_schema():
+            if port_class is None:
+                setattr(self, key, None)
+            else:
+                port_value = initial_value() if initial_value is not None else None
+                setattr(self, key, port_class(port_value, port_getter))
+
+    @classmethod
+    def _port_schema(cls):
+        """
+        The ports declared by the class annotations as (name, port class,
+        initial value factory, getter) tuples, worked out once per class.
+        Annotations that are not ports have no port class.
+        """
+        schema = cls.__dict__.get('_xai_port_schema')
+        if schema is None:
+            schema = []
+            for key, type_arg in cls.__annotations__.items():
+                port_class = getattr(type_arg, '__origin__', None)
                 if port_class in (InArg, InCompArg, OutArg):
-                    if hasattr(port_type, 'initial_value'):
-                        port_value = port_type.initial_value()
-                    else:
-                        port_value = None
-
-                    if hasattr(port_type, 'getter'):
-                        port_getter = port_type.getter
-                    else:
-                        port_getter = lambda x: x
-                    setattr(self, key, port_class(port_value, port_getter))
+                    port_type = type_arg.__args__[0]
+                    schema.append((
+                        key,
+                        port_class,
+                        getattr(port_type, 'initial_value', None),
+                        getattr(port_type, 'getter', _identity)
+                    ))
                 else:
-                    setattr(self, key, None)
-            else:
-                setattr(self, key, None)
+                    schema.append((key, None, None, None))
+            schema = tuple(schema)
+            cls._xai_port_schema = schema
+        return schema
+
+    @classmethod
+    def _branch_ports(cls):
+        """
+        Names of the ports holding nested bodies, such as a loop's `body`.
+        """
+        branches = cls.__dict__.get('_xai_branch_ports')
+        if branches is None:
+            branches = tuple(key for key, type_arg in cls.__annotations__.items()
+                             if key != 'next' and isinstance(type_arg, type) and issubclass(type_arg, BaseComponent))
+            cls._xai_branch_ports = branches
+        return branches
 
     @classmethod
     def set_execution_context(cls, context: ExecutionContext) -> None:
@@ -202,11 +252,187 @@ class BaseComponent:
         return _copy
 
 
+VERBOSITY_LEVELS = ('quiet', 'summary', 'steps')
+
+step_logger = logging.getLogger('xircuits.steps')
+
+
+class _StdoutHandler(logging.Handler):
+    # Writes to whatever sys.stdout currently is and leaves flushing to its buffering
+    def emit(self, record):
+        try:
+            sys.stdout.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+if not step_logger.handlers:
+    step_logger.addHandler(_StdoutHandler())
+    step_logger.setLevel(logging.INFO)
+    step_logger.propagate = False
+
+
+class ExecutionReport:
+    """
+    What a workflow run reports about itself, depending on the verbosity level:
+
+    - quiet: nothing
+    - summary: the number of executed components and the run time at the end
+    - steps: every executed component through the `xircuits.steps` logger (default)
+
+    The level comes from `set_verbosity`, which generated workflows call with
+    their `--verbosity` flag, or from XIRCUITS_VERBOSITY.
+    """
+    level = os.getenv('XIRCUITS_VERBOSITY', 'steps')
+    if level not in VERBOSITY_LEVELS:
+        level = 'steps'
+    log_steps = level == 'steps'
+    steps = 0
+    started = time.perf_counter()
+
+
+def set_verbosity(level: str = None) -> None:
+    if level is None:
+        level = os.getenv('XIRCUITS_VERBOSITY', 'steps')
+    if level not in VERBOSITY_LEVELS:
+        raise ValueError(f"Unknown verbosity level {level!r}, expected one of {', '.join(VERBOSITY_LEVELS)}")
+    ExecutionReport.level = level
+    # Worker processes started later pick the level up from their environment
+    os.environ['XIRCUITS_VERBOSITY'] = level
+    ExecutionReport.log_steps = level == 'steps'
+    ExecutionReport.steps = 0
+    ExecutionReport.started = time.perf_counter()
+
+
+def print_execution_summary() -> None:
+    if ExecutionReport.level == 'quiet':
+        return
+    if ExecutionReport.level == 'summary':
+        elapsed = time.perf_counter() - ExecutionReport.started
+        print(f"\nExecuted {ExecutionReport.steps} components in {elapsed:.3f}s")
+    print("\nFinished Executing")
+
+
+class ImportReport:
+    """
+    The component modules of workflows compiled with lazy imports: which
+    components each module provides, and how long the ones that were needed
+    took to import. `print_import_report` prints it when XIRCUITS_IMPORT_REPORT
+    is set (`xircuits run --lazy-imports`).
+    """
+    declared = {}
+    imported = {}
+    lock = threading.Lock()
+
+
+class LazyComponent:
+    """
+    Stands in for a component class in a workflow compiled with lazy imports,
+    and imports the module providing it on first instantiation. Such a
+    workflow creates its components when it first runs (see
+    `build_lazy_flow`), so the modules of a flow that never runs, e.g. a
+    branch that is not taken or a run that stops at `--help`, are never
+    imported.
+    """
+
+    def __init__(self, module: str, name: str):
+        self.module = module
+        self.name = name
+        self.component_class = None
+        names = ImportReport.declared.setdefault(module, [])
+        if name not in names:
+            names.append(name)
+
+    def resolve(self) -> type:
+        component_class = self.component_class
+        if component_class is None:
+            with ImportReport.lock:
+                if self.module not in ImportReport.imported:
+                    started = time.perf_counter()
+                    importlib.import_module(self.module)
+                    ImportReport.imported[self.module] = time.perf_counter() - started
+            component_class = self.component_class = getattr(sys.modules[self.module], self.name)
+        return component_class
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, key):
+        if key.startswith('__'):
+            # Keep copy, pickle and friends from importing the module
+            raise AttributeError(key)
+        return getattr(self.resolve(), key)
+
+    def __repr__(self):
+        return f"<LazyComponent {self.module}.{self.name}>"
+
+
+_build_lock = threading.RLock()
+
+
+def build_lazy_flow(flow: BaseComponent) -> None:
+    """
+    Creates and wires the components of a flow compiled with lazy imports,
+    the first time the flow runs. Its `__init__` only sets up the flow's own
+    ports, since the component classes are not known before their modules
+    are imported.
+    """
+    if '_xai_built' in flow.__dict__:
+        return
+    with _build_lock:
+        if '_xai_built' not in flow.__dict__:
+            flow.__build__()
+            flow._xai_built = True
+
+
+def print_import_report() -> None:
+    if not os.getenv("XIRCUITS_IMPORT_REPORT", None):
+        return
+    declared = ImportReport.declared
+    imported = ImportReport.imported
+    print("\nComponent imports:")
+    for module, seconds in sorted(imported.items(), key=lambda item: -item[1]):
+        print(f"{seconds * 1000:10.1f} ms  {module}")
+    skipped = [module for module in declared if module not in imported]
+    for module in skipped:
+        print(f"{'not needed':>13}  {module} ({', '.join(declared[module])})")
+    print(f"Imported {len(imported)} of {len(declared)} component modules in "
+          f"{sum(imported.values()) * 1000:.1f} ms, skipped {len(skipped)}")
+
+
+_run_finalizers = []
+
+
+def on_run_finished(finalizer: Callable[[], None]) -> None:
+    """
+    Registers a function releasing something set up for the current workflow
+    run, e.g. a worker pool, to be called once when the run finishes.
+    """
+    if finalizer not in _run_finalizers:
+        _run_finalizers.append(finalizer)
+
+
+def finish_run() -> None:
+    """
+    Called by a compiled workflow when it finishes, even if it failed: calls
+    the functions registered with `on_run_finished`, the last registered
+    first, and clears the import report. A process running several
+    workflows, e.g. the in-process runner, starts each of them afresh.
+    """
+    while _run_finalizers:
+        _run_finalizers.pop()()
+    with ImportReport.lock:
+        ImportReport.declared.clear()
+        ImportReport.imported.clear()
+
+
 class Component(BaseComponent):
     next: BaseComponent
 
     def do(self, ctx) -> BaseComponent:
-        print(f"\nExecuting: {self.__class__.__name__}", flush=True)
+        ExecutionReport.steps += 1
+        if ExecutionReport.log_steps:
+            step_logger.info("\nExecuting: %s", self.__class__.__name__)
         self.execute(ctx)
 
         return self.next
@@ -215,38 +441,158 @@ class Component(BaseComponent):
         return "<h1>Component</h1>"
 
 
+_thread_loops = threading.local()
+_workflow_loop = contextvars.ContextVar('xircuits_workflow_loop', default=None)
+_sync_executor = None
+_reentry_executor = None
+
+
+def _get_thread_loop():
+    loop = getattr(_thread_loops, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = _thread_loops.loop = asyncio.new_event_loop()
+    return loop
+
+
+def _get_sync_executor():
+    global _sync_executor
+    if _sync_executor is None:
+        _sync_executor = ThreadPoolExecutor(thread_name_prefix='xircuits-sync')
+    return _sync_executor
+
+
+def run_async(coro):
+    """
+    Runs a coroutine to completion from synchronous code.
+
+    Every thread keeps one event loop for as long as it lives, so calling
+    async components from sync code neither creates a loop nor hands over
+    to another thread. Sync components offloaded by an async
+    SubGraphExecutor hand their coroutines back to the executor's loop.
+    When a loop is already running in this thread, it cannot be waited on,
+    so the coroutine runs on a separate thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        loop = _workflow_loop.get()
+        if loop is not None and loop.is_running():
+            return asyncio.run_coroutine_threadsafe(coro, loop).result()
+        loop = _get_thread_loop()
+        token = _workflow_loop.set(loop)
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            _workflow_loop.reset(token)
+
+    global _reentry_executor
+    if _reentry_executor is None:
+        _reentry_executor = ThreadPoolExecutor(thread_name_prefix='xircuits-async')
+    return _reentry_executor.submit(run_async, coro).result()
+
+
+async def _do_sync_component(comp, ctx):
+    # Sync components run on the loop unless they would hold it up: components
+    # with nested bodies may wait for async components themselves, and other
+    # tasks may be waiting for the loop.
+    if comp._branch_ports() or len(asyncio.all_tasks()) > 1:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_sync_executor(), contextvars.copy_context().run, comp.do, ctx)
+    return comp.do(ctx)
+
+
 class AsyncComponent(BaseComponent):
     next: BaseComponent
 
-    @async_to_sync
-    async def do(self, ctx) -> BaseComponent:
-        print(f"\nExecuting: {self.__class__.__name__}", flush=True)
+    async def do_async(self, ctx) -> BaseComponent:
+        ExecutionReport.steps += 1
+        if ExecutionReport.log_steps:
+            step_logger.info("\nExecuting: %s", self.__class__.__name__)
         await self.execute(ctx)
         return self.next
 
+    def do(self, ctx) -> BaseComponent:
+        return run_async(self.do_async(ctx))
+
     def debug_repr(self) -> str:
         return "<h1>AsyncComponent</h1>"
 
 
 class SubGraphExecutor:
+    """
+    Runs a chain of components, following `next` until it ends.
 
-    def __init__(self, component):
+    With `use_async` (or XIRCUITS_ASYNC set) the chain runs natively on an
+    event loop: async components are awaited directly, and sync components
+    run on the loop or, when they would hold it up, on a thread pool.
+    """
+
+    def __init__(self, component, use_async: bool = None):
         self.comp = component
+        # Decided once, so running without debugging or profiling costs nothing per step
+        self.debug = StructuredDebugLogger.enabled()
+        self.profile = ComponentProfiler.enabled()
+        if use_async is None:
+            use_async = os.getenv("XIRCUITS_ASYNC", None) is not None
+        self.use_async = use_async
 
     def do(self, ctx):
-        logger = StructuredDebugLogger.get_logger()
+        if self.use_async:
+            return run_async(self.do_async(ctx))
+
         comp = self.comp
 
+        if not (self.debug or self.profile):
+            while comp is not None:
+                comp = comp.do(ctx)
+            return None
+
+        logger = StructuredDebugLogger.get_logger() if self.debug else None
+        profiler = ComponentProfiler.get_profiler() if self.profile else None
         while comp is not None:
             orig_comp = comp
-            logger.log_before_execution(orig_comp, ctx)
-            comp = comp.do(ctx)
-            logger.log_after_execution(orig_comp, ctx)
+            logged = logger is not None and logger.sample()
+            if logged:
+                logger.log_before_execution(orig_comp, ctx)
+            if profiler is not None:
+                token = profiler.start(orig_comp)
+                try:
+                    comp = comp.do(ctx)
+                finally:
+                    profiler.stop(token)
+            else:
+                comp = comp.do(ctx)
+            if logged:
+                logger.log_after_execution(orig_comp, ctx)
         return None
 
-    @sync_to_async
-    def do_async(self, ctx):
-        return self.do(ctx)
+    async def do_async(self, ctx, return_last: bool = False):
+        """
+        Runs the chain natively on the running event loop. With `return_last`,
+        returns the last component that ran instead of None.
+        """
+        logger = StructuredDebugLogger.get_logger() if self.debug else None
+        profiler = ComponentProfiler.get_profiler() if self.profile else None
+        comp = self.comp
+        orig_comp = None
+
+        while comp is not None:
+            orig_comp = comp
+            logged = logger is not None and logger.sample()
+            if logged:
+                logger.log_before_execution(orig_comp, ctx)
+            token = profiler.start(orig_comp) if profiler is not None else None
+            try:
+                if isinstance(comp, (AsyncComponent, SubGraphExecutor)):
+                    comp = await comp.do_async(ctx)
+                else:
+                    comp = await _do_sync_component(comp, ctx)
+            finally:
+                if token is not None:
+                    profiler.stop(token)
+            if logged:
+                logger.log_after_execution(orig_comp, ctx)
+        return orig_comp if return_last else None
 
 
 def execute_graph(args: Namespace, start: BaseComponent, ctx) -> None:
@@ -267,6 +613,259 @@ def execute_graph(args: Namespace, start: BaseComponent, ctx) -> None:
             next_component = next_component.do(ctx)
 
 
+def start_static_run(flow: BaseComponent, steps: Tuple[BaseComponent, ...]) -> bool:
+    """
+    Whether a flow compiled with the static schedule may run its straight-line
+    code, which calls `execute` on `steps` directly. Returns None when it may
+    not, because something needs the executor (debugging, profiling or the
+    async executor) or a step is not a plain component. Otherwise returns
+    whether the steps are logged, which the straight-line code then does
+    itself with `log_step`, and counts the steps towards the execution summary.
+    """
+    if StructuredDebugLogger.enabled() or ComponentProfiler.enabled() \
+            or os.getenv("XIRCUITS_ASYNC", None) is not None:
+        return None
+    plain = flow.__dict__.get('_xai_static_plain')
+    if plain is None:
+        plain = flow._xai_static_plain = all(type(step).do is Component.do for step in steps)
+    if not plain:
+        return None
+    ExecutionReport.steps += len(steps)
+    return ExecutionReport.log_steps
+
+
+def log_step(comp: BaseComponent) -> None:
+    """Logs a step of the straight-line code like Component.do does."""
+    step_logger.info("\nExecuting: %s", comp.__class__.__name__)
+
+
+_dataflow_executor = None
+_dataflow_executor_lock = threading.Lock()
+
+
+def _get_dataflow_executor():
+    global _dataflow_executor
+    with _dataflow_executor_lock:
+        if _dataflow_executor is None:
+            workers = os.getenv("XIRCUITS_DATAFLOW_WORKERS", None)
+            _dataflow_executor = ThreadPoolExecutor(max_workers=int(workers) if workers else None,
+                                                    thread_name_prefix="xircuits-dataflow")
+            on_run_finished(_shutdown_dataflow_executor)
+        return _dataflow_executor
+
+
+def _shutdown_dataflow_executor():
+    global _dataflow_executor
+    with _dataflow_executor_lock:
+        executor, _dataflow_executor = _dataflow_executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+_reads_ctx_cache = {}
+
+
+def _reads_ctx(component_class) -> bool:
+    """
+    Whether the `execute` of a component class uses its context, judged from
+    its bytecode. Components whose code cannot be inspected count as using it.
+    """
+    reads = _reads_ctx_cache.get(component_class)
+    if reads is None:
+        code = getattr(inspect.unwrap(component_class.execute), '__code__', None)
+        if code is None or code.co_argcount < 2:
+            reads = code is None
+        else:
+            name = code.co_varnames[1]
+            reads = name in code.co_cellvars or any(
+                instruction.opname.startswith('LOAD_FAST') and (
+                    instruction.argval == name or
+                    isinstance(instruction.argval, tuple) and name in instruction.argval)
+                for instruction in dis.get_instructions(code)
+            )
+        _reads_ctx_cache[component_class] = reads
+    return reads
+
+
+def start_dataflow_run(flow: BaseComponent, nodes: Tuple[tuple, ...]) -> Tuple[tuple, ...]:
+    """
+    The plan run_dataflow follows for a flow compiled with the dataflow
+    schedule, or None if the flow has to go through the executor: while
+    debugging, profiling or using the async executor, which expect one step
+    at a time, or if a component that is not a barrier decides itself where
+    to go on.
+
+    Every compiled node is a (component, indices of the nodes whose outputs it
+    waits for, usual next component, barrier) tuple. Components that use the
+    context become barriers as well, since their order is not in the graph.
+    A barrier waits for every node before it and every node after it waits
+    for the barrier.
+    """
+    if StructuredDebugLogger.enabled() or ComponentProfiler.enabled() \
+            or os.getenv("XIRCUITS_ASYNC", None) is not None:
+        return None
+    if '_xai_dataflow' in flow.__dict__:
+        return flow._xai_dataflow
+
+    plan = []
+    last_barrier = None
+    for index, (comp, deps, next_component, barrier) in enumerate(nodes):
+        if not barrier and type(comp).do not in (Component.do, AsyncComponent.do):
+            plan = None
+            break
+        deps = set(deps)
+        if last_barrier is not None:
+            # Waiting for the barrier implies waiting for everything before it
+            deps = set(dep for dep in deps if dep > last_barrier)
+            deps.add(last_barrier)
+        if barrier or _reads_ctx(type(comp)):
+            deps.update(range(last_barrier or 0, index))
+            last_barrier = index
+        plan.append((comp, tuple(sorted(deps)), next_component))
+    if plan is not None:
+        plan = tuple(plan)
+    flow._xai_dataflow = plan
+    return plan
+
+
+def run_dataflow(nodes: Tuple[tuple, ...], ctx) -> None:
+    """
+    Runs the plan start_dataflow_run made for a flow compiled with the
+    dataflow schedule. Every node is a (component, indices of the nodes it
+    waits for, usual next component) tuple, and a node starts as soon as the
+    nodes it waits for are done, on a shared thread pool. The calling thread runs
+    nodes too, and takes back the ones still queued on the pool while it
+    waits, so flows nested in flows always make progress.
+
+    If a component goes on somewhere else than its usual next, no further
+    nodes start and the executor takes over from there once the running
+    ones are done. The first error is raised the same way.
+    """
+    waiting = [len(deps) for _, deps, _ in nodes]
+    dependents = [[] for _ in nodes]
+    for index, (_, deps, _) in enumerate(nodes):
+        for dep in deps:
+            dependents[dep].append(index)
+
+    ready = deque(index for index, count in enumerate(waiting) if count == 0)
+    running = {}
+    executor = _get_dataflow_executor()
+    error = None
+    diverted = None
+    diverted_to = None
+
+    def run(index):
+        return nodes[index][0].do(ctx)
+
+    def finish(index, next_component):
+        nonlocal diverted, diverted_to
+        if next_component is not nodes[index][2]:
+            if diverted is None:
+                diverted, diverted_to = True, next_component
+            ready.clear()
+            return
+        if diverted or error is not None:
+            return
+        for dependent in dependents[index]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                ready.append(dependent)
+
+    while ready or running:
+        # Hand all but one ready node to the pool and run that one here
+        while len(ready) > 1:
+            index = ready.popleft()
+            running[executor.submit(contextvars.copy_context().run, run, index)] = index
+        if ready:
+            index = ready.popleft()
+            try:
+                finish(index, run(index))
+            except BaseException as e:
+                if error is None:
+                    error = e
+                ready.clear()
+            continue
+
+        stopping = diverted or error is not None
+        for future in list(running):
+            if future.cancel():
+                index = running.pop(future)
+                if not stopping:
+                    ready.append(index)
+        if ready:
+            ready = deque(sorted(ready))
+            continue
+        if not running:
+            break
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = running.pop(future)
+            try:
+                finish(index, future.result())
+            except BaseException as e:
+                if error is None:
+                    error = e
+                ready.clear()
+
+    if error is not None:
+        raise error
+    if diverted:
+        SubGraphExecutor(diverted_to).do(ctx)
+
+
+def body_components(body) -> List[BaseComponent]:
+    """
+    The components of a body, following `next` and the nested branches, each
+    listed once.
+    """
+    components = []
+    seen = set()
+    pending = [body]
+    while pending:
+        comp = pending.pop()
+        if isinstance(comp, SubGraphExecutor):
+            comp = comp.comp
+        if not isinstance(comp, BaseComponent) or id(comp) in seen:
+            continue
+        seen.add(id(comp))
+        components.append(comp)
+        pending.append(getattr(comp, 'next', None))
+        pending.extend(getattr(comp, name, None) for name in comp._branch_ports())
+    return components
+
+
+def body_inputs(body) -> List[_Port]:
+    """
+    The ports outside a body that its components are connected to, such as
+    the current item of an enclosing loop.
+    """
+    components = body_components(body)
+    own = set()
+    for comp in components:
+        own.update(id(port) for port in vars(comp).values() if isinstance(port, _Port))
+    inputs = {}
+    for comp in components:
+        for port in vars(comp).values():
+            if not isinstance(port, _Port):
+                continue
+            # Dynamic ports hold a list of connections
+            refs = port._value if isinstance(port._value, (list, tuple)) else (port._value,)
+            for ref in refs:
+                if isinstance(ref, _Port) and id(ref) not in own:
+                    inputs[id(ref)] = ref
+    return list(inputs.values())
+
+
+def port_source(port: _Port) -> _Port:
+    """
+    The port a port is connected to, or None if it is not connected.
+    """
+    if port._getter is _connected and isinstance(port._value, _Port):
+        return port._value
+    return None
+
+
 class secret:
     pass
 
@@ -326,6 +925,24 @@ def parse_bool(value):
 
 
 class StructuredDebugLogger:
+    """
+    Writes a JSON line with the inputs, outputs and context before and after
+    every component executed by a SubGraphExecutor. Configured through:
+
+    - XIRCUITS_DEBUG: enables the logger when set
+    - XIRCUITS_DEBUG_FILE: target file, stderr by default
+    - XIRCUITS_DEBUG_SAMPLE_RATE: fraction of the component steps to log, 1 by default
+    - XIRCUITS_DEBUG_CTX_KEYS: comma separated ctx keys to log, all of them by default
+
+    Entries are serialized when they are logged and written in batches by a
+    background thread, which is drained when the process exits.
+    """
+    FLUSH_INTERVAL = 1.0
+
+    @classmethod
+    def enabled(cls):
+        return os.getenv("XIRCUITS_DEBUG", None) is not None
+
     @classmethod
     def get_logger(cls):
         if not hasattr(cls, "logger"):
@@ -333,29 +950,63 @@ class StructuredDebugLogger:
         return cls.logger
 
     def __init__(self):
-        import sys
-        self.debug = os.getenv("XIRCUITS_DEBUG", None) is not None
+        self.debug = self.enabled()
         self.target_file = os.getenv("XIRCUITS_DEBUG_FILE", 'stderr')
-        if self.target_file == 'stderr':
-            self.target = sys.stderr
-        else:
-            self.target = open(self.target_file, 'w')
+        self.sample_rate = float(os.getenv("XIRCUITS_DEBUG_SAMPLE_RATE", "1"))
+        ctx_keys = os.getenv("XIRCUITS_DEBUG_CTX_KEYS", None)
+        self.ctx_keys = None if ctx_keys is None else [k.strip() for k in ctx_keys.split(",") if k.strip()]
+        self.target = None
+        self.lines = None
+        self.writer = None
+        if self.debug:
+            if self.target_file == 'stderr':
+                self.target = sys.stderr
+            else:
+                self.target = open(self.target_file, 'w')
+            self.lines = queue.SimpleQueue()
+            self.writer = threading.Thread(target=self._write_lines, name="xircuits-debug-logger", daemon=True)
+            self.writer.start()
+            atexit.register(self.close)
+
+    def sample(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
 
     def write(self, value):
-        json.dump(value, self.target, default=repr)
-        self.target.write("\n")
+        self.lines.put(json.dumps(value, default=repr))
+
+    def _write_lines(self):
+        while True:
+            try:
+                line = self.lines.get(timeout=self.FLUSH_INTERVAL)
+            except queue.Empty:
+                self.target.flush()
+                continue
+            if line is None:
+                break
+            self.target.write(line)
+            self.target.write("\n")
         self.target.flush()
 
+    def close(self):
+        if self.writer is not None:
+            self.lines.put(None)
+            self.writer.join()
+            self.writer = None
+            if self.target is not sys.stderr:
+                self.target.close()
+
     def get_parameter_state(self, comp, classes):
-        all_ports = comp.__annotations__
         result = {}
-        for key, type_arg in all_ports.items():
-            if hasattr(type_arg, '__origin__'):
-                port_class = type_arg.__origin__
-                if port_class in classes:
-                    result[key] = getattr(comp, key).value
+        for key, port_class, _, _ in comp._port_schema():
+            if port_class in classes:
+                result[key] = getattr(comp, key).value
         return result
 
+    def get_ctx_state(self, ctx):
+        if self.ctx_keys is None:
+            return ctx
+        return {key: ctx[key] for key in self.ctx_keys if key in ctx}
+
     def _log(self, comp, ctx, type):
         if self.debug:
             if isinstance(comp, SubGraphExecutor): return
@@ -369,11 +1020,141 @@ class StructuredDebugLogger:
             elif type == 'after_execution':
                 component['outputs'] = self.get_parameter_state(comp, (OutArg,))
             output = {'timestamp': datetime.datetime.now().isoformat(), 'level': 'DEBUG', 'type': type,
-                      'component': component, 'ctx': ctx}
+                      'component': component, 'ctx': self.get_ctx_state(ctx)}
             self.write(output)
 
     def log_before_execution(self, comp, ctx):
         self._log(comp, ctx, 'before_execution')
 
     def log_after_execution(self, comp, ctx):
-        self._log(comp, ctx, 'after_execution')
\ No newline at end of file
+        self._log(comp, ctx, 'after_execution')
+
+
+class ComponentProfiler:
+    """
+    Measures the wall time, CPU time and number of calls of every component
+    executed by a SubGraphExecutor, per component id and per class. Enabled by
+    setting XIRCUITS_PROFILE to the report file (`xircuits run --profile`),
+    a `.csv` report is written as CSV and anything else as JSON.
+
+    Components running nested SubGraphExecutors (branches, loops, nested
+    workflows) include the time of their bodies, which are measured as
+    components of their own. Their self time leaves the bodies out. The
+    workflow itself is measured too, as the root of every stack. A CSV
+    report lists the components followed by the totals per class. The
+    self times are also written as collapsed stacks next to the report
+    (`.folded`), ready for flamegraph tools.
+    """
+    DEFAULT_REPORT = "xircuits_profile.json"
+
+    @classmethod
+    def enabled(cls):
+        return bool(os.getenv("XIRCUITS_PROFILE", None))
+
+    @classmethod
+    def get_profiler(cls):
+        if not hasattr(cls, "profiler"):
+            setattr(cls, "profiler", ComponentProfiler())
+        return cls.profiler
+
+    def __init__(self):
+        # Only profiled runs pay for these imports
+        import multiprocessing
+
+        report_file = os.getenv("XIRCUITS_PROFILE", "")
+        if report_file.lower() in ('1', 'true', 'yes', 'on'):
+            report_file = self.DEFAULT_REPORT
+        if multiprocessing.parent_process() is not None:
+            # Worker processes report next to the main process instead of over it
+            base, ext = os.path.splitext(report_file)
+            report_file = f"{base}.{os.getpid()}{ext}"
+        self.report_file = report_file
+        self.stats = {}
+        self.stacks = {}
+        self.lock = threading.Lock()
+        # A context variable rather than a thread local, so async tasks sharing a thread keep their own stacks
+        self.stack = contextvars.ContextVar('xircuits_profile_stack', default=())
+        atexit.register(self.write_report)
+
+    def start(self, comp):
+        name = comp.__class__.__name__
+        if comp.__id__ is not None:
+            name = f"{name} ({comp.__id__})"
+        # component, frame name, wall and cpu start, wall and cpu spent in nested components
+        frame = [comp, name, time.perf_counter(), time.thread_time(), 0.0, 0.0]
+        return self.stack.set(self.stack.get() + (frame,))
+
+    def stop(self, token):
+        wall_end = time.perf_counter()
+        cpu_end = time.thread_time()
+        stack = self.stack.get()
+        self.stack.reset(token)
+        path = ";".join(frame[1] for frame in stack)
+        comp, _, wall_start, cpu_start, nested_wall, nested_cpu = stack[-1]
+        wall = wall_end - wall_start
+        cpu = cpu_end - cpu_start
+        if len(stack) > 1:
+            stack[-2][4] += wall
+            stack[-2][5] += cpu
+
+        key = (comp.__id__, comp.__class__.__name__)
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = [0, 0.0, 0.0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += wall
+            stats[2] += cpu
+            stats[3] += wall - nested_wall
+            stats[4] += cpu - nested_cpu
+            self.stacks[path] = self.stacks.get(path, 0.0) + wall - nested_wall
+
+    def get_report(self):
+        with self.lock:
+            components = [{
+                'id': id,
+                'class': class_name,
+                'calls': calls,
+                'wall_time': wall,
+                'cpu_time': cpu,
+                'self_wall_time': self_wall,
+                'self_cpu_time': self_cpu
+            } for (id, class_name), (calls, wall, cpu, self_wall, self_cpu) in self.stats.items()]
+        components.sort(key=lambda c: c['self_wall_time'], reverse=True)
+
+        classes = {}
+        for c in components:
+            totals = classes.setdefault(c['class'], {'class': c['class'], 'calls': 0, 'wall_time': 0.0,
+                                                     'cpu_time': 0.0, 'self_wall_time': 0.0, 'self_cpu_time': 0.0})
+            for key in ('calls', 'wall_time', 'cpu_time', 'self_wall_time', 'self_cpu_time'):
+                totals[key] += c[key]
+        classes = sorted(classes.values(), key=lambda c: c['self_wall_time'], reverse=True)
+        return {'components': components, 'classes': classes}
+
+    def write_report(self):
+        if not self.stats:
+            return
+        report = self.get_report()
+        if self.report_file.lower().endswith('.csv'):
+            import csv
+            with open(self.report_file, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(report['components'][0].keys()))
+                writer.writeheader()
+                writer.writerows(report['components'])
+                csv.writer(f).writerow([])
+                writer = csv.DictWriter(f, fieldnames=list(report['classes'][0].keys()))
+                writer.writeheader()
+                writer.writerows(report['classes'])
+        else:
+            with open(self.report_file, 'w') as f:
+                json.dump(report, f, indent=2)
+
+        # Collapsed stacks with the self time in microseconds
+        folded_file = os.path.splitext(self.report_file)[0] + '.folded'
+        with open(folded_file, 'w') as f:
+            with self.lock:
+                stacks = sorted(self.stacks.items())
+            for path, self_wall in stacks:
+                f.write(f"{path} {int(self_wall * 1e6)}\n")
+
+        print(f"\nProfile written to {self.report_file} and {folded_file}", file=sys.stderr)
@@ -1,4 +1,6 @@
-from xai_components.base import InArg, OutArg, InCompArg, Component, BaseComponent, xai_component, dynalist, SubGraphExecutor
+import asyncio
+
+from xai_components.base import InArg, OutArg, InCompArg, Component, AsyncComponent, BaseComponent, xai_component, dynalist, SubGraphExecutor
 
 @xai_component(type='branch')
 class BranchComponent(Component):
@@ -316,4 +318,70 @@ class ExceptionHandler(Component):
         except Exception as e:
             self.exception.value = str(e)
             print(e)
-            SubGraphExecutor.do(self.handler, ctx)
\ No newline at end of file
+            SubGraphExecutor.do(self.handler, ctx)
+
+
+@xai_component(color='blue')
+class ConcurrentBranches(AsyncComponent):
+    """Runs up to four branches concurrently on one event loop and waits for all of them.
+
+    Async components in the branches overlap their waiting, which suits many
+    HTTP or LLM calls. Sync components are moved to a thread pool while other
+    branches are running. All branches share the same `ctx`.
+
+    ##### inPorts:
+    - max_concurrency (int): The maximum number of branches running at once. Unlimited by default.
+    - timeout (float): Seconds each branch may take before it is cancelled. No limit by default.
+        A sync component that is already running finishes in the background.
+
+    ##### outPorts:
+    - results (list): One entry per connected branch, in branch order: the output of the last
+        component of the branch. A single output is given as is, several as a dict by port name.
+        None if the branch failed.
+    - errors (list): One entry per connected branch: the error message, or None if it succeeded.
+
+    ##### Branches:
+    - branch_1: The first branch to run concurrently.
+    - branch_2: The second branch to run concurrently.
+    - branch_3: The third branch to run concurrently.
+    - branch_4: The fourth branch to run concurrently.
+    """
+    branch_1: BaseComponent
+    branch_2: BaseComponent
+    branch_3: BaseComponent
+    branch_4: BaseComponent
+
+    max_concurrency: InArg[int]
+    timeout: InArg[float]
+    results: OutArg[list]
+    errors: OutArg[list]
+
+    async def execute(self, ctx) -> None:
+        branches = [b for b in (self.branch_1, self.branch_2, self.branch_3, self.branch_4) if b is not None]
+        limit = asyncio.Semaphore(self.max_concurrency.value) if self.max_concurrency.value else None
+        timeout = self.timeout.value
+
+        async def run_branch(branch):
+            if limit is not None:
+                async with limit:
+                    return await asyncio.wait_for(branch.do_async(ctx, return_last=True), timeout)
+            return await asyncio.wait_for(branch.do_async(ctx, return_last=True), timeout)
+
+        outcomes = await asyncio.gather(*(run_branch(b) for b in branches), return_exceptions=True)
+
+        results = []
+        errors = []
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                message = f"Timed out after {timeout} seconds" if isinstance(outcome, asyncio.TimeoutError) else str(outcome)
+                print(message)
+                results.append(None)
+                errors.append(message)
+            else:
+                outputs = {} if outcome is None else \
+                    {key: port.value for key, port in vars(outcome).items() if isinstance(port, OutArg)}
+                results.append(next(iter(outputs.values())) if len(outputs) == 1 else (outputs or None))
+                errors.append(None)
+
+        self.results.value = results
+        self.errors.value = errors
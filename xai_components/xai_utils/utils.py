@@ -1,12 +1,22 @@
-from concurrent.futures import ProcessPoolExecutor
-from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from multiprocessing import get_context, shared_memory
+from copy import deepcopy
 
 import dill
 
-from xai_components.base import InArg, OutArg, InCompArg, Component, xai_component, secret, dynalist, dynatuple, BaseComponent, SubGraphExecutor
+from xai_components.base import InArg, OutArg, InCompArg, Component, xai_component, secret, dynalist, dynatuple, BaseComponent, SubGraphExecutor, body_components, body_inputs, port_source, run_async, on_run_finished
 
+import asyncio
+import atexit
+import importlib
+import io
+import itertools
 import os
 import sys
+import threading
+from collections import ChainMap, OrderedDict, deque
 from pathlib import Path
 import time
 import datetime
@@ -699,6 +709,9 @@ class RunParallelThread(Component):
     
     ##### inPorts:
     - n_workers (int): The number of worker threads to use for executing the body in parallel.
+    - copy_strategy (str): How each run gets its body and context. `deepcopy` (default) copies both.
+        `copy_on_write` shares the context values and the values the body reads from outside;
+        keys the body sets in the context stay its own.
     
     ##### outPorts:
     - futures (list): All futures created by this component.
@@ -707,6 +720,7 @@ class RunParallelThread(Component):
     - body: The body to be executed in parallel.
     """
     n_workers: InArg[int]
+    copy_strategy: InArg[str]
     futures: OutArg[list]
     body: BaseComponent
 
@@ -717,15 +731,18 @@ class RunParallelThread(Component):
     
     def execute(self, ctx) -> None:
         from concurrent.futures import ThreadPoolExecutor
-        from copy import deepcopy
         
+        copy_strategy = check_copy_strategy(self.copy_strategy.value)
         if self.executor is None:
             self.executor = ThreadPoolExecutor(max_workers=self.n_workers.value)
 
         def execute_body(body, ctx):
             SubGraphExecutor(body).do(ctx)
         
-        x = self.executor.submit(execute_body, deepcopy(self.body), deepcopy(ctx))
+        if copy_strategy == 'copy_on_write':
+            x = self.executor.submit(execute_body, copy_body(self.body), ChainMap({}, ctx))
+        else:
+            x = self.executor.submit(execute_body, deepcopy(self.body), deepcopy(ctx))
 
         # Enforce that any exceptions are logged
         x.add_done_callback(lambda x: x.result())
@@ -744,13 +761,434 @@ def run_body_serialized(payload):
     SubGraphExecutor(body).do(ctx)
 
 
+COPY_STRATEGIES = ('deepcopy', 'copy_on_write')
+
+# Pickled values at least this large are passed through shared memory
+SHARED_MEMORY_THRESHOLD = 1 << 20
+
+_value_tokens = itertools.count()
+
+
+def check_copy_strategy(copy_strategy):
+    copy_strategy = copy_strategy or 'deepcopy'
+    if copy_strategy not in COPY_STRATEGIES:
+        raise ValueError(f"Unknown copy strategy {copy_strategy!r}, expected one of {', '.join(COPY_STRATEGIES)}")
+    return copy_strategy
+
+
+def copy_body(body, memo=None):
+    """
+    Copies a body for one parallel task. The values it reads from outside
+    are shared instead of copied, unless `memo` already maps their ports.
+    Afterwards `memo` maps every copied port to its copy.
+    """
+    memo = {} if memo is None else memo
+    for port in body_inputs(body):
+        if id(port) not in memo:
+            memo[id(port)] = OutArg(port.value)
+    return deepcopy(body, memo)
+
+
+class _BodyPickler(dill.Pickler):
+    # Leaves the ports the body reads from outside out of the template
+    def __init__(self, file, inputs):
+        super().__init__(file)
+        self.input_ids = {id(port): i for i, port in enumerate(inputs)}
+
+    def persistent_id(self, obj):
+        return self.input_ids.get(id(obj))
+
+
+class _BodyUnpickler(dill.Unpickler):
+    def __init__(self, file, inputs):
+        super().__init__(file)
+        self.inputs = inputs
+
+    def persistent_load(self, pid):
+        return self.inputs[pid]
+
+
+def _encode_value(value):
+    """
+    Serializes a value for copy_on_write process tasks as (kind, size, data).
+    Bytes and large NumPy arrays are passed on as they are, anything else
+    is pickled.
+    """
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and type(value) is numpy.ndarray and not value.dtype.hasobject \
+            and value.nbytes >= SHARED_MEMORY_THRESHOLD:
+        return ('ndarray', value.dtype, value.shape), value.nbytes, value
+    if type(value) is bytes:
+        return ('bytes',), len(value), value
+    value = dill.dumps(value)
+    return ('pickle',), len(value), value
+
+
+def _decode_value(entry, opened):
+    # Returns (value, segment), the segment stays open while the value uses it
+    _, name, offset, size, kind = entry
+    if kind[0] == 'ndarray':
+        segment = shared_memory.SharedMemory(name=name)
+        numpy = importlib.import_module('numpy')
+        value = numpy.ndarray(kind[2], kind[1], buffer=segment.buf)
+        # The array is shared with the other workers
+        value.flags.writeable = False
+        return value, segment
+    segment = opened.get(name)
+    if segment is None:
+        segment = opened[name] = shared_memory.SharedMemory(name=name)
+    view = segment.buf[offset:offset + size]
+    try:
+        value = bytes(view) if kind[0] == 'bytes' else dill.loads(view)
+    finally:
+        view.release()
+    return value, None
+
+
+class _BodyValues:
+    # The template of one body and the values last passed on to it, by id
+    def __init__(self, body, result):
+        self.body = body
+        self.result = result
+        self.key = f"{os.getpid()}-{next(_value_tokens)}"
+        self.inputs = body_inputs(body)
+        self.template = None
+        self.values = {}
+
+
+class _TaskValues:
+    """
+    The bodies and values of the copy_on_write tasks sent to one worker
+    pool. A body is pickled once as a template without the ports it reads
+    from outside, and a value again only when another object takes its
+    place. Both are written to shared memory, the values a task adds share
+    a segment and large ones get their own, so a task only passes on where
+    its values are. Every body keeps its own values, and so do the workers
+    (see `_load_task`), so bodies sharing the pool do not push out each
+    other's values. A segment is released once no pending task and no kept
+    value uses it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bodies = {}
+        # Segment name -> [segment, pending tasks, kept values]
+        self.segments = {}
+
+    def encode_task(self, body, ctx, result=None, item_ports=()):
+        """
+        Returns the task arguments, the positions of `item_ports` among the
+        body inputs and the shared memory segments the task uses. The task
+        reads `result` back, and the values of `item_ports` are left out to
+        be set for every item.
+        """
+        with self.lock:
+            key = (id(body), id(result))
+            cached = self.bodies.get(key)
+            if cached is None or cached.body is not body or cached.result is not result:
+                if cached is not None:
+                    self._forget(cached, cached.values)
+                    self._release(cached.template[1][1], kept=1)
+                cached = self.bodies[key] = _BodyValues(body, result)
+            inputs = cached.inputs
+
+            added = []
+            if cached.template is None:
+                buffer = io.BytesIO()
+                _BodyPickler(buffer, inputs).dump((body, result))
+                cached.template = [buffer.getvalue(), None]
+                added.append(cached.template)
+
+            live = set()
+
+            def keep(value):
+                live.add(id(value))
+                kept = cached.values.get(id(value))
+                if kept is None or kept[0] is not value:
+                    if kept is not None:
+                        self._release(kept[1][1], kept=1)
+                    kept = cached.values[id(value)] = [value, None]
+                    added.append(kept)
+                return kept
+
+            kept_inputs = [None if any(port is item_port for item_port in item_ports)
+                           else keep(port.value) for port in inputs]
+            kept_ctx = [(key, keep(value)) for key, value in ctx.items()]
+            self._write(added, template=cached.template)
+
+            # Forget the values no longer passed on to this body
+            self._forget(cached, [value_id for value_id in cached.values if value_id not in live])
+
+            entries = [cached.template[1]] + [kept[1] for kept in kept_inputs if kept is not None] + \
+                [kept[1] for _, kept in kept_ctx]
+            segments = list({entry[1] for entry in entries})
+            for name in segments:
+                self.segments[name][1] += 1
+
+        task = ((cached.key, cached.template[1]),
+                [kept[1] if kept is not None else None for kept in kept_inputs],
+                [(key, kept[1]) for key, kept in kept_ctx])
+        item_inputs = [next((i for i, port in enumerate(inputs) if port is item_port), None)
+                       for item_port in item_ports]
+        return task, item_inputs, segments
+
+    def _write(self, added, template):
+        # Writes the values added by a task, small ones together in one segment
+        packed, offset = [], 0
+        for kept in added:
+            if kept is template:
+                kind, size, data = ('bytes',), len(kept[0]), kept[0]
+            else:
+                kind, size, data = _encode_value(kept[0])
+            if size >= SHARED_MEMORY_THRESHOLD:
+                self._write_segment([(kept, kind, size, data, 0)], size)
+            else:
+                packed.append((kept, kind, size, data, offset))
+                offset += size
+        if packed:
+            self._write_segment(packed, offset)
+        # Only the values are needed to tell whether they changed
+        template[0] = None
+
+    def _write_segment(self, values, size):
+        # A segment cannot be empty
+        segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.segments[segment.name] = [segment, 0, len(values)]
+        for kept, kind, size, data, offset in values:
+            if kind[0] == 'ndarray':
+                numpy = sys.modules['numpy']
+                numpy.ndarray(data.shape, data.dtype, buffer=segment.buf)[...] = data
+            else:
+                segment.buf[offset:offset + size] = data
+            kept[1] = (f"{os.getpid()}-{next(_value_tokens)}", segment.name, offset, size, kind)
+
+    def _forget(self, cached, value_ids):
+        for value_id in list(value_ids):
+            self._release(cached.values.pop(value_id)[1][1], kept=1)
+
+    def task_done(self, segments):
+        with self.lock:
+            for name in segments:
+                self._release(name, tasks=1)
+
+    def _release(self, name, tasks=0, kept=0):
+        segment = self.segments.get(name)
+        if segment is None:
+            return
+        segment[1] -= tasks
+        segment[2] -= kept
+        if segment[1] <= 0 and segment[2] <= 0:
+            del self.segments[name]
+            segment[0].close()
+            segment[0].unlink()
+
+    def close(self):
+        with self.lock:
+            for segment, _, _ in self.segments.values():
+                segment.close()
+                segment.unlink()
+            self.segments.clear()
+            self.bodies.clear()
+
+
+# The values each worker loaded for the bodies it ran last, by body and token
+_worker_bodies = OrderedDict()
+
+# Bodies a worker keeps the values of
+WORKER_CACHED_BODIES = 16
+
+
+def _drop_worker_values(items):
+    for value, segment in items:
+        del value
+        if segment is not None:
+            try:
+                segment.close()
+            except BufferError:
+                # Something kept a reference to the array
+                pass
+
+
+def _load_task(body_entry, input_entries, ctx_entries):
+    # Values this worker already loaded for the body are reused, only new tokens are read from shared memory
+    body_key, template_entry = body_entry
+    previous = _worker_bodies.pop(body_key, {})
+    loaded = {}
+    opened = {}
+
+    def load(entry):
+        if entry is None:
+            return None
+        item = loaded.get(entry[0]) or previous.get(entry[0])
+        if item is None:
+            item = _decode_value(entry, opened)
+        loaded[entry[0]] = item
+        return item[0]
+
+    try:
+        template = load(template_entry)
+        inputs = [OutArg(load(entry)) for entry in input_entries]
+        ctx = {key: load(entry) for key, entry in ctx_entries}
+    finally:
+        for segment in opened.values():
+            segment.close()
+    body, result = _BodyUnpickler(io.BytesIO(template), inputs).load()
+
+    _worker_bodies[body_key] = loaded
+    _drop_worker_values([previous.pop(token) for token in list(previous) if token not in loaded])
+    while len(_worker_bodies) > WORKER_CACHED_BODIES:
+        _, values = _worker_bodies.popitem(last=False)
+        _drop_worker_values(values.values())
+    return body, result, inputs, ctx
+
+
+def run_body_shared(body_entry, input_entries, ctx_entries):
+    """
+    Runs a body sent by a copy_on_write RunParallelProcess. Values this
+    worker already loaded for the body are reused, so they are shared by
+    the runs of the body in the same worker.
+    """
+    body, _, _, ctx = _load_task(body_entry, input_entries, ctx_entries)
+    SubGraphExecutor(body).do(ctx)
+
+
+def map_body_shared(body_entry, input_entries, ctx_entries, item_inputs, start, items):
+    """
+    Runs a body sent by ParallelForEach once per item of a chunk and returns
+    the values of its result port.
+    """
+    body, result, inputs, ctx = _load_task(body_entry, input_entries, ctx_entries)
+    item_input, index_input = item_inputs
+    results = []
+    for index, item in enumerate(items, start):
+        if item_input is not None:
+            inputs[item_input].value = item
+        if index_input is not None:
+            inputs[index_input].value = index
+        SubGraphExecutor(body).do(ChainMap({}, ctx))
+        results.append(result.value if result is not None else None)
+    return results
+
+
+_process_pool = None
+# Pools replaced by a larger one, still finishing their tasks
+_retired_pools = []
+_process_pool_lock = threading.Lock()
+
+
+def _import_modules(modules):
+    """Worker initializer: imports the component modules before the first task arrives."""
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            # The task itself reports the error if it really needs the module
+            pass
+
+
+def component_modules(component):
+    """
+    Returns the modules defining the components of a body, following `next`
+    and the nested branches. Components defined in `__main__` are left out,
+    dill sends those by value.
+    """
+    modules = {'xai_components.base'}
+    for comp in body_components(component):
+        module = type(comp).__module__
+        if module != '__main__':
+            modules.add(module)
+    return sorted(modules)
+
+
+def get_process_pool(n_workers=None, preload=()):
+    """
+    Returns the worker process pool shared by all parallel process components
+    of this run, creating it on first use.
+
+    A caller asking for more workers than the pool has gets a new, larger
+    pool. The old one finishes its pending tasks and is shut down with it
+    when the workflow run finishes. Workers are forked from a forkserver that
+    has already imported the `preload` modules, or spawned where forkserver
+    is not available, in which case they import the modules once at startup.
+    """
+    global _process_pool
+    n_workers = n_workers or os.cpu_count()
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool.n_workers < n_workers:
+            _retired_pools.append(_process_pool)
+            _process_pool.shutdown(wait=False)
+            _process_pool = None
+        if _process_pool is None:
+            preload = list(preload)
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                mp_context = get_context('forkserver')
+                # Only takes effect if this process has not started its forkserver yet
+                mp_context.set_forkserver_preload(['dill'] + preload)
+                on_run_finished(_stop_forkserver)
+            else:
+                mp_context = get_context('spawn')
+            _process_pool = ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=mp_context,
+                initializer=_import_modules,
+                initargs=(preload,)
+            )
+            _process_pool.n_workers = n_workers
+            _process_pool.task_values = _TaskValues()
+            on_run_finished(shutdown_process_pool)
+            # Scripts using the pool outside of a compiled workflow never finish a run
+            atexit.register(shutdown_process_pool)
+        return _process_pool
+
+
+def shutdown_process_pool(wait=True):
+    """Shuts the shared worker process pools down. The next parallel run starts a new one."""
+    global _process_pool
+    with _process_pool_lock:
+        pools = _retired_pools + ([_process_pool] if _process_pool is not None else [])
+        _retired_pools.clear()
+        _process_pool = None
+    atexit.unregister(shutdown_process_pool)
+    for pool in pools:
+        pool.shutdown(wait=wait)
+        pool.task_values.close()
+
+
+def _stop_forkserver():
+    # Called once the pools are shut down, so the next run starts a forkserver preloading its own modules
+    from multiprocessing import forkserver
+    stop = getattr(forkserver._forkserver, '_stop', None)
+    if stop is not None:
+        stop()
+
+
+def _discard_process_pool(pool):
+    # A worker of the pool died, so the next caller starts over with a fresh pool
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+    pool.task_values.close()
+
+
 @xai_component(color='blue')
 class RunParallelProcess(Component):
     """
     Executes a given body in separate processes using multiprocessing and dill.
 
+    The worker processes are shared by all RunParallelProcess components of
+    the workflow and kept for later runs until AwaitFutures shuts them down or
+    the workflow finishes.
+
     ##### inPorts:
     - n_workers (int): Number of worker processes to use for executing the body in parallel.
+        Defaults to the number of CPUs. The pool grows when a run asks for more workers.
+    - copy_strategy (str): How each run gets its body and context. `deepcopy` (default) copies and
+        pickles both for every run. `copy_on_write` pickles the body once and a context value only
+        when another object takes its place, so mutate nothing in place. Both go through shared
+        memory and the workers keep what they loaded, so a run only passes on the values that
+        changed. Large NumPy arrays arrive read-only. Runs in the same worker share the context values.
 
     ##### outPorts:
     - futures (list): Futures representing parallel executions.
@@ -759,6 +1197,7 @@ class RunParallelProcess(Component):
     - body: The body (subgraph) to be run in each process.
     """
     n_workers: InArg[int]
+    copy_strategy: InArg[str]
     futures: OutArg[list]
     body: BaseComponent
 
@@ -767,31 +1206,192 @@ class RunParallelProcess(Component):
         self.futures.value = []
 
     def execute(self, ctx) -> None:
-        from copy import deepcopy
-
-        ctx_mp = get_context("spawn")
-        executor = ProcessPoolExecutor(max_workers=self.n_workers.value, mp_context=ctx_mp)
-
-        # Serialize the work
-        payload = dill.dumps((deepcopy(self.body), deepcopy(ctx)))
-        future = executor.submit(run_body_serialized, payload)
+        copy_strategy = check_copy_strategy(self.copy_strategy.value)
+        if copy_strategy == 'deepcopy':
+            # Serialize the work
+            payload = dill.dumps((deepcopy(self.body), deepcopy(ctx)))
+
+        for attempt in range(2):
+            executor = get_process_pool(self.n_workers.value, component_modules(self.body))
+            try:
+                if copy_strategy == 'deepcopy':
+                    future = executor.submit(run_body_serialized, payload)
+                else:
+                    task, _, segments = executor.task_values.encode_task(self.body, ctx)
+                    future = executor.submit(run_body_shared, *task)
+                    future.add_done_callback(lambda x, values=executor.task_values: values.task_done(segments))
+                break
+            except BrokenProcessPool:
+                if attempt:
+                    raise
+                _discard_process_pool(executor)
         future.add_done_callback(lambda x: x.result())
 
         self.futures.value.append(future)
 
 
+PARALLEL_BACKENDS = ('thread', 'process', 'async')
+
+
+@xai_component(type='branch')
+class ParallelForEach(Component):
+    """Runs the body for the items of a list in parallel and collects a result per item, in order.
+
+    Every chunk of items runs on its own copy of the body, so workers never share
+    `current_item` and `current_index`. Keys the body sets in the context stay its
+    own, the other context values are shared.
+
+    ##### inPorts:
+    - items (list): The items to iterate over. Any iterable works, it is read as the workers catch up.
+    - result (any): Connect the body output to collect for every item.
+    - backend (str): `thread` (default), `process` or `async`. Processes use the worker pool shared
+        with RunParallelProcess, so the body, the context values and the results have to be picklable.
+        `async` runs the chunks concurrently on the workflow's event loop.
+    - n_workers (int): The number of chunks running at once. Defaults to the number of CPUs.
+    - chunk_size (int): The number of items a worker runs in a row on the same body copy. Defaults to 1.
+    - max_pending (int): The number of chunks submitted ahead of the oldest unfinished one.
+        Defaults to twice the number of workers.
+
+    ##### outPorts:
+    - current_item (any): The item the body runs for.
+    - current_index (int): The index of the item the body runs for.
+    - results (list): The value of `result` for every item, in the order of the items.
+
+    ##### Branches:
+    - body: Branch that executes for each item.
+    """
+    body: BaseComponent
+    items: InCompArg[list]
+    result: InArg[any]
+    backend: InArg[str]
+    n_workers: InArg[int]
+    chunk_size: InArg[int]
+    max_pending: InArg[int]
+    current_item: OutArg[any]
+    current_index: OutArg[int]
+    results: OutArg[list]
+
+    def execute(self, ctx) -> None:
+        backend = self.backend.value or 'thread'
+        if backend not in PARALLEL_BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(PARALLEL_BACKENDS)}")
+        n_workers = self.n_workers.value or os.cpu_count()
+        max_pending = self.max_pending.value or 2 * n_workers
+        chunks = self._chunks(self.chunk_size.value or 1)
+
+        if backend == 'async':
+            self.results.value = run_async(self._map_async(chunks, ctx, n_workers, max_pending))
+        elif backend == 'thread':
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                self.results.value = self._map(
+                    chunks, max_pending,
+                    lambda start, chunk: executor.submit(self._run_chunk, start, chunk, ctx)
+                )
+        else:
+            executor = get_process_pool(n_workers, component_modules(self.body))
+            result = port_source(self.result)
+
+            def submit(start, chunk):
+                task, item_inputs, segments = executor.task_values.encode_task(
+                    self.body, ctx, result, (self.current_item, self.current_index))
+                future = executor.submit(map_body_shared, *task, item_inputs, start, chunk)
+                future.add_done_callback(lambda x, values=executor.task_values: values.task_done(segments))
+                return future
+
+            self.results.value = self._map(chunks, max_pending, submit)
+
+    def _chunks(self, chunk_size):
+        items = iter(self.items.value)
+        start = 0
+        while True:
+            chunk = list(itertools.islice(items, chunk_size))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk)
+
+    @staticmethod
+    def _map(chunks, max_pending, submit):
+        results = []
+        pending = deque()
+        try:
+            for start, chunk in chunks:
+                if len(pending) >= max_pending:
+                    # Read no further ahead until the oldest chunk is done
+                    results.extend(pending.popleft().result())
+                pending.append(submit(start, chunk))
+            while pending:
+                results.extend(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+        return results
+
+    async def _map_async(self, chunks, ctx, n_workers, max_pending):
+        limit = asyncio.Semaphore(n_workers)
+
+        async def run_chunk(start, chunk):
+            async with limit:
+                body, item, index, result = self._copy_body()
+                results = []
+                for i, value in enumerate(chunk, start):
+                    item.value = value
+                    index.value = i
+                    await body.do_async(ChainMap({}, ctx))
+                    results.append(result.value if result is not None else None)
+                return results
+
+        results = []
+        pending = deque()
+        try:
+            for start, chunk in chunks:
+                if len(pending) >= max_pending:
+                    results.extend(await pending.popleft())
+                pending.append(asyncio.ensure_future(run_chunk(start, chunk)))
+            while pending:
+                results.extend(await pending.popleft())
+        finally:
+            for task in pending:
+                task.cancel()
+        return results
+
+    def _copy_body(self):
+        # The copy reads the item and index from ports of its own
+        item, index = OutArg(), OutArg()
+        memo = {id(self.current_item): item, id(self.current_index): index}
+        body = copy_body(self.body, memo)
+        source = port_source(self.result)
+        result = memo.get(id(source), source) if source is not None else None
+        return body, item, index, result
+
+    def _run_chunk(self, start, chunk, ctx):
+        body, item, index, result = self._copy_body()
+        results = []
+        for i, value in enumerate(chunk, start):
+            item.value = value
+            index.value = i
+            SubGraphExecutor(body).do(ChainMap({}, ctx))
+            results.append(result.value if result is not None else None)
+        return results
+
+
 @xai_component(color='blue')
 class AwaitFutures(Component):
     """Waits for a list of futures to complete.
     
     ##### inPorts:
     - futures (list): The list of futures to wait for.
+    - shutdown_workers (bool): Shut the shared worker processes down once the futures are done.
+        They are kept for later parallel runs otherwise, and shut down when the workflow finishes.
     """
     futures: InCompArg[list]
+    shutdown_workers: InArg[bool]
 
     def execute(self, ctx) -> None:
         from concurrent.futures import wait
         wait(self.futures.value)
+        if self.shutdown_workers.value:
+            shutdown_process_pool()
 
 @xai_component
 class GetEnvVar(Component):
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from xircuits._version import __version__
+from xircuits.utils.pathing import resolve_working_dir
+
+CACHE_DIR_NAME = "compile_cache"
+
+# Entries kept at most, for outputs that are no longer compiled, e.g. of deleted workflows
+MAX_ENTRIES = 256
+
+_compiler_fingerprint = None
+
+
+def compiler_fingerprint():
+    """
+    Identify the compiler that produced a cached module: the package version plus
+    a digest of the compiler sources, so editable installs never serve stale output.
+    """
+    global _compiler_fingerprint
+    if _compiler_fingerprint is None:
+        digest = hashlib.sha256(__version__.encode("utf-8"))
+        for source in sorted(Path(__file__).parent.glob("*.py")):
+            digest.update(source.read_bytes())
+        _compiler_fingerprint = digest.hexdigest()
+    return _compiler_fingerprint
+
+
+def default_cache_dir():
+    """
+    Cache location inside the working directory's `.xircuits/` folder.
+    Returns None when no initialized working directory can be found.
+    """
+    working_dir = resolve_working_dir()
+    if working_dir is None or not (working_dir / ".xircuits").is_dir():
+        return None
+    return working_dir / ".xircuits" / CACHE_DIR_NAME
+
+
+class CompileCache:
+    """
+    Persistent store of generated workflow modules keyed by everything that
+    influences code generation: the workflow source, the component python
+    paths, the output module name and the compiler itself.
+
+    Keys start with a digest of the output file, and an output keeps only
+    its latest entry. The oldest entries go beyond MAX_ENTRIES.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+
+    def key(self, input_file_path, output_file_path, component_python_paths, schedule='dynamic', lazy_imports=False):
+        digest = hashlib.sha256()
+        digest.update(compiler_fingerprint().encode("utf-8"))
+        digest.update(schedule.encode("utf-8"))
+        digest.update(b"lazy" if lazy_imports else b"eager")
+        # The flow class name is derived from the output file name
+        digest.update(os.path.basename(output_file_path).encode("utf-8"))
+        digest.update(json.dumps(component_python_paths, sort_keys=True).encode("utf-8"))
+        with open(input_file_path, "rb") as f:
+            digest.update(f.read())
+        return f"{self._output_slot(output_file_path)}-{digest.hexdigest()}"
+
+    @staticmethod
+    def _output_slot(output_file_path):
+        return hashlib.sha256(os.path.abspath(output_file_path).encode("utf-8")).hexdigest()[:16]
+
+    def get(self, key):
+        try:
+            return (self.cache_dir / (key + ".py")).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, key, code):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(code)
+            os.replace(tmp_path, self.cache_dir / (key + ".py"))
+            self._evict(key)
+        except OSError as e:
+            # A cache that cannot be written must never fail the compilation
+            print(f"Warning: could not write compile cache: {e}")
+
+    def _evict(self, key):
+        slot = key.split("-", 1)[0]
+        entries = []
+        for path in self.cache_dir.glob("*.py"):
+            try:
+                if path.stem != key and path.stem.startswith(slot + "-"):
+                    path.unlink()
+                else:
+                    entries.append((path.stat().st_mtime, path))
+            except OSError:
+                # Removed by a concurrent compile
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[MAX_ENTRIES:]:
+            try:
+                path.unlink()
+            except OSError:
+                continue
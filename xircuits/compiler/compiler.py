@@ -1,41 +1,73 @@
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
 from xircuits.compiler.parser import XircuitsFileParser
 from xircuits.compiler.generator import CodeGenerator
+from xircuits.compiler.cache import CompileCache, default_cache_dir
 
-def compile(input_file_path, output_file_path, component_python_paths=None):
-    if component_python_paths is None:
-        component_python_paths = {}
+# Spawning compile workers costs more than compiling a handful of small workflows,
+# so a dependency level only goes to the process pool once it is at least this wide.
+PARALLEL_COMPILE_THRESHOLD = 8
+
+def parse_workflow(input_file_path):
     parser = XircuitsFileParser()
     with open(input_file_path, 'r', encoding='utf-8') as in_f:
-        graph = parser.parse(in_f)
-    generator = CodeGenerator(graph, component_python_paths)
-    with open(output_file_path, 'w', encoding='utf-8') as out_f:
-        generator.generate(out_f)
+        return parser.parse(in_f)
 
-def recursive_compile(input_file_path, output_file_path=None, component_python_paths=None, visited_files=None, base_dir=None):
+def compile(input_file_path, output_file_path, component_python_paths=None, use_cache=True, load_graph=parse_workflow,
+            schedule='dynamic', lazy_imports=False):
+    """
+    Compile a single workflow into a python module.
+
+    `load_graph` turns the workflow path into the parsed graph; callers that keep
+    parsed graphs around (e.g. the Jupyter server extension) can supply their own.
+    `schedule` selects how the generated flow runs its components, see CodeGenerator.
+    `lazy_imports` defers creating the components of each flow, and importing their modules, until the flow runs.
+    """
     if component_python_paths is None:
         component_python_paths = {}
-    if visited_files is None:
-        visited_files = set()
-        
-    input_file_path = os.path.abspath(input_file_path)
-    
-    if base_dir is None:
-        base_dir = os.path.dirname(input_file_path)
 
-    if input_file_path in visited_files:
-        return
+    cache = None
+    if use_cache:
+        cache_dir = default_cache_dir()
+        if cache_dir is not None:
+            cache = CompileCache(cache_dir)
 
-    visited_files.add(input_file_path)
+    if cache is not None:
+        cache_key = cache.key(input_file_path, output_file_path, component_python_paths, schedule, lazy_imports)
+        cached_code = cache.get(cache_key)
+        if cached_code is not None:
+            with open(output_file_path, 'w', encoding='utf-8') as out_f:
+                out_f.write(cached_code)
+            return
 
-    try:
-        with open(input_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"Error reading {input_file_path}: {e}")
-        return
+    graph = load_graph(input_file_path)
+    generator = CodeGenerator(graph, component_python_paths, schedule, lazy_imports)
+    with open(output_file_path, 'w', encoding='utf-8') as out_f:
+        generator.generate(out_f)
+
+    if cache is not None:
+        with open(output_file_path, 'r', encoding='utf-8') as out_f:
+            cache.put(cache_key, out_f.read())
+
+def _resolve_subworkflow(py_path, input_file_path, base_dir):
+    candidate_py = os.path.normpath(os.path.join(os.path.dirname(input_file_path), py_path))
+    candidate = candidate_py.replace('.py', '.xircuits')
 
+    if not os.path.exists(candidate):
+        candidate_py = os.path.normpath(os.path.join(base_dir, py_path))
+        candidate = candidate_py.replace('.py', '.xircuits')
+        if not os.path.exists(candidate):
+            candidate_py = os.path.normpath(os.path.join(os.path.dirname(input_file_path), os.path.basename(py_path)))
+            candidate = candidate_py.replace('.py', '.xircuits')
+            if not os.path.exists(candidate):
+                candidate = None
+    return candidate
+
+def _find_subworkflows(data, input_file_path, base_dir):
+    subworkflows = []
     if 'layers' in data:
         for layer in data['layers']:
             if 'models' in layer and isinstance(layer['models'], dict):
@@ -44,27 +76,148 @@ def recursive_compile(input_file_path, output_file_path=None, component_python_p
                     if extras.get('type') == "xircuits_workflow":
                         py_path = extras.get('path')
                         if py_path:
-                            candidate_py = os.path.normpath(os.path.join(os.path.dirname(input_file_path), py_path))
-                            candidate = candidate_py.replace('.py', '.xircuits')
-                            
-                            if not os.path.exists(candidate):
-                                candidate_py = os.path.normpath(os.path.join(base_dir, py_path))
-                                candidate = candidate_py.replace('.py', '.xircuits')
-                                if not os.path.exists(candidate):
-                                    candidate_py = os.path.normpath(os.path.join(os.path.dirname(input_file_path), os.path.basename(py_path)))
-                                    candidate = candidate_py.replace('.py', '.xircuits')
-                                    if not os.path.exists(candidate):
-                                        candidate = None
-                            
+                            candidate = _resolve_subworkflow(py_path, input_file_path, base_dir)
                             if candidate:
-                                recursive_compile(candidate, output_file_path=None, 
-                                                  component_python_paths=component_python_paths, 
-                                                  visited_files=visited_files, base_dir=base_dir)
-    py_output_path = output_file_path if output_file_path else input_file_path.replace('.xircuits', '.py')
+                                subworkflows.append(os.path.abspath(candidate))
+    return subworkflows
+
+def build_workflow_graph(input_file_path, base_dir=None, visited_files=None):
+    """
+    Read every workflow reachable from `input_file_path` exactly once and return
+    a list of (workflow path, sub-workflow paths) in dependency order, i.e. every
+    sub-workflow is listed before the workflows that use it.
+    Unreadable workflows are reported and left out, as are already visited ones.
+    """
+    input_file_path = os.path.abspath(input_file_path)
+    if base_dir is None:
+        base_dir = os.path.dirname(input_file_path)
+    if visited_files is None:
+        visited_files = set()
+
+    ordered = []
+
+    def visit(path):
+        if path in visited_files:
+            return
+        visited_files.add(path)
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error reading {path}: {e}")
+            return
+
+        children = _find_subworkflows(data, path, base_dir)
+        for child in children:
+            visit(child)
+        ordered.append((path, children))
+
+    visit(input_file_path)
+    return ordered
+
+def _schedule_levels(ordered):
+    # A workflow's level is one more than the deepest sub-workflow it uses, so
+    # all workflows on the same level are independent of each other.
+    levels = {}
+    for path, children in ordered:
+        levels[path] = 1 + max((levels[c] for c in children if c in levels), default=-1)
+    grouped = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+    for path, _ in ordered:
+        grouped[levels[path]].append(path)
+    return grouped
+
+def _is_up_to_date(cache, input_file_path, py_output_path, component_python_paths, schedule, lazy_imports):
+    # A compiled module is only trusted when it is newer than its source and is
+    # exactly what the cache holds for the current compile inputs, so changed
+    # component python paths, schedules or compilers are never skipped.
+    if cache is None:
+        return False
     try:
-        compile(input_file_path, py_output_path, component_python_paths=component_python_paths)
-        print(f"Compiled {input_file_path} to {py_output_path}")
+        if os.path.getmtime(py_output_path) < os.path.getmtime(input_file_path):
+            return False
+        cached_code = cache.get(cache.key(input_file_path, py_output_path, component_python_paths, schedule, lazy_imports))
+        if cached_code is None:
+            return False
+        with open(py_output_path, 'r', encoding='utf-8') as f:
+            return f.read() == cached_code
+    except OSError:
+        return False
+
+def recursive_compile(input_file_path, output_file_path=None, component_python_paths=None, visited_files=None, base_dir=None, use_cache=True, max_workers=None, load_graph=parse_workflow,
+                      schedule='dynamic', lazy_imports=False):
+    """
+    Compile a workflow together with every nested `xircuits_workflow` it references.
+
+    Sub-workflows are compiled before the workflows that use them. Independent
+    sub-workflows are compiled in parallel on a process pool of up to
+    `max_workers` processes (defaults to the CPU count, 1 compiles serially)
+    once there are at least PARALLEL_COMPILE_THRESHOLD of them.
+    Sub-workflows whose compiled .py is newer than their source and matches the
+    compile cache for the current inputs are skipped; `use_cache=False` compiles all.
+    """
+    if component_python_paths is None:
+        component_python_paths = {}
+
+    input_file_path = os.path.abspath(input_file_path)
+    ordered = build_workflow_graph(input_file_path, base_dir=base_dir, visited_files=visited_files)
+
+    def output_path_for(path):
+        if path == input_file_path and output_file_path:
+            return output_file_path
+        return path.replace('.xircuits', '.py')
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    cache = None
+    if use_cache:
+        cache_dir = default_cache_dir()
+        if cache_dir is not None:
+            cache = CompileCache(cache_dir)
+
+    executor = None
+    try:
+        for level in _schedule_levels(ordered):
+            pending = []
+            for path in level:
+                py_output_path = output_path_for(path)
+                if path != input_file_path and _is_up_to_date(cache, path, py_output_path, component_python_paths,
+                                                              schedule, lazy_imports):
+                    print(f"Skipped {path}: {py_output_path} is up to date")
+                else:
+                    pending.append((path, py_output_path))
+
+            if len(pending) >= PARALLEL_COMPILE_THRESHOLD and max_workers > 1:
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=min(max_workers, len(pending)),
+                                                   mp_context=get_context("spawn"))
+                futures = [executor.submit(compile, path, py_output_path, component_python_paths, use_cache,
+                                           schedule=schedule, lazy_imports=lazy_imports)
+                           for path, py_output_path in pending]
+                results = []
+                for future in futures:
+                    try:
+                        future.result()
+                        results.append(None)
+                    except Exception as e:
+                        results.append(e)
+            else:
+                results = []
+                for path, py_output_path in pending:
+                    try:
+                        compile(path, py_output_path, component_python_paths=component_python_paths, use_cache=use_cache,
+                                load_graph=load_graph, schedule=schedule, lazy_imports=lazy_imports)
+                        results.append(None)
+                    except Exception as e:
+                        results.append(e)
 
-    except Exception as e:
-        print(f"Failed to compile {input_file_path}: {e}")
-        raise ValueError(f"Compilation failed for {input_file_path}. Check your inputs and try again.")
+            for (path, py_output_path), error in zip(pending, results):
+                if error is None:
+                    print(f"Compiled {path} to {py_output_path}")
+                else:
+                    print(f"Failed to compile {path}: {error}")
+                    raise ValueError(f"Compilation failed for {path}. Check your inputs and try again.")
+    finally:
+        if executor is not None:
+            executor.shutdown()
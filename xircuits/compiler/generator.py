@@ -5,7 +5,7 @@ import re
 import json
 import sys
 import os
-from .port import DYNAMIC_PORTS
+from .graph_index import GraphIndex
 
 if sys.version_info >= (3, 9):
     from ast import unparse
@@ -42,10 +42,84 @@ def _get_value_from_literal_port(port):
 
     return value
 
+
+# Unfortunately, we don't have the information anywhere else and updating the file format isn't an option at the moment
+ARGUMENT_PATTERN = re.compile(r'^Argument \((.+?)\): (.+)$')
+
+# Capture index N from port names like 'parameter-dynalist-dlist-2'
+DYNAMIC_PORT_INDEX_PATTERN = re.compile(r'-(\d+)\s*$')
+
+# The statements below are emitted once per port, component or control-flow edge,
+# so they are built as AST nodes directly instead of formatting and re-parsing source.
+
+def _ref(dotted_name, ctx=None):
+    # `self.c_0.out` -> Attribute(Attribute(Name('self'), 'c_0'), 'out')
+    parts = dotted_name.split('.')
+    expr = ast.Name(id=parts[0], ctx=ast.Load())
+    for attr in parts[1:]:
+        expr = ast.Attribute(value=expr, attr=attr, ctx=ast.Load())
+    if ctx is not None:
+        expr.ctx = ctx
+    return expr
+
+
+def _call(func, *args, **keywords):
+    return ast.Call(func=func, args=list(args),
+                    keywords=[ast.keyword(arg=k, value=v) for k, v in keywords.items()])
+
+
+def _method_call(target, method, *args):
+    return ast.Expr(value=_call(ast.Attribute(value=target, attr=method, ctx=ast.Load()), *args))
+
+
+def _assign(target, value):
+    # unparse looks up type comments by line number, so the attribute has to exist
+    return ast.Assign(targets=[target], value=value, lineno=None)
+
+
+def _connect(target, source):
+    return _method_call(target, 'connect', source)
+
+
+def _set_value(target, value):
+    return _assign(ast.Attribute(value=target, attr='value', ctx=ast.Store()), ast.Constant(value=value))
+
+
+def _type_expr(type_name):
+    if type_name.isidentifier():
+        return ast.Name(id=type_name, ctx=ast.Load())
+    return ast.parse(type_name, mode='eval').body
+
+
+def _port_definition(name, port_class, type_name):
+    # `name: InArg[type]`
+    annotation = ast.Subscript(value=ast.Name(id=port_class, ctx=ast.Load()), slice=_type_expr(type_name), ctx=ast.Load())
+    return ast.AnnAssign(target=ast.Name(id=name, ctx=ast.Store()), annotation=annotation, value=None, simple=1)
+
+
+# How the generated flow runs its components:
+# - dynamic: SubGraphExecutor follows the `next` chain
+# - static: straight-line `execute` calls for the main chain, see _generate_static_execute
+# - dataflow: the main chain as a dependency graph run by run_dataflow, see _generate_dataflow_execute
+SCHEDULES = ('dynamic', 'static', 'dataflow')
+
+
 class CodeGenerator:
-    def __init__(self, graph, component_python_paths):
+    def __init__(self, graph, component_python_paths, schedule='dynamic', lazy_imports=False):
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Unknown schedule {schedule!r}, expected one of {', '.join(SCHEDULES)}")
         self.graph = graph
         self.component_python_paths = component_python_paths
+        self.schedule = schedule
+        self.lazy_imports = lazy_imports
+        self._index = None
+
+    @property
+    def index(self):
+        # Traverse the graph once and share the result between all generation steps
+        if self._index is None:
+            self._index = GraphIndex.build(self.graph)
+        return self._index
 
     def generate(self, filelike):
         output_filename = os.path.basename(filelike.name)
@@ -68,33 +142,44 @@ class CodeGenerator:
 import sys        
 """
         code = ast.parse(fixed_code).body
-        nodes = self._build_node_set()
 
-        needed_paths = set()
-        for node in nodes:
-            if node.name in self.component_python_paths:
-                needed_paths.add(self.component_python_paths[node.name])
+        needed_paths = dict.fromkeys(
+            self.component_python_paths[node.name] for node in self.index.nodes
+            if node.name in self.component_python_paths
+        )
 
         if len(needed_paths) == 0:
             return []
 
         for p in needed_paths:
-            tpl = ast.parse('sys.path.append("value")')
-            tpl.body[0].value.args[0].value = p
-            code.extend(tpl.body)
+            code.append(_method_call(_ref('sys.path'), 'append', ast.Constant(value=p)))
         return code
 
     def _generate_fixed_imports(self):
         fixed_imports = """
 from argparse import ArgumentParser
 from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_component, parse_bool
+from xai_components.base import VERBOSITY_LEVELS, set_verbosity, print_execution_summary, finish_run
 
 """
-        return ast.parse(fixed_imports).body
+        imports = ast.parse(fixed_imports).body
+        if self.schedule == 'static':
+            imports.append(ast.ImportFrom(module='xai_components.base',
+                                          names=[ast.alias(name='start_static_run'),
+                                                 ast.alias(name='log_step')], level=0))
+        elif self.schedule == 'dataflow':
+            imports.append(ast.ImportFrom(module='xai_components.base',
+                                          names=[ast.alias(name='start_dataflow_run'),
+                                                 ast.alias(name='run_dataflow')], level=0))
+        if self.lazy_imports:
+            imports.append(ast.ImportFrom(module='xai_components.base',
+                                          names=[ast.alias(name='LazyComponent'),
+                                                 ast.alias(name='build_lazy_flow'),
+                                                 ast.alias(name='print_import_report')], level=0))
+        return imports
 
     def _generate_component_imports(self):
-        nodes = self._build_node_set()
-        unique_components = list(set((n.name, n.file) for n in nodes if n.file is not None))
+        unique_components = list(dict.fromkeys((n.name, n.file) for n in self.index.component_nodes))
         unique_components.sort(key=lambda x: x[1])
         unique_modules = itertools.groupby(unique_components, lambda x: x[1])
 
@@ -102,9 +187,17 @@ from xai_components.base import SubGraphExecutor, InArg, OutArg, Component, xai_
         for (file, components) in unique_modules:
             module = '.'.join(file[:-3].split('/'))
 
-            imports.append(
-                ast.parse("from %s import %s" % (module, ",".join(c[0] for c in components)))
-            )
+            if self.lazy_imports:
+                # The module is imported when the first of its components is created
+                imports.extend(
+                    _assign(_ref(c[0], ast.Store()),
+                            _call(_ref('LazyComponent'), ast.Constant(value=module), ast.Constant(value=c[0])))
+                    for c in components
+                )
+            else:
+                imports.append(
+                    ast.ImportFrom(module=module, names=[ast.alias(name=c[0]) for c in components], level=0)
+                )
 
         return imports
 
@@ -121,11 +214,10 @@ class %s(Component):
         pass
 """ % flow_name).body[0]
 
-        nodes = self._build_node_set()
-        component_nodes = [n for n in nodes if n.file is not None]
+        component_nodes = self.index.component_nodes
         named_nodes = dict((n.id, "self.c_%s" % idx) for idx, n in enumerate(component_nodes))
 
-        finish_node = [n for n in nodes if n.name == 'Finish' and n.type == 'Finish'][0]
+        finish_node = self.index.finish_nodes[0]
 
         init_code = []
         exec_code = []
@@ -134,9 +226,9 @@ class %s(Component):
         existing_args = set()
 
         # Instantiate all components
-        init_code.extend([
-            ast.parse("%s = %s(); %s.__id__ = '%s';" % (named_nodes[n.id], n.name, named_nodes[n.id], n.id)) for n in component_nodes
-        ])
+        for n in component_nodes:
+            init_code.append(_assign(_ref(named_nodes[n.id], ast.Store()), _call(_ref(n.name))))
+            init_code.append(_assign(_ref(named_nodes[n.id] + '.__id__', ast.Store()), ast.Constant(value=n.id)))
 
         type_mapping = {
             "int": "int",
@@ -147,21 +239,12 @@ class %s(Component):
             "any": "any"
         }
 
-        def connect_args(target, source):
-            return ast.parse("%s.connect(%s)" % (target, source))
-
-        set_value = lambda target, v: ast.parse("%s.value = %s" % (target, v))
-
         # Set up component argument links
         for node in component_nodes:
+            node_ports = self.index.ports[node.id]
             # Handle argument connections
-            for port in (p for p in node.ports if
-                         p.direction == 'in' and p.type == 'triangle-link' and p.source.name.startswith(
-                             'Argument ')):
-                # Unfortunately, we don't have the information anywhere else and updating the file format isn't an option at the moment
-
-                pattern = re.compile(r'^Argument \((.+?)\): (.+)$')
-                match = pattern.match(port.source.name)
+            for port in node_ports.argument_in:
+                match = ARGUMENT_PATTERN.match(port.source.name)
                 arg_type = type_mapping[match.group(1)]
                 arg_name = match.group(2)
 
@@ -170,16 +253,13 @@ class %s(Component):
                     port.targetLabel
                 )
                 assignment_source = "self.%s" % arg_name
-                tpl = connect_args(assignment_target, assignment_source)
-                init_code.append(tpl)
+                init_code.append(_connect(_ref(assignment_target), _ref(assignment_source)))
                 if arg_name not in existing_args:
-                    in_arg_def = ast.parse("%s: InArg[%s]" % (arg_name, arg_type)).body[0]
-                    args_code.append(in_arg_def)
+                    args_code.append(_port_definition(arg_name, 'InArg', arg_type))
                     existing_args.add(arg_name)
 
             # Handle regular connections
-            for port in (p for p in node.ports if
-                         p.direction == 'in' and p.type != 'triangle-link' and p.dataType not in DYNAMIC_PORTS):
+            for port in node_ports.data_in:
                 assignment_target = "%s.%s" % (
                     named_nodes[port.target.id],
                     port.targetLabel
@@ -187,22 +267,17 @@ class %s(Component):
 
                 if port.source.id not in named_nodes:
                     # Literal
-                    tpl = set_value(assignment_target, '1')
-                    tpl.body[0].value.value = _get_value_from_literal_port(port)
+                    tpl = _set_value(_ref(assignment_target), _get_value_from_literal_port(port))
                 else:
                     assignment_source = "%s.%s" % (
                         named_nodes[port.source.id],
                         port.sourceLabel
                     )
-                    tpl = connect_args(assignment_target, assignment_source)
+                    tpl = _connect(_ref(assignment_target), _ref(assignment_source))
                 init_code.append(tpl)
 
             # Handle dynamic connections
-            dynaports = [p for p in node.ports if
-                        p.direction == 'in' and p.type != 'triangle-link' and p.dataType in DYNAMIC_PORTS]
-
-            # Capture index N from port names like 'parameter-dynalist-dlist-2'
-            _name_idx_re = re.compile(r'-(\d+)\s*$')
+            dynaports = node_ports.dynamic_in
 
             # Map: varName -> {index: port}
             ports_by_varName = {}
@@ -211,7 +286,7 @@ class %s(Component):
                 var_name = port.varName
                 name = port.name
                 # Extract index from name; default to 0 if no '-N' suffix
-                m = _name_idx_re.search(name)
+                m = DYNAMIC_PORT_INDEX_PATTERN.search(name)
                 idx = int(m.group(1)) if m else 0
 
                 ports_by_varName.setdefault(var_name, {})
@@ -221,31 +296,33 @@ class %s(Component):
             for var_name, mapping in ports_by_varName.items():
                 for i in sorted(mapping.keys()):
                     port = mapping[i]
-                    target_indexed = f"{named_nodes[port.target.id]}.{var_name}[{i}]"
+
+                    def target_indexed(ctx):
+                        # `self.c_0.var_name[i]`
+                        return ast.Subscript(value=_ref(f"{named_nodes[port.target.id]}.{var_name}"),
+                                             slice=ast.Constant(value=i), ctx=ctx)
 
                     if port.source.id in named_nodes:
                         # Component reference -> connect
                         source_ref = f"{named_nodes[port.source.id]}.{port.sourceLabel}"
-                        init_code.append(ast.parse(f"{target_indexed}.connect({source_ref})"))
+                        init_code.append(_connect(target_indexed(ast.Load()), _ref(source_ref)))
                     else:
                         # Regex: matches e.g. 'Argument (string): argsName'
-                        pattern = re.compile(r'^Argument \((.+?)\): (.+)$')
                         if port.source.file is None and port.source.name.startswith("Argument "):
-                            match = pattern.match(port.source.name)
+                            match = ARGUMENT_PATTERN.match(port.source.name)
                             arg_type = type_mapping.get(match.group(1), 'any')
                             arg_name = match.group(2)
 
                             if arg_name not in existing_args:
-                                args_code.append(ast.parse(f"{arg_name}: InArg[{arg_type}]").body[0])
+                                args_code.append(_port_definition(arg_name, 'InArg', arg_type))
                                 existing_args.add(arg_name)
 
-                            init_code.append(ast.parse(f"{target_indexed}.connect(self.{arg_name})"))
+                            init_code.append(_connect(target_indexed(ast.Load()), _ref(f"self.{arg_name}")))
                         else:
                             # Literal -> `[i] = <python literal>`
                             lit_value = _get_value_from_literal_port(port)
-                            assign = ast.parse(f"{target_indexed} = 0")
-                            assign.body[0].value = ast.parse(repr(lit_value)).body[0].value
-                            init_code.append(assign)
+                            init_code.append(_assign(target_indexed(ast.Store()),
+                                                     ast.parse(repr(lit_value), mode='eval').body))
 
 
         # Handle output connections
@@ -257,9 +334,8 @@ class %s(Component):
             assignment_target = "self.%s" % port_name
             if port.source.id not in named_nodes:
                 # Literal
-                tpl = set_value(assignment_target, '1')
                 value = _get_value_from_literal_port(port)
-                tpl.body[0].value.value = value
+                tpl = _set_value(_ref(assignment_target), value)
                 port_type = type(value).__name__
             else:
                 port_type = type_mapping[port.sourceType] if port.sourceType in type_mapping else port.sourceType
@@ -267,54 +343,189 @@ class %s(Component):
                     named_nodes[port.source.id],
                     port.sourceLabel
                 )
-                tpl = connect_args(assignment_target, assignment_source)
-            args_code.append(ast.parse("%s: OutArg[%s]" % (port_name, port_type)).body[0])
+                tpl = _connect(_ref(assignment_target), _ref(assignment_source))
+            args_code.append(_port_definition(port_name, 'OutArg', port_type))
             init_code.append(tpl)
 
         # Set up control flow
         for node in component_nodes:
             has_next = False
-            for port in (p for p in node.ports if p.direction == "out" and p.type == "triangle-link"):
+            for port in self.index.ports[node.id].flow_out:
                 if port.name == "out-0":
                     has_next = True
                     assignment_target = "%s.next" % named_nodes[port.source.id]
-                    assignment_source = named_nodes[port.target.id] if port.target.id in named_nodes else None
+                    assignment_source = _ref(named_nodes[port.target.id]) \
+                        if port.target.id in named_nodes else ast.Constant(value=None)
                     init_code.append(
-                        ast.parse("%s = %s" % (assignment_target, assignment_source))
+                        _assign(_ref(assignment_target, ast.Store()), assignment_source)
                     )
                 elif port.name.startswith("out-flow-"):
                     assignment_target = "%s.%s" % (named_nodes[port.source.id], port.name[len("out-flow-"):])
-                    assignment_source = "SubGraphExecutor(%s)" % named_nodes[
-                        port.target.id] if port.target.id in named_nodes else None
+                    assignment_source = _call(_ref("SubGraphExecutor"), _ref(named_nodes[port.target.id])) \
+                        if port.target.id in named_nodes else ast.Constant(value=None)
                     init_code.append(
-                        ast.parse("%s = %s" % (assignment_target, assignment_source))
+                        _assign(_ref(assignment_target, ast.Store()), assignment_source)
                     )
             if not has_next:
                 assignment_target = "%s.next" % named_nodes[node.id]
                 init_code.append(
-                    ast.parse("%s = None" % assignment_target)
+                    _assign(_ref(assignment_target, ast.Store()), ast.Constant(value=None))
                 )
         # Setup start node initialization
         for node in (n for n in self.graph if n.id in named_nodes):
             init_code.append(
-                ast.parse("self.__start_nodes__.append(%s)" % named_nodes[node.id])
+                _method_call(_ref("self.__start_nodes__"), 'append', _ref(named_nodes[node.id]))
             )
 
+        start_id = self.graph[0].ports[0].target.id
         trailer = """
 for node in self.__start_nodes__:
     if hasattr(node, 'init'):
         node.init(ctx)
 SubGraphExecutor(%s).do(ctx)        
-        """ % (named_nodes[self.graph[0].ports[0].target.id])
+        """ % (named_nodes[start_id])
         exec_code.append(ast.parse(trailer))
 
-        mainFlowCls.body[0].body.extend(init_code)
-        mainFlowCls.body[1].body = exec_code
+        if self.schedule == 'static':
+            exec_code = self._generate_static_execute(exec_code, init_code, start_id, named_nodes)
+        elif self.schedule == 'dataflow':
+            exec_code = self._generate_dataflow_execute(exec_code, init_code, start_id, named_nodes)
+
+        if self.lazy_imports:
+            # The components are created when the flow first runs, see build_lazy_flow
+            build = ast.parse("def __build__(self):\n    pass").body[0]
+            build.body = init_code
+            mainFlowCls.body.insert(1, build)
+            exec_code.insert(0, ast.Expr(value=_call(_ref('build_lazy_flow'), _ref('self'))))
+        else:
+            mainFlowCls.body[0].body.extend(init_code)
+        mainFlowCls.body[-1].body = exec_code
 
         args_code.sort(key=lambda x: x.target.id)
         mainFlowCls.body = args_code + mainFlowCls.body
         return [mainFlowCls]
 
+    def _main_chain(self, start_id, named_nodes):
+        """
+        The components the `next` chain runs from the start, the next component
+        of every component and the components with branches. The chain is None
+        if it loops back, then only the executor knows where it ends.
+        """
+        next_ids = {}
+        branch_ids = set()
+        for node in self.index.component_nodes:
+            next_ids[node.id] = None
+            for port in self.index.ports[node.id].flow_out:
+                if port.name == "out-0" and port.target.id in named_nodes:
+                    next_ids[node.id] = port.target.id
+                elif port.name.startswith("out-flow-"):
+                    branch_ids.add(node.id)
+
+        chain = []
+        node_id = start_id
+        while node_id is not None:
+            if node_id in chain:
+                return None, next_ids, branch_ids
+            chain.append(node_id)
+            node_id = next_ids[node_id]
+        return chain, next_ids, branch_ids
+
+    def _generate_static_execute(self, exec_code, init_code, start_id, named_nodes):
+        """
+        Runs the main chain as straight-line code: `execute` for plain steps
+        and `do` for branch components, whose branches still go through the
+        executor. Plain steps are logged by the code itself when steps are
+        logged. The dynamic `exec_code` remains the fallback for when
+        start_static_run says the executor is needed.
+        """
+        chain, next_ids, branch_ids = self._main_chain(start_id, named_nodes)
+        if chain is None:
+            return exec_code
+
+        steps = [named_nodes[n] for n in chain if n not in branch_ids]
+        init_code.append(_assign(_ref('self.__static_steps__', ast.Store()),
+                                 ast.Tuple(elts=[_ref(step) for step in steps], ctx=ast.Load())))
+
+        # The init loop, then the fallback to the executor
+        start_nodes_init, dynamic_run = exec_code[0].body
+        code = [start_nodes_init,
+                _assign(_ref('log_steps', ast.Store()),
+                        _call(_ref('start_static_run'), _ref('self'), _ref('self.__static_steps__'))),
+                ast.If(
+                    test=ast.Compare(left=_ref('log_steps'), ops=[ast.Is()], comparators=[ast.Constant(value=None)]),
+                    body=[dynamic_run, ast.Return(value=None)],
+                    orelse=[]
+                )]
+        for node_id in chain:
+            component = _ref(named_nodes[node_id])
+            if node_id not in branch_ids:
+                code.append(ast.If(test=_ref('log_steps'), body=[ast.Expr(value=_call(_ref('log_step'), component))],
+                                   orelse=[]))
+                code.append(_method_call(component, 'execute', _ref('ctx')))
+                continue
+            # Branch components decide where to go on, leave the straight line if it is not the usual next
+            expected_next = _ref(named_nodes[next_ids[node_id]]) if next_ids[node_id] is not None \
+                else ast.Constant(value=None)
+            code.append(_assign(_ref('next_component', ast.Store()),
+                                _call(ast.Attribute(value=component, attr='do', ctx=ast.Load()), _ref('ctx'))))
+            code.append(ast.If(
+                test=ast.Compare(left=_ref('next_component'), ops=[ast.IsNot()], comparators=[expected_next]),
+                body=[_method_call(_call(_ref('SubGraphExecutor'), _ref('next_component')), 'do', _ref('ctx')),
+                      ast.Return(value=None)],
+                orelse=[]
+            ))
+        return code
+
+    def _generate_dataflow_execute(self, exec_code, init_code, start_id, named_nodes):
+        """
+        Runs the main chain as a dependency graph: a component waits for the
+        components whose outputs it reads, and for those reading its outputs
+        from an earlier place in the chain. Branch components are marked as
+        barriers, which start_dataflow_run keeps in their place. The dynamic `exec_code` remains the fallback for when
+        start_dataflow_run says the executor is needed.
+        """
+        chain, next_ids, branch_ids = self._main_chain(start_id, named_nodes)
+        if chain is None:
+            return exec_code
+
+        position = {node_id: i for i, node_id in enumerate(chain)}
+        deps = [set() for _ in chain]
+        for i, node_id in enumerate(chain):
+            node_ports = self.index.ports[node_id]
+            for port in itertools.chain(node_ports.data_in, node_ports.dynamic_in):
+                source = position.get(port.source.id)
+                if source is None or source == i:
+                    continue
+                if source < i:
+                    deps[i].add(source)
+                else:
+                    # Reads what the source left from an earlier run, so the source has to wait
+                    deps[source].add(i)
+
+        nodes = []
+        for i, node_id in enumerate(chain):
+            expected_next = _ref(named_nodes[next_ids[node_id]]) if next_ids[node_id] is not None \
+                else ast.Constant(value=None)
+            nodes.append(ast.Tuple(elts=[
+                _ref(named_nodes[node_id]),
+                ast.Tuple(elts=[ast.Constant(value=d) for d in sorted(deps[i])], ctx=ast.Load()),
+                expected_next,
+                ast.Constant(value=node_id in branch_ids)
+            ], ctx=ast.Load()))
+        init_code.append(_assign(_ref('self.__dataflow__', ast.Store()), ast.Tuple(elts=nodes, ctx=ast.Load())))
+
+        # The init loop, then the fallback to the executor while start_dataflow_run has no plan
+        start_nodes_init, dynamic_run = exec_code[0].body
+        return [
+            start_nodes_init,
+            _assign(_ref('dataflow', ast.Store()),
+                    _call(_ref('start_dataflow_run'), _ref('self'), _ref('self.__dataflow__'))),
+            ast.If(test=ast.Compare(left=_ref('dataflow'), ops=[ast.Is()], comparators=[ast.Constant(value=None)]),
+                   body=[dynamic_run, ast.Return(value=None)],
+                   orelse=[]),
+            ast.Expr(value=_call(_ref('run_dataflow'), _ref('dataflow'), _ref('ctx')))
+        ]
+
     def _generate_main(self, flow_name):
         main = ast.parse("""
 def main(args):
@@ -324,23 +535,17 @@ def main(args):
     flow = %s()
     flow.next = None
 """ % flow_name).body[0]
-        pattern = re.compile(r'^Argument \(.+?\): (.+)$')
 
         body = main.body
 
         # Set up the input values
-        nodes = self._build_node_set()
-        finish_node = [n for n in nodes if n.name == 'Finish' and n.type == 'Finish'][0]
-        argument_nodes = [n for n in nodes if n.name.startswith("Argument ") and n.file is None]
-        for arg in argument_nodes:
-            m = pattern.match(arg.name)
-            arg_name = m.group(1)
-            tpl = "flow.%s.value = args.%s" % (arg_name, arg_name)
-            body.extend(ast.parse(tpl).body)
-
-        body.extend(ast.parse("""
-flow.do(ctx)
-""").body)
+        finish_node = self.index.finish_nodes[0]
+        for arg in self.index.argument_nodes:
+            arg_name = ARGUMENT_PATTERN.match(arg.name).group(2)
+            body.append(_assign(_ref("flow.%s.value" % arg_name, ast.Store()), _ref("args.%s" % arg_name)))
+
+        # Run through an executor, so the flow itself is debugged and profiled like its components
+        body.append(_method_call(_call(_ref('SubGraphExecutor'), _ref('flow')), 'do', _ref('ctx')))
 
         # Print out the output values
         for i, port in enumerate(p for p in finish_node.ports if p.dataType == 'dynalist'):
@@ -348,43 +553,33 @@ flow.do(ctx)
             if i > 0:
                 port_name = "%s_%s" % (port_name, i)
 
-            body.extend(ast.parse("""
-print("%s:")
-pprint.pprint(flow.%s.value)
-""" % (port_name, port_name)).body)
+            body.append(ast.Expr(value=_call(_ref("print"), ast.Constant(value="%s:" % port_name))))
+            body.append(_method_call(_ref("pprint"), 'pprint', _ref("flow.%s.value" % port_name)))
 
         return [main]
 
-    def _build_node_set(self):
-        nodes = set()
-        node_queue = list(self.graph)
-        while len(node_queue) != 0:
-            current_node = node_queue.pop()
-            nodes.add(current_node)
-            for port in current_node.ports:
-                if port.target not in nodes:
-                    node_queue.append(port.target)
-                if port.source not in nodes:
-                    node_queue.append(port.source)
-        return nodes
-
     def _generate_trailer(self):
         code = """
 if __name__ == '__main__':
     args, _ = parser.parse_known_args()
-    main(args)
-    print("\\nFinished Executing")
+    set_verbosity(args.xircuits_verbosity)
+    del args.xircuits_verbosity
+    try:
+        main(args)
+        print_execution_summary()
+    finally:
+        finish_run()
         """
         body = ast.parse(code).body[0]
+        run = body.body[-1]
+        if self.lazy_imports:
+            run.body.append(ast.Expr(value=_call(_ref('print_import_report'))))
         arg_parsing = self._generate_argument_parsing()
         arg_parsing.extend(body.body)
         body.body = arg_parsing
         return [body]
 
     def _generate_argument_parsing(self):
-        # Unfortunately, we don't have the information anywhere else and updating the file format isn't an option at the moment
-        pattern = re.compile(r'^Argument \(.+?\): (.+)$')
-
         type_mapping = {
             "int": "int",
             "string": "str",
@@ -398,17 +593,27 @@ parser = ArgumentParser()
         """
         body = ast.parse(code).body
 
-        nodes = self._build_node_set()
-        argument_nodes = [n for n in nodes if n.name.startswith("Argument ") and n.file is None]
-        for arg in argument_nodes:
-            m = pattern.match(arg.name)
-            arg_name = m.group(1)
+        for arg in self.index.argument_nodes:
+            arg_name = ARGUMENT_PATTERN.match(arg.name).group(2)
+            flag = ast.Constant(value='--%s' % arg_name)
+            add_argument = ast.Attribute(value=_ref('parser'), attr='add_argument', ctx=ast.Load())
             if arg.type == "boolean":
-                tpl = "parser.add_argument('--%s', type=parse_bool, default=None, nargs='?', const=True)" % arg_name
+                call = _call(add_argument, flag, type=_ref('parse_bool'), default=ast.Constant(value=None),
+                             nargs=ast.Constant(value='?'), const=ast.Constant(value=True))
             elif arg.type == "any":
-                tpl = "parser.add_argument('--%s')" % (arg_name)
+                call = _call(add_argument, flag)
             else:
-                tpl = "parser.add_argument('--%s', type=%s)" % (arg_name, type_mapping[arg.type])
-            body.extend(ast.parse(tpl).body)
+                call = _call(add_argument, flag, type=_ref(type_mapping[arg.type]))
+            body.append(ast.Expr(value=call))
+
+        # A workflow argument may already be called verbosity. The flag is
+        # removed from the arguments again before they are handed to the workflow.
+        argument_names = set(ARGUMENT_PATTERN.match(arg.name).group(2) for arg in self.index.argument_nodes)
+        flag = '--verbosity' if 'verbosity' not in argument_names else '--xircuits-verbosity'
+        add_argument = ast.Attribute(value=_ref('parser'), attr='add_argument', ctx=ast.Load())
+        body.append(ast.Expr(value=_call(add_argument, ast.Constant(value=flag),
+                                         dest=ast.Constant(value='xircuits_verbosity'),
+                                         choices=_ref('VERBOSITY_LEVELS'),
+                                         default=ast.Constant(value=None))))
 
         return body
\ No newline at end of file
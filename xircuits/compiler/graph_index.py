@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from xircuits.compiler.node import Node
+from xircuits.compiler.port import Port, DYNAMIC_PORTS
+
+
+@dataclass
+class NodePorts:
+    argument_in: List[Port] = field(default_factory=list)
+    data_in: List[Port] = field(default_factory=list)
+    dynamic_in: List[Port] = field(default_factory=list)
+    flow_out: List[Port] = field(default_factory=list)
+
+
+@dataclass
+class GraphIndex:
+    """
+    Every node reachable from the start nodes, collected in one traversal and
+    grouped by the role the code generator needs them in.
+    """
+    nodes: List[Node]
+    component_nodes: List[Node]
+    argument_nodes: List[Node]
+    finish_nodes: List[Node]
+    ports: Dict[str, NodePorts]
+
+    @classmethod
+    def build(cls, graph):
+        nodes = {}
+        node_queue = list(graph)
+        while len(node_queue) != 0:
+            current_node = node_queue.pop()
+            if current_node.id in nodes:
+                continue
+            nodes[current_node.id] = current_node
+            for port in current_node.ports:
+                if port.target.id not in nodes:
+                    node_queue.append(port.target)
+                if port.source.id not in nodes:
+                    node_queue.append(port.source)
+
+        index = cls(
+            nodes=list(nodes.values()),
+            component_nodes=[],
+            argument_nodes=[],
+            finish_nodes=[],
+            ports={}
+        )
+        for node in index.nodes:
+            if node.file is not None:
+                index.component_nodes.append(node)
+            elif node.name.startswith("Argument "):
+                index.argument_nodes.append(node)
+            if node.name == 'Finish' and node.type == 'Finish':
+                index.finish_nodes.append(node)
+
+            node_ports = NodePorts()
+            for port in node.ports:
+                if port.direction == 'in':
+                    if port.type == 'triangle-link':
+                        if port.source.name.startswith('Argument '):
+                            node_ports.argument_in.append(port)
+                    elif port.dataType in DYNAMIC_PORTS:
+                        node_ports.dynamic_in.append(port)
+                    else:
+                        node_ports.data_in.append(port)
+                elif port.direction == 'out' and port.type == 'triangle-link':
+                    node_ports.flow_out.append(port)
+            index.ports[node.id] = node_ports
+        return index
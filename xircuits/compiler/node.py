@@ -22,4 +22,4 @@ class Node:
         pass
 
     def __hash__(self):
-        return id.__hash__()
\ No newline at end of file
+        return hash(self.id)
\ No newline at end of file
@@ -4,12 +4,16 @@ import re
 from xircuits.compiler.node import Node
 from xircuits.compiler.port import Port
 
+SOURCE_TYPE_PATTERN = re.compile(r'parameter-out-(.+?)-out')
+
 
 class XircuitsFileParser:
     def __init__(self):
         self.traversed_nodes = {}
         self.nodes = {}
         self.links = {}
+        self.ports = {}
+        self.pending_nodes = []
 
     def parse(self, input_file):
 
@@ -17,12 +21,23 @@ class XircuitsFileParser:
 
         self.nodes = [n for n in xircuits_file['layers'] if n['type'] == 'diagram-nodes'][0]['models']
         self.links = [n for n in xircuits_file['layers'] if n['type'] == 'diagram-links'][0]['models']
+        # Index ports once so resolving a link's source port does not rescan the node's ports
+        self.ports = {(n['id'], p['id']): p for n in self.nodes.values() for p in n['ports']}
 
         start_nodes = [n for n in self.nodes.values() if n['extras']['type'] == 'Start']
 
         return [self.traverse_node(start_node) for start_node in start_nodes]
 
     def traverse_node(self, node):
+        n = self.get_node(node)
+        # Resolve ports with an explicit work list rather than recursion, so long
+        # chains of components do not run into the interpreter's recursion limit
+        while self.pending_nodes:
+            pending_node, pending = self.pending_nodes.pop()
+            pending.ports = self.traverse_ports(pending_node)
+        return n
+
+    def get_node(self, node):
         node_id = node['id']
         if node_id in self.traversed_nodes:
             return self.traversed_nodes[node_id]
@@ -35,7 +50,7 @@ class XircuitsFileParser:
                 ports=[]
             )
             self.traversed_nodes[node_id] = n
-            n.ports = self.traverse_ports(node)
+            self.pending_nodes.append((node, n))
             return n
 
     def traverse_ports(self, node):
@@ -48,14 +63,13 @@ class XircuitsFileParser:
                 source_node = self.nodes[link['source']]
                 target_node = self.nodes[link['target']]
 
-                sourceLabel = [p for p in source_node['ports'] if p['id'] == link['sourcePort']][0]['label']
-                sourceName = [p for p in source_node['ports'] if p['id'] == link['sourcePort']][0]['name']
-                typeExtract = re.match(r'parameter-out-(.+?)-out', sourceName)
+                source_port = self.ports[(link['source'], link['sourcePort'])]
+                typeExtract = SOURCE_TYPE_PATTERN.match(source_port['name'])
                 sourceType = typeExtract.group(1) if typeExtract is not None else 'any'
 
                 # filter compulsory port [★] label from port name
-                sourceLabel = re.sub(r"★", "", sourceLabel)
-                targetLabel = re.sub(r"★", "", port['label'])
+                sourceLabel = source_port['label'].replace("★", "")
+                targetLabel = port['label'].replace("★", "")
 
                 p = Port(
                     name=port['name'],
@@ -63,8 +77,8 @@ class XircuitsFileParser:
                     sourceType=sourceType,
                     varName=port['varName'],
                     dataType=port['dataType'],
-                    target=self.traverse_node(target_node),
-                    source=self.traverse_node(source_node),
+                    target=self.get_node(target_node),
+                    source=self.get_node(source_node),
                     targetLabel=targetLabel,
                     sourceLabel=sourceLabel,
                     direction="in" if port['in'] else "out"
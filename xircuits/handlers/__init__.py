@@ -1,7 +1,8 @@
 from jupyter_server.utils import url_path_join
 
 from .compile_xircuits import CompileXircuitsFileRouteHandler, CompileRecursiveXircuitsFileRouteHandler
-from .components import ComponentsRouteHandler
+from .components import ComponentsRouteHandler, ComponentDetailRouteHandler
+from .component_watcher import ComponentEventsRouteHandler
 from .config import RunConfigRouteHandler, SplitModeConfigHandler
 from .debugger import DebuggerRouteHandler
 from .request_library import InstallLibraryRouteHandler, FetchLibraryRouteHandler, UninstallLibraryRouteHandler, GetLibraryDirectoryRouteHandler, GetLibraryReadmeRouteHandler, GetLibraryExampleRouteHandler, ReloadComponentLibraryConfigHandler, GetComponentLibraryConfigHandler, CreateNewLibraryHandler
@@ -29,6 +30,14 @@ def setup_handlers(web_app, url_path):
             url_path_join(base_url, url_path, "components/"),
             ComponentsRouteHandler
         ),
+        (
+            url_path_join(base_url, url_path, "components/detail"),
+            ComponentDetailRouteHandler
+        ),
+        (
+            url_path_join(base_url, url_path, "components/events"),
+            ComponentEventsRouteHandler
+        ),
         (
             url_path_join(base_url, url_path, "examples/"),
             FetchExamplesRouteHandler
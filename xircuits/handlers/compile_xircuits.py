@@ -1,4 +1,10 @@
+import asyncio
 import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import tornado
 from jupyter_server.base.handlers import APIHandler
@@ -6,9 +12,96 @@ from jupyter_server.base.handlers import APIHandler
 from pathlib import Path
 
 from xircuits.compiler import compile, recursive_compile
+from xircuits.compiler.compiler import parse_workflow
 import traceback
 
 
+class CompileService:
+    """
+    Runs compilations on a worker pool so they never block the Jupyter server's
+    IOLoop, keeps recently parsed workflow graphs in memory keyed by path and
+    modification time, and coalesces repeated requests for the same workflow.
+    Compiles writing the same output file run one after the other; identical
+    requests arriving while one is running share a single follow-up compile.
+    """
+
+    def __init__(self, max_workers=2, max_cached_graphs=64):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="xircuits-compile")
+        self.max_cached_graphs = max_cached_graphs
+        self.graphs = OrderedDict()
+        self.graphs_lock = threading.Lock()
+        self.running = {}
+        self.pending = {}
+
+    def load_graph(self, input_file_path):
+        # Called from the worker threads
+        stat = os.stat(input_file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self.graphs_lock:
+            cached = self.graphs.get(input_file_path)
+            if cached is not None and cached[0] == version:
+                self.graphs.move_to_end(input_file_path)
+                return cached[1]
+
+        graph = parse_workflow(input_file_path)
+
+        with self.graphs_lock:
+            self.graphs[input_file_path] = (version, graph)
+            self.graphs.move_to_end(input_file_path)
+            while len(self.graphs) > self.max_cached_graphs:
+                self.graphs.popitem(last=False)
+        return graph
+
+    def compile(self, input_file_path, output_file_path, component_python_paths):
+        request = ("compile", input_file_path, json.dumps(component_python_paths, sort_keys=True))
+        return self._submit(output_file_path, request,
+                            partial(compile, input_file_path, output_file_path, component_python_paths,
+                                    load_graph=self.load_graph))
+
+    def recursive_compile(self, input_file_path, component_python_paths):
+        # The requests already run on the service's threads, so the nested
+        # workflows are compiled in this thread rather than on a process pool
+        request = ("recursive", input_file_path, json.dumps(component_python_paths, sort_keys=True))
+        return self._submit(input_file_path.replace('.xircuits', '.py'), request,
+                            partial(recursive_compile, input_file_path,
+                                    component_python_paths=component_python_paths,
+                                    max_workers=1, load_graph=self.load_graph))
+
+    def _submit(self, output_file_path, request, job):
+        # Only ever called from the IOLoop thread, so the bookkeeping needs no locking.
+        # Callers get shielded futures so one abandoned request cannot cancel a shared compile.
+        pending = self.pending.get(output_file_path)
+        if pending is not None and pending[0] == request:
+            return asyncio.shield(pending[1])
+
+        # Queue behind the last compile writing the same file
+        previous = pending[1] if pending is not None else self.running.get(output_file_path)
+        task = asyncio.ensure_future(self._run(output_file_path, previous, job))
+        if previous is None:
+            self.running[output_file_path] = task
+        else:
+            self.pending[output_file_path] = (request, task)
+        return asyncio.shield(task)
+
+    async def _run(self, output_file_path, previous, job):
+        current = asyncio.current_task()
+        if previous is not None:
+            # The file may have changed after the running compile read it,
+            # so compile once more when it is done instead of sharing its result
+            await asyncio.wait([previous])
+            if self.pending.get(output_file_path, (None, None))[1] is current:
+                del self.pending[output_file_path]
+            self.running[output_file_path] = current
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, job)
+        finally:
+            if self.running.get(output_file_path) is current:
+                del self.running[output_file_path]
+
+
+compile_service = CompileService()
+
+
 class CompileXircuitsFileRouteHandler(APIHandler):
     def __get_notebook_absolute_path__(self, path):
         return (Path(self.application.settings['server_root_dir']) / path).expanduser().resolve()
@@ -18,7 +111,7 @@ class CompileXircuitsFileRouteHandler(APIHandler):
         self.finish(json.dumps({"data": "This is file/compile endpoint!"}))
 
     @tornado.web.authenticated
-    def post(self):
+    async def post(self):
         input_data = self.get_json_body()
 
         input_file_path = self.__get_notebook_absolute_path__(input_data["filePath"])
@@ -29,7 +122,7 @@ class CompileXircuitsFileRouteHandler(APIHandler):
         msg = ""
 
         try:
-            compile(str(input_file_path), str(output_file_path), component_python_paths)
+            await compile_service.compile(str(input_file_path), str(output_file_path), component_python_paths)
             msg = "completed"
         
         except Exception:
@@ -50,7 +143,7 @@ class CompileRecursiveXircuitsFileRouteHandler(APIHandler):
         self.finish(json.dumps({"data": "This is file/compile-recursive endpoint!"}))
 
     @tornado.web.authenticated
-    def post(self):
+    async def post(self):
         input_data = self.get_json_body()
 
         input_file_path = self.__get_notebook_absolute_path__(input_data["filePath"])
@@ -59,7 +152,7 @@ class CompileRecursiveXircuitsFileRouteHandler(APIHandler):
         msg = ""
 
         try:
-            recursive_compile(str(input_file_path), component_python_paths=component_python_paths)
+            await compile_service.recursive_compile(str(input_file_path), component_python_paths)
             msg = "completed"
         
         except Exception:
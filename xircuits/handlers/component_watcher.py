@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+
+import tornado
+from tornado.ioloop import PeriodicCallback
+from tornado.iostream import StreamClosedError
+from jupyter_server.base.handlers import APIHandler
+
+from .components import component_index, component_color, get_component_directories, list_component_files, \
+    format_extract_error
+
+try:
+    # watchdog uses inotify on Linux and the native file events elsewhere
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+POLL_INTERVAL_MS = 2000
+RESCAN_DELAY = 0.2
+HEARTBEAT_INTERVAL = 30
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, watcher, loop):
+        self.watcher = watcher
+        self.loop = loop
+
+    def on_any_event(self, event):
+        # Called from the observer thread
+        paths = [getattr(event, "src_path", ""), getattr(event, "dest_path", "")]
+        if event.is_directory or any(str(p).endswith(".py") for p in paths):
+            self.loop.call_soon_threadsafe(self.watcher.schedule_rescan)
+
+
+def _stop_observer(observer):
+    # Stopping the observer stops and joins its emitters, its own thread only runs once started
+    observer.stop()
+    if observer.is_alive():
+        observer.join()
+
+
+class ComponentWatcher:
+    """
+    Watches the component directories and tells subscribers which component
+    files changed. Only the changed files are extracted again, through the
+    shared component index, so the next full palette request stays cheap too.
+
+    File events come from inotify (through watchdog) when it is installed,
+    otherwise the directories are polled for modification times and sizes.
+    The watcher only runs while somebody is subscribed.
+    """
+
+    def __init__(self, poll_interval_ms=POLL_INTERVAL_MS):
+        self.poll_interval_ms = poll_interval_ms
+        self.subscribers = set()
+        self.files = {}
+        self.observer = None
+        self.poller = None
+        self.rescan_handle = None
+        self.rescan_task = None
+        self.rescan_again = False
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self.subscribers.add(queue)
+        if len(self.subscribers) == 1:
+            self.start()
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            self.stop()
+
+    def start(self):
+        self.files = None
+        directories = [d for d in get_component_directories() if d is not None]
+        if Observer is not None:
+            observer = Observer()
+            handler = _ChangeHandler(self, asyncio.get_running_loop())
+            try:
+                for directory in directories:
+                    # Directories that do not exist (yet) cannot be watched, e.g. ~/xai_components
+                    if os.path.isdir(directory):
+                        observer.schedule(handler, directory, recursive=True)
+                observer.start()
+                self.observer = observer
+            except OSError as e:
+                # e.g. out of inotify watches, after some emitters may have started
+                _stop_observer(observer)
+                print(f"Component watcher falling back to polling: {e}")
+        if self.observer is None:
+            self.poller = PeriodicCallback(self.schedule_rescan, self.poll_interval_ms)
+            self.poller.start()
+        # Take the initial snapshot that later changes are compared against
+        self.schedule_rescan(delay=0)
+
+    def stop(self):
+        if self.observer is not None:
+            _stop_observer(self.observer)
+            self.observer = None
+        if self.poller is not None:
+            self.poller.stop()
+            self.poller = None
+        if self.rescan_handle is not None:
+            self.rescan_handle.cancel()
+            self.rescan_handle = None
+
+    def schedule_rescan(self, delay=RESCAN_DELAY):
+        # Editors write files in bursts, so events are coalesced into one rescan
+        if self.rescan_handle is not None:
+            return
+        self.rescan_handle = asyncio.get_running_loop().call_later(delay, self._start_rescan)
+
+    def _start_rescan(self):
+        self.rescan_handle = None
+        if self.rescan_task is not None and not self.rescan_task.done():
+            self.rescan_again = True
+            return
+        self.rescan_task = asyncio.ensure_future(self.rescan())
+
+    async def rescan(self):
+        while True:
+            self.rescan_again = False
+            try:
+                await self._rescan()
+            except Exception as e:
+                print(f"Component watcher failed to rescan: {e}")
+            if not self.rescan_again:
+                return
+
+    async def _rescan(self):
+        # Listing only stats the files, nothing is read unless it changed
+        component_files = list_component_files(get_component_directories())
+        current = {str(f[0]): f for f in component_files}
+
+        initial = self.files is None
+        previous = self.files or {}
+        changed = [f for key, f in current.items() if key not in previous or previous[key][0] != f[3]]
+        removed = [key for key in previous if key not in current]
+        if not changed and not removed:
+            if initial:
+                self.files = {}
+            return
+
+        extract_errors = await component_index.update(changed)
+
+        files = dict(previous)
+        changes = []
+        for file_path, directory, python_path, version in changed:
+            key = str(file_path)
+            error = extract_errors.get(key)
+            components = [] if error is not None else \
+                [dict(c, color=component_color(c))
+                 for c in component_index.get_components(file_path, directory, python_path, version)]
+            files[key] = (version, components)
+            changes.append({
+                "file": key,
+                "removed": [[c["header"], c["task"]] for c in previous.get(key, (None, []))[1]],
+                "components": components,
+                "error": format_extract_error(error, directory) if error is not None else None
+            })
+        for key in removed:
+            changes.append({
+                "file": key,
+                "removed": [[c["header"], c["task"]] for c in files.pop(key)[1]],
+                "components": [],
+                "error": None
+            })
+
+        component_index.save()
+        self.files = files
+        if not initial:
+            self.publish({"changes": changes})
+
+    def publish(self, event):
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+
+component_watcher = ComponentWatcher()
+
+
+class ComponentEventsRouteHandler(APIHandler):
+    """
+    Server-sent events stream of component palette changes.
+    """
+
+    @tornado.web.authenticated
+    async def get(self):
+        self.set_header("Content-Type", "text/event-stream")
+        self.set_header("Cache-Control", "no-cache")
+
+        queue = component_watcher.subscribe()
+        try:
+            self.write(": connected\n\n")
+            await self.flush()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+                    self.write(f"event: components\ndata: {json.dumps(event)}\n\n")
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream and notices closed connections
+                    self.write(": heartbeat\n\n")
+                await self.flush()
+        except StreamClosedError:
+            pass
+        finally:
+            component_watcher.unsubscribe(queue)
@@ -1,9 +1,18 @@
+import asyncio
 import json
 import os
 import pathlib
 import sys
 import ast
+import hashlib
+import io
+import tempfile
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from itertools import chain
+from multiprocessing import get_context
 import traceback
 
 import tornado
@@ -11,6 +20,7 @@ from jupyter_server.base.handlers import APIHandler
 import platform
 
 from .config import get_config
+from .._version import __version__
 
 DEFAULT_COMPONENTS_PATHS = [
     os.path.join(os.path.dirname(__file__), "..", "..", "xai_components"),
@@ -71,6 +81,14 @@ COLOR_PALETTE = [
 GROUP_GENERAL = "GENERAL"
 GROUP_ADVANCED = "ADVANCED"
 
+COMPONENT_INDEX_PATH = os.path.join(".xircuits", "component_index.json")
+
+# Starting worker processes only pays off once there is enough to parse
+PARALLEL_EXTRACT_THRESHOLD = 16
+
+def parse_bool_argument(value):
+    return value.lower() in ("1", "true", "yes", "on")
+
 def remove_prefix(input_str, prefix):
     prefix_len = len(prefix)
     if input_str[0:prefix_len] == prefix:
@@ -95,146 +113,468 @@ def read_orig_code(node: ast.AST, lines):
         return "\n".join(chain([start_line], between_lines, [end_line]))
 
 
-class ComponentsRouteHandler(APIHandler):
-    @tornado.web.authenticated
-    def get(self):
-        components = []
-        error_msg = ""
-        error_info = None
-        
-        for id, c in DEFAULT_COMPONENTS.items():
-            components.append({
-                "task": c["name"],
-                "header": GROUP_GENERAL,
-                "category": GROUP_GENERAL,
-                "variables": [],
-                "type": c["returnType"],
-                "color":c.get('color') or None    
-            })
+def extract_components(file_path, base_dir, python_path):
+    source = file_path.read_text()
+    lines = io.StringIO(source).readlines()
+
+    parse_tree = ast.parse(source, file_path)
+    # Look for top level class definitions that are decorated with "@xai_component"
+    is_xai_component = lambda node: isinstance(node, ast.ClassDef) and \
+                                    any((isinstance(decorator, ast.Call) and decorator.func.id == "xai_component") or \
+                                        (isinstance(decorator, ast.Name) and decorator.id == "xai_component")
+                                        for decorator in node.decorator_list)
+
+    return [extract_component(node, file_path.relative_to(base_dir), lines, python_path)
+            for node in parse_tree.body if is_xai_component(node)]
+
+def extract_component(node: ast.ClassDef, file_path, file_lines, python_path):
+    name = node.name
 
-        default_paths = set(pathlib.Path(p).expanduser().resolve() for p in sys.path)
+    keywords = {kw.arg: kw.value.value for kw in chain.from_iterable(decorator.keywords
+                    for decorator in node.decorator_list
+                    if isinstance(decorator, ast.Call) and decorator.func.id == "xai_component")}
 
-        visited_directories = []
-        for directory_string in self.get_component_directories():
-            if directory_string is not None:
-                directory = pathlib.Path(directory_string).absolute()
-                if directory.exists() \
-                        and directory.is_dir() \
-                        and not any(pathlib.Path.samefile(directory, d) for d in visited_directories):
-                    visited_directories.append(directory)
-                    python_files = directory.glob("xai_*/*.py")
+    # Group Name for Display
+    category = remove_prefix(file_path.parent.name, "xai_").upper()
 
-                    python_path = directory.expanduser().resolve()
+    is_arg = lambda n: isinstance(n, ast.AnnAssign) and \
+                                       isinstance(n.annotation, ast.Subscript) and \
+                                       n.annotation.value.id in ['InArg', 'InCompArg', 'OutArg']
 
-                    if python_path.parent in default_paths:
-                        python_path = None
+    is_flow_arg = lambda n: isinstance(n, ast.AnnAssign) and \
+                                        isinstance(n.annotation, ast.Name) and \
+                                        n.annotation.id in ['BaseComponent']
 
+    python_version = platform.python_version_tuple()
+
+    variables = []
+    for v in (node.body):
+        if is_flow_arg(v):
+            variables.append({
+                "name": v.target.id,
+                "kind": v.annotation.id,
+            })
+            continue
+        elif is_arg(v):
+            variables.append({
+                "name": v.target.id,
+                "kind": v.annotation.value.id,
+                "type": read_orig_code(v.annotation.slice.value if int(python_version[1]) == 8 else v.annotation.slice, file_lines)
+            })
+            continue
+
+    docstring = ast.get_docstring(node)
+    lineno = [
+        {
+            "lineno": node.lineno,
+            "end_lineno": node.end_lineno
+        }
+    ]
+
+    output = {
+        "class": name,
+        "package_name": ("xai_components." if python_path is None else "") + file_path.as_posix().replace("/", ".")[:-3],
+        "python_path": str(python_path) if python_path is not None else None,
+        "abs_file_path": os.path.join(str(python_path), str(file_path)) if python_path is not None else None,
+        "file_path": "xai_components/" + (file_path.as_posix()[:-3] + ".py" if platform.system() == "Windows" else str(file_path)),
+        "task": name,
+        "header": GROUP_ADVANCED,
+        "category": category,
+        "type": "library_component",
+        "variables": variables,
+        "docstring": docstring,
+        "lineno" : lineno
+    }
+    output.update(keywords)
+
+    return output
+
+
+def extract_library(library_files):
+    """
+    Extract the components of every file of one component library.
+    Runs in a worker process, so a file that fails to parse is reported
+    alongside the others instead of aborting the whole library.
+    """
+    results = []
+    for file_path, base_dir, python_path in library_files:
+        try:
+            results.append((extract_components(file_path, base_dir, python_path), None))
+        except Exception as e:
+            results.append((None, {
+                "type": type(e).__name__,
+                "filename": getattr(e, "filename", None) or str(file_path),
+                "lineno": getattr(e, "lineno", None) or 0,
+                "msg": getattr(e, "msg", None) or str(e),
+                "traceback": traceback.format_exc()
+            }))
+    return results
+
+
+_extract_pool = None
+
+
+def get_extract_pool():
+    global _extract_pool
+    if _extract_pool is None:
+        # Spawned rather than forked, the server process runs threads
+        _extract_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=get_context("spawn"))
+    return _extract_pool
+
+
+def shutdown_extract_pool():
+    global _extract_pool
+    if _extract_pool is not None:
+        _extract_pool.shutdown(wait=False, cancel_futures=True)
+        _extract_pool = None
+
+
+class ComponentIndex:
+    """
+    Components extracted from each component file, keyed by the file's path and
+    reused for as long as its modification time and size stay the same.
+    The index is kept in memory and persisted to `.xircuits/component_index.json`
+    so only changed files are parsed again, even after a server restart.
+    """
+
+    def __init__(self, cache_path=COMPONENT_INDEX_PATH):
+        self.cache_path = pathlib.Path(cache_path)
+        self.entries = None
+        self.dirty = False
+
+    def load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("version") == __version__ and stored.get("python") == list(sys.version_info[:2]):
+                self.entries = stored["entries"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def save(self):
+        if not self.dirty or not self.cache_path.parent.is_dir():
+            return
+        stored = {"version": __version__, "python": list(sys.version_info[:2]), "entries": self.entries}
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+        except OSError as e:
+            # The index is only an optimization, never fail the palette over it
+            print(f"Warning: could not write component index: {e}")
+
+    @staticmethod
+    def file_version(file_path):
+        stat = file_path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def fingerprint(self, component_files):
+        """
+        ETag for the palette built from `component_files`. It only changes
+        when a component file is added, removed or modified.
+        """
+        digest = hashlib.sha1(__version__.encode("utf-8"))
+        for file_path, base_dir, python_path, version in component_files:
+            digest.update(f"{file_path}|{base_dir}|{python_path}|{version[0]}|{version[1]}\n".encode("utf-8"))
+        return '"%s"' % digest.hexdigest()
+
+    def get_components(self, file_path, base_dir, python_path, version):
+        """
+        Components of an indexed file, or None if the file is not indexed
+        or has changed since it was.
+        """
+        self.load()
+        entry = self.entries.get(str(file_path))
+        if entry is not None \
+                and entry["version"] == version \
+                and entry["base_dir"] == str(base_dir) \
+                and entry["python_path"] == str(python_path):
+            return entry["components"]
+        return None
+
+    async def update(self, component_files, parallel=None):
+        """
+        Extract every file of `component_files` that is missing from the index,
+        one task per library directory. Libraries are spread over worker processes
+        when there is enough to parse. Returns the errors of the files that could
+        not be extracted, keyed by file path. Failed files are never indexed.
+        """
+        libraries = OrderedDict()
+        for file_path, base_dir, python_path, version in component_files:
+            if self.get_components(file_path, base_dir, python_path, version) is None:
+                libraries.setdefault(file_path.parent, []).append((file_path, base_dir, python_path, version))
+
+        if parallel is None:
+            parallel = len(libraries) > 1 \
+                and (os.cpu_count() or 1) > 1 \
+                and sum(len(files) for files in libraries.values()) >= PARALLEL_EXTRACT_THRESHOLD
+
+        tasks = [[(f, base_dir, python_path) for f, base_dir, python_path, _ in files] for files in libraries.values()]
+        results = None
+        if parallel:
+            loop = asyncio.get_running_loop()
+            try:
+                results = await asyncio.gather(*(loop.run_in_executor(get_extract_pool(), extract_library, task)
+                                                 for task in tasks))
+            except BrokenProcessPool:
+                shutdown_extract_pool()
+        if results is None:
+            results = [extract_library(task) for task in tasks]
+
+        # Merged in file order, whichever worker finished first
+        errors = {}
+        for files, library_results in zip(libraries.values(), results):
+            for (file_path, base_dir, python_path, version), (components, error) in zip(files, library_results):
+                if error is not None:
+                    errors[str(file_path)] = error
+                    continue
+                self.entries[str(file_path)] = {
+                    "version": version,
+                    "base_dir": str(base_dir),
+                    "python_path": str(python_path),
+                    "components": components
+                }
+                self.dirty = True
+        return errors
+
+    def find(self, component_files, header, task):
+        """
+        The indexed component with the given header and task, or None. Like the
+        palette, a component defined in several files is taken from the last one.
+        """
+        self.load()
+        for file_path, base_dir, python_path, version in reversed(component_files):
+            for c in reversed(self.get_components(file_path, base_dir, python_path, version) or []):
+                if c["header"] == header and c["task"] == task:
+                    return c
+        return None
+
+    def prune(self, component_files):
+        self.load()
+        current = set(str(f[0]) for f in component_files)
+        for key in [k for k in self.entries if k not in current]:
+            del self.entries[key]
+            self.dirty = True
+
+
+component_index = ComponentIndex()
+
+
+def get_component_directories():
+    paths = list(DEFAULT_COMPONENTS_PATHS)
+    paths.append(get_config().get("DEV", "BASE_PATH"))
+    return paths
+
+
+def list_component_files(directories):
+    """
+    Collect (file path, base dir, python path, file version) for every
+    component file in `directories` without reading them.
+    """
+    component_files = []
+    default_paths = set(pathlib.Path(p).expanduser().resolve() for p in sys.path)
+
+    visited_directories = []
+    for directory_string in directories:
+        if directory_string is not None:
+            directory = pathlib.Path(directory_string).absolute()
+            if directory.exists() \
+                    and directory.is_dir() \
+                    and not any(pathlib.Path.samefile(directory, d) for d in visited_directories):
+                visited_directories.append(directory)
+                python_files = directory.glob("xai_*/*.py")
+
+                python_path = directory.expanduser().resolve()
+
+                if python_path.parent in default_paths:
+                    python_path = None
+
+                for f in python_files:
+                    if f.name.startswith("."):
+                        continue
                     try:
-                        components.extend(chain.from_iterable(self.extract_components(f, directory, python_path) for f in python_files if not f.name.startswith(".")))
-                    except Exception as e:
-                        root = pathlib.Path(os.getcwd()).resolve()
-                        rel_path = pathlib.Path(e.filename).resolve().relative_to(root)
-                        full_path = str(rel_path)  
-                        error_info = {
-
-                            "file": os.path.relpath(e.filename, start=str(directory)) if e.filename else "unknown file",
-                            "line": e.lineno or 0,
-                            "message": f"SyntaxError: {e.msg}",
-                            "full_path": full_path
-                        }
-                        error_msg = traceback.format_exc()
-                        break
-                    
-        components = list({(c["header"], c["task"]): c for c in components}.values())
-
-        # Set up component colors according to palette
-        for idx, c in enumerate(components):
-            if c.get("color") is None:
-                c["color"] = COLOR_PALETTE[idx % len(COLOR_PALETTE)]
+                        version = ComponentIndex.file_version(f)
+                    except OSError:
+                        # Deleted while listing
+                        continue
+                    component_files.append((f, directory, python_path, version))
+    return component_files
+
+
+def format_extract_error(error, directory):
+    """
+    Palette error entry for an error returned by `extract_library`.
+    """
+    root = pathlib.Path(os.getcwd()).resolve()
+    return {
+        "file": os.path.relpath(error["filename"], start=str(directory)),
+        "line": error["lineno"],
+        "message": f"{error['type']}: {error['msg']}",
+        "full_path": os.path.relpath(pathlib.Path(error["filename"]).resolve(), start=str(root))
+    }
+
+
+def component_library(component):
+    """
+    Name of the library directory a component comes from, e.g. `xai_controlflow`.
+    """
+    file_path = component.get("file_path")
+    return pathlib.PurePosixPath(file_path).parent.name if file_path else None
+
+
+def default_components():
+    return [{
+        "task": c["name"],
+        "header": GROUP_GENERAL,
+        "category": GROUP_GENERAL,
+        "variables": [],
+        "type": c["returnType"],
+        "color": c.get('color') or None
+    } for c in DEFAULT_COMPONENTS.values()]
+
+
+def component_color(component):
+    """
+    Palette color of a component: the color it declares, otherwise one picked
+    from its header and task, so it is the same in the full palette, in its
+    details and in change events.
+    """
+    if component.get("color"):
+        return component["color"]
+    key = f"{component['header']}\n{component['task']}".encode("utf-8")
+    return COLOR_PALETTE[zlib.crc32(key) % len(COLOR_PALETTE)]
+
+
+def filter_components(components, category=None, library=None, search=None):
+    if category:
+        category = category.upper()
+        components = [c for c in components if c["category"].upper() == category]
+    if library:
+        library = "xai_" + remove_prefix(library.lower(), "xai_")
+        components = [c for c in components if (component_library(c) or "").lower() == library]
+    if search:
+        search = search.lower()
+        components = [c for c in components
+                      if search in c["task"].lower() or search in (c.get("docstring") or "").lower()]
+    return components
+
+
+class ComponentsRouteHandler(APIHandler):
+    """
+    The component palette. Without query arguments every component is returned
+    with all of its details. Large palettes can be narrowed down with:
+
+    - `category`, `library`: only components of that category or library directory
+    - `search`: only components whose name or docstring contains the text
+    - `offset`, `limit`: a page of the (filtered) palette, `total` gives its size
+    - `summary=true`: leave out the docstrings, see `components/detail`
+    """
+
+    @tornado.web.authenticated
+    async def get(self):
+        component_files = self.list_component_files()
+
+        # An unchanged set of component files gives an unchanged palette
+        self.set_header("Etag", component_index.fingerprint(component_files))
+        if self.check_etag_header():
+            self.set_status(304)
+            self.finish()
+            return
+
+        components, errors, error_msg = await self.build_palette(component_files)
+
+        # One broken file no longer hides the rest of the palette, the first error is still reported on its own
+        error_info = errors[0] if errors else None
 
         data = {"components": components,
                 "error_msg" : error_msg,        
-                "error_info": error_info}
+                "error_info": error_info,
+                "errors": errors}
+
+        filtered = filter_components(components,
+                                     category=self.get_query_argument("category", None),
+                                     library=self.get_query_argument("library", None),
+                                     search=self.get_query_argument("search", None))
+        offset = self.get_query_argument("offset", None)
+        limit = self.get_query_argument("limit", None)
+        if filtered is not components or offset is not None or limit is not None:
+            try:
+                offset = max(int(offset or 0), 0)
+                limit = int(limit) if limit is not None else None
+            except ValueError:
+                raise tornado.web.HTTPError(400, "offset and limit must be integers")
+            data["total"] = len(filtered)
+            data["offset"] = offset
+            data["limit"] = limit
+            filtered = filtered[offset:] if limit is None else filtered[offset:offset + max(limit, 0)]
+        if parse_bool_argument(self.get_query_argument("summary", "false")):
+            filtered = [{k: v for k, v in c.items() if k != "docstring"} for c in filtered]
+        data["components"] = filtered
 
         self.finish(json.dumps(data))
-        
-    def get_component_directories(self):
-        paths = list(DEFAULT_COMPONENTS_PATHS)
-        paths.append(get_config().get("DEV", "BASE_PATH"))
-        return paths
-
-    def extract_components(self, file_path, base_dir, python_path):
-        with open(file_path) as f:
-            lines = f.readlines()
-        
-        parse_tree = ast.parse(file_path.read_text(), file_path)
-        # Look for top level class definitions that are decorated with "@xai_component"
-        is_xai_component = lambda node: isinstance(node, ast.ClassDef) and \
-                                        any((isinstance(decorator, ast.Call) and decorator.func.id == "xai_component") or \
-                                            (isinstance(decorator, ast.Name) and decorator.id == "xai_component")
-                                            for decorator in node.decorator_list)
-
-        return [self.extract_component(node, file_path.relative_to(base_dir), lines, python_path)
-                for node in parse_tree.body if is_xai_component(node)]
-
-    def extract_component(self, node: ast.ClassDef, file_path, file_lines, python_path):
-        name = node.name
-
-        keywords = {kw.arg: kw.value.value for kw in chain.from_iterable(decorator.keywords
-                        for decorator in node.decorator_list
-                        if isinstance(decorator, ast.Call) and decorator.func.id == "xai_component")}
-
-        # Group Name for Display
-        category = remove_prefix(file_path.parent.name, "xai_").upper()
-
-        is_arg = lambda n: isinstance(n, ast.AnnAssign) and \
-                                           isinstance(n.annotation, ast.Subscript) and \
-                                           n.annotation.value.id in ['InArg', 'InCompArg', 'OutArg']
-
-        is_flow_arg = lambda n: isinstance(n, ast.AnnAssign) and \
-                                            isinstance(n.annotation, ast.Name) and \
-                                            n.annotation.id in ['BaseComponent']
-
-        python_version = platform.python_version_tuple()
-
-        variables = []
-        for v in (node.body):
-            if is_flow_arg(v):
-                variables.append({
-                    "name": v.target.id,
-                    "kind": v.annotation.id,
-                })
-                continue
-            elif is_arg(v):
-                variables.append({
-                    "name": v.target.id,
-                    "kind": v.annotation.value.id,
-                    "type": read_orig_code(v.annotation.slice.value if int(python_version[1]) == 8 else v.annotation.slice, file_lines)
-                })
+
+    async def build_palette(self, component_files):
+        """
+        Every component of `component_files` after the default components, with
+        their palette colors. Returns the components, the extraction errors
+        and their tracebacks.
+        """
+        components = default_components()
+        error_msg = ""
+
+        extract_errors = await component_index.update(component_files)
+
+        errors = []
+        for file_path, directory, python_path, version in component_files:
+            error = extract_errors.get(str(file_path))
+            if error is None:
+                components.extend(component_index.get_components(file_path, directory, python_path, version))
                 continue
+            errors.append(format_extract_error(error, directory))
+            error_msg += error["traceback"]
 
-        docstring = ast.get_docstring(node)
-        lineno = [
-            {
-                "lineno": node.lineno,
-                "end_lineno": node.end_lineno
-            }
-        ]
-
-        output = {
-            "class": name,
-            "package_name": ("xai_components." if python_path is None else "") + file_path.as_posix().replace("/", ".")[:-3],
-            "python_path": str(python_path) if python_path is not None else None,
-            "abs_file_path": os.path.join(str(python_path), str(file_path)) if python_path is not None else None,
-            "file_path": "xai_components/" + (file_path.as_posix()[:-3] + ".py" if platform.system() == "Windows" else str(file_path)),
-            "task": name,
-            "header": GROUP_ADVANCED,
-            "category": category,
-            "type": "library_component",
-            "variables": variables,
-            "docstring": docstring,
-            "lineno" : lineno
-        }
-        output.update(keywords)
+        component_index.prune(component_files)
+        component_index.save()
+
+        # Copies, so the palette colors do not leak into the index
+        components = list({(c["header"], c["task"]): dict(c, color=component_color(c)) for c in components}.values())
+
+        return components, errors, error_msg
 
-        return output
+    def list_component_files(self):
+        return list_component_files(self.get_component_directories())
+
+    def get_component_directories(self):
+        return get_component_directories()
+
+
+class ComponentDetailRouteHandler(APIHandler):
+    """
+    All details of one palette component, identified by its `task` and
+    `header`, for clients that loaded the palette in summary mode.
+    """
+
+    @tornado.web.authenticated
+    async def get(self):
+        task = self.get_query_argument("task")
+        header = self.get_query_argument("header", GROUP_ADVANCED)
+
+        component_files = list_component_files(get_component_directories())
+        self.set_header("Etag", component_index.fingerprint(component_files))
+        if self.check_etag_header():
+            self.set_status(304)
+            self.finish()
+            return
+
+        # Only extracts the files that changed since the index was last updated
+        await component_index.update(component_files)
+        component = component_index.find(component_files, header, task) \
+            or next((c for c in default_components() if c["header"] == header and c["task"] == task), None)
+        if component is None:
+            raise tornado.web.HTTPError(404, f"Component {header}/{task} not found")
+        self.finish(json.dumps(dict(component, color=component_color(component))))
@@ -0,0 +1,441 @@
+import atexit
+import hashlib
+import importlib
+import json
+import os
+import runpy
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import traceback
+from collections import deque
+from multiprocessing import resource_tracker
+from pathlib import Path
+
+from xircuits.utils.import_bench import component_modules
+
+# How the runner executes a workflow:
+# - fork: in a pre-forked child of the runner, which exits afterwards
+# - inprocess: in the runner itself, one workflow at a time
+RUNNER_MODES = ('fork', 'inprocess')
+
+# Messages are a length header and a JSON payload, file descriptors travel with the header
+_HEADER = struct.Struct('!I')
+
+
+def runner_supported():
+    # Passing the caller's terminal to the runner needs Unix sockets with file descriptor passing
+    return os.name == 'posix' and hasattr(socket, 'send_fds') and hasattr(os, 'fork')
+
+
+def runner_address(working_dir):
+    """
+    The socket the runner of a working directory listens on. Unix socket
+    paths are short, so deep working directories get one in the temp dir.
+    """
+    path = Path(working_dir) / ".xircuits" / "runner.sock"
+    if len(str(path)) < 100:
+        return str(path)
+    digest = hashlib.sha1(str(Path(working_dir).resolve()).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"xircuits-runner-{digest}.sock")
+
+
+def _send_message(sock, message, fds=()):
+    payload = json.dumps(message).encode("utf-8")
+    header = _HEADER.pack(len(payload))
+    if fds:
+        socket.send_fds(sock, [header], list(fds))
+    else:
+        sock.sendall(header)
+    sock.sendall(payload)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_message(sock, max_fds=0):
+    fds = []
+    if max_fds:
+        header, fds, _, _ = socket.recv_fds(sock, _HEADER.size, max_fds)
+        if not header:
+            raise ConnectionError("Connection closed")
+        header += _recv_exact(sock, _HEADER.size - len(header))
+    else:
+        header = _recv_exact(sock, _HEADER.size)
+    size, = _HEADER.unpack(header)
+    return json.loads(_recv_exact(sock, size)), fds
+
+
+def run_with_runner(working_dir, script, args):
+    """
+    Runs a compiled workflow on the runner of `working_dir`, with this
+    process's stdin, stdout and stderr, environment and working directory.
+    Ctrl+C interrupts the workflow. Returns the exit status, or None if no
+    runner is listening or it asks the caller to run the workflow itself.
+    """
+    if not runner_supported():
+        return None
+    address = runner_address(working_dir)
+    if not os.path.exists(address):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with sock:
+        try:
+            sock.connect(address)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            _send_message(sock, {
+                "script": os.path.abspath(script),
+                "args": list(args),
+                "cwd": os.getcwd(),
+                "env": dict(os.environ)
+            }, fds=(0, 1, 2))
+        except OSError:
+            return None
+
+        while True:
+            try:
+                reply, _ = _recv_message(sock)
+                break
+            except KeyboardInterrupt:
+                sock.sendall(b"\0")
+            except (ConnectionError, OSError):
+                print("The runner stopped before the workflow finished.", file=sys.stderr)
+                return 1
+    if reply.get("fallback"):
+        return None
+    return reply["status"]
+
+
+def _component_files_version(working_dir):
+    components_dir = Path(working_dir) / "xai_components"
+    version = []
+    for path in sorted(components_dir.glob("xai_*/*.py")):
+        try:
+            version.append((str(path), path.stat().st_mtime_ns))
+        except OSError:
+            continue
+    return version
+
+
+def _print_exception(e, script):
+    # Start the traceback at the script, as `python script.py` would
+    tb = e.__traceback__
+    while tb is not None and tb.tb_frame.f_code.co_filename != script:
+        tb = tb.tb_next
+    traceback.print_exception(type(e), e, tb or e.__traceback__)
+
+
+def _run_script(script):
+    try:
+        runpy.run_path(script, run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt as e:
+        _print_exception(e, script)
+        return 130
+    except BaseException as e:
+        _print_exception(e, script)
+        return 1
+
+
+def _watch_interrupts(conn, done):
+    # The caller sends a byte on Ctrl+C and hangs up when it goes away, either stops the workflow
+    try:
+        conn.recv(1)
+    except OSError:
+        return
+    if not done.is_set():
+        os.kill(os.getpid(), signal.SIGINT)
+
+
+def _reports_at_exit(env):
+    # Profiles and debug logs are written when the process exits, which the in-process runner never does
+    return bool(env.get("XIRCUITS_PROFILE")) or env.get("XIRCUITS_DEBUG") is not None
+
+
+def _prepare_job(request):
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    # What `python script.py` would have put on the path
+    python_path = [p for p in request["env"].get("PYTHONPATH", "").split(os.pathsep) if p and p not in sys.path]
+    sys.path[0:0] = [os.path.dirname(request["script"])] + python_path
+    sys.argv = [request["script"]] + request["args"]
+
+
+class WarmRunner:
+    """
+    Keeps an interpreter with the component libraries of a working directory
+    imported, and runs compiled workflows sent by `xircuits run` over a Unix
+    socket. Every workflow sees the caller's terminal, environment and
+    working directory.
+
+    In fork mode, `workers` children are forked ahead of time from the warm
+    interpreter. Each runs one workflow and exits, and the runner forks a
+    replacement, so runs never see each other's state. In inprocess mode
+    the runner runs the workflows itself, one at a time, which also keeps
+    the imports of the workflows warm. What a run set up for itself, such
+    as its worker pools, is released by `finish_run` once it finishes.
+    Profiled or debugged runs are handed back to the caller in that mode,
+    since their reports are written when the process exits.
+
+    When a component file changes, the runner hands the run back to the
+    caller and restarts itself, so it never runs outdated components.
+    """
+
+    def __init__(self, working_dir, mode='fork', workers=2, preload=True):
+        if mode not in RUNNER_MODES:
+            raise ValueError(f"Unknown runner mode {mode!r}, expected one of {', '.join(RUNNER_MODES)}")
+        self.working_dir = Path(working_dir).resolve()
+        self.address = runner_address(self.working_dir)
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.preload = preload
+        self._server = None
+        self._idle = deque()
+        self._version = None
+
+    def preload_components(self):
+        if str(self.working_dir) not in sys.path:
+            sys.path.insert(0, str(self.working_dir))
+        importlib.import_module("xai_components.base")
+        if not self.preload:
+            return
+        for module in component_modules(self.working_dir):
+            try:
+                importlib.import_module(module)
+            except Exception as e:
+                print(f"Warning: could not preload {module}: {e}")
+
+    def serve(self):
+        if not runner_supported():
+            raise RuntimeError("The warm runner needs a POSIX system with Unix sockets.")
+
+        self._listen()
+        self.preload_components()
+        self._version = _component_files_version(self.working_dir)
+        # Started by the first run that needed it, it would keep that caller's terminal open
+        resource_tracker.ensure_running()
+
+        def stop(signum, frame):
+            raise SystemExit(0)
+        signal.signal(signal.SIGTERM, stop)
+
+        print(f"Runner listening on {self.address} ({self.mode} mode)")
+        try:
+            while True:
+                # Fork only while holding no caller's descriptors, or the children would keep them open
+                while self.mode == 'fork' and len(self._idle) < self.workers:
+                    self._spawn_worker()
+                conn, _ = self._server.accept()
+                with conn:
+                    self._handle(conn)
+                self._reap_workers()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._close()
+
+    def _listen(self):
+        if os.path.exists(self.address):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.address)
+                raise RuntimeError(f"A runner is already listening on {self.address}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a runner that did not shut down cleanly
+                os.unlink(self.address)
+            finally:
+                probe.close()
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the user running the runner may connect to it
+        umask = os.umask(0o077)
+        try:
+            self._server.bind(self.address)
+        finally:
+            os.umask(umask)
+        self._server.listen()
+
+    def _close(self):
+        for pid, sock in self._idle:
+            sock.close()
+        self._idle.clear()
+        self._reap_workers()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+    def _handle(self, conn):
+        conn.settimeout(10)
+        try:
+            request, fds = _recv_message(conn, max_fds=3)
+        except (OSError, ValueError):
+            return
+        conn.settimeout(None)
+        outdated = _component_files_version(self.working_dir) != self._version
+        try:
+            if len(fds) != 3 or outdated or self.mode == 'inprocess' and _reports_at_exit(request["env"]):
+                _send_message(conn, {"fallback": True})
+            elif self.mode == 'fork':
+                if self._dispatch(request, fds, conn):
+                    print(f"Running {request['script']}")
+                else:
+                    _send_message(conn, {"fallback": True})
+            else:
+                print(f"Running {request['script']}")
+                _send_message(conn, {"status": self._run_in_process(request, fds, conn)})
+        except OSError:
+            # The caller went away
+            pass
+        finally:
+            for fd in fds:
+                os.close(fd)
+        if outdated:
+            print("Component files changed, restarting the runner")
+            conn.close()
+            self._restart()
+
+    def _restart(self):
+        self._close()
+        os.execv(sys.executable, [sys.executable, "-c", "from xircuits.start_xircuits import main; main()"]
+                 + sys.argv[1:])
+
+    def _spawn_worker(self):
+        parent_end, child_end = socket.socketpair()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                parent_end.close()
+                self._server.close()
+                for _, sock in self._idle:
+                    sock.close()
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                status = self._worker(child_end)
+            finally:
+                os._exit(status)
+        child_end.close()
+        self._idle.append((pid, parent_end))
+
+    def _worker(self, sock):
+        try:
+            request, fds = _recv_message(sock, max_fds=4)
+        except (OSError, ValueError):
+            # The runner shut down
+            return 0
+        sock.close()
+        stdio, conn = fds[:3], socket.socket(fileno=fds[3])
+        for target, fd in enumerate(stdio):
+            os.dup2(fd, target)
+            os.close(fd)
+        for stream in (sys.stdout, sys.stderr):
+            if hasattr(stream, "reconfigure"):
+                stream.reconfigure(line_buffering=os.isatty(stream.fileno()))
+        _prepare_job(request)
+
+        done = threading.Event()
+        threading.Thread(target=_watch_interrupts, args=(conn, done), daemon=True).start()
+        status = _run_script(request["script"])
+        done.set()
+        # The worker leaves through os._exit, so it runs what the interpreter runs on exit, e.g. writing
+        # a profile or flushing the debug log, itself and before the caller gets the status
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            _send_message(conn, {"status": status})
+        except OSError:
+            pass
+        return status
+
+    def _dispatch(self, request, fds, conn):
+        # Returns whether an idle worker took the request. Forking one here would leave
+        # the caller's descriptors open in it, so the caller runs the workflow instead
+        while self._idle:
+            pid, sock = self._idle.popleft()
+            try:
+                with sock:
+                    _send_message(sock, request, fds=list(fds) + [conn.fileno()])
+                return True
+            except OSError:
+                # The worker died while idle
+                continue
+        return False
+
+    def _run_in_process(self, request, fds, conn):
+        saved_fds = [os.dup(target) for target in range(3)]
+        saved_cwd = os.getcwd()
+        saved_env = dict(os.environ)
+        saved_path = list(sys.path)
+        saved_argv = list(sys.argv)
+        saved_modules = set(sys.modules)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+
+        done = threading.Event()
+        threading.Thread(target=_watch_interrupts, args=(conn, done), daemon=True).start()
+        try:
+            _prepare_job(request)
+            return _run_script(request["script"])
+        finally:
+            done.set()
+            # Compiled workflows do this themselves, unless they stopped before or were compiled without it
+            base = sys.modules.get("xai_components.base")
+            if base is not None and hasattr(base, "finish_run"):
+                try:
+                    base.finish_run()
+                except Exception as e:
+                    _print_exception(e, request["script"])
+            sys.stdout.flush()
+            sys.stderr.flush()
+            for target, fd in enumerate(saved_fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+            sys.path[:] = saved_path
+            sys.argv = saved_argv
+            # Libraries the run imported stay warm, but workflows and other project
+            # code are imported afresh by the next run, as they may have been recompiled
+            project_dirs = (str(self.working_dir) + os.sep, os.path.dirname(request["script"]) + os.sep)
+            for name in set(sys.modules) - saved_modules:
+                module_file = getattr(sys.modules[name], "__file__", None) or ""
+                if module_file.startswith(project_dirs) and "site-packages" not in module_file:
+                    del sys.modules[name]
+
+    def _reap_workers(self):
+        try:
+            while True:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+                if pid == 0:
+                    break
+        except ChildProcessError:
+            pass
@@ -1,11 +1,14 @@
 import argparse
 import json
 import os
+import sys
 from pathlib import Path
 
 from xircuits.utils.file_utils import is_empty, copy_from_installed_wheel
 from xircuits.utils.venv_ops import sync_xai_components
 from xircuits.utils.pathing import resolve_working_dir
+from xircuits.utils.import_bench import component_modules, bench_imports, over_budget, format_report
+from xircuits.runner import WarmRunner, RUNNER_MODES, run_with_runner
 
 from .library import list_component_library, install_library, fetch_library, uninstall_library
 from .library.index_config import refresh_index
@@ -15,6 +18,7 @@ from .compiler import compile, recursive_compile
 from xircuits.handlers.config import get_config
 
 from .compiler.validation import enforce_compulsory_ports
+from .compiler.generator import SCHEDULES
 
 def init_xircuits():
     """
@@ -126,17 +130,23 @@ def cmd_compile(args, extra_args=[]):
         recursive_compile(
             input_file_path=args.source_file,
             output_file_path=args.out_file,
-            component_python_paths=component_paths
+            component_python_paths=component_paths,
+            use_cache=args.use_cache,
+            max_workers=args.jobs,
+            schedule=args.schedule,
+            lazy_imports=args.lazy_imports
         )
     else:
         # Single file compilation
         if args.out_file:
             compile(args.source_file, args.out_file,
-                    component_python_paths=component_paths)
+                    component_python_paths=component_paths, use_cache=args.use_cache, schedule=args.schedule,
+                    lazy_imports=args.lazy_imports)
         else:
             output_filename = args.source_file.replace('.xircuits', '.py')
             compile(args.source_file, output_filename,
-                    component_python_paths=component_paths)
+                    component_python_paths=component_paths, use_cache=args.use_cache, schedule=args.schedule,
+                    lazy_imports=args.lazy_imports)
 
 
 def cmd_list_libraries(args, extra_args=[]):
@@ -188,10 +198,64 @@ def cmd_run(args, extra_args=[]):
     else:
         os.environ['PYTHONPATH'] = str(working_dir)
 
+    if getattr(args, "profile", None):
+        os.environ['XIRCUITS_PROFILE'] = str((original_cwd / args.profile).resolve())
+
+    if getattr(args, "lazy_imports", False):
+        os.environ['XIRCUITS_IMPORT_REPORT'] = '1'
+
+    # A warm runner started with `xircuits serve-runner` saves starting the interpreter and importing components.
+    # Profiles and debug logs belong to the process of one run, so those runs start their own.
+    if getattr(args, "use_runner", True) and not getattr(args, "profile", None) \
+            and os.getenv("XIRCUITS_DEBUG", None) is None:
+        if run_with_runner(working_dir, output_filename, extra_args) is not None:
+            return
+
     run_command = f"python {output_filename} {' '.join(extra_args)}"
     os.system(run_command)
 
 
+def cmd_serve_runner(args, extra_args=[]):
+    runner = WarmRunner(Path.cwd(), mode=args.mode, workers=args.workers, preload=args.preload)
+    try:
+        runner.serve()
+    except RuntimeError as e:
+        print(e)
+
+
+def _config_budget(option):
+    value = get_config().get('BENCH', option, fallback='').strip()
+    return float(value) if value else None
+
+
+def cmd_bench_imports(args, extra_args=[]):
+    working_dir = Path.cwd()
+    modules = args.modules or component_modules(working_dir)
+    if not modules:
+        print("No component modules found.")
+        return
+
+    budget_ms = args.budget_ms if args.budget_ms is not None else _config_budget('IMPORT_BUDGET_MS')
+    budget_mb = args.budget_mb if args.budget_mb is not None else _config_budget('IMPORT_BUDGET_MB')
+
+    print(f"Measuring the cold import of {len(modules)} component modules...")
+    results = bench_imports(modules, working_dir, repeat=args.repeat)
+    print(format_report(results, budget_ms, budget_mb, top=args.top))
+
+    if args.json_file:
+        with open(args.json_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    offenders = [r for r in results if over_budget(r, budget_ms, budget_mb)]
+    if offenders:
+        print(f"\n{len(offenders)} component modules exceed the import budget.")
+    failed = [r for r in results if r["error"] is not None]
+    if failed:
+        print(f"\n{len(failed)} component modules failed to import.")
+    if offenders or failed:
+        sys.exit(1)
+
+
 def main():
     print(
         '''
@@ -258,6 +322,17 @@ def main():
                                 help="JSON file mapping component names to python paths. e.g. {'MyComponent': '/some/path'}")
     compile_parser.add_argument('--non-recursive', action='store_false', dest='recursive', default=True,
                                 help='Do not recursively compile Xircuits workflow files.')
+    compile_parser.add_argument('--no-cache', action='store_false', dest='use_cache', default=True,
+                                help='Ignore the compile cache in .xircuits/ and always regenerate the workflow code.')
+    compile_parser.add_argument('--jobs', type=int, default=None,
+                                help='Number of processes used to compile nested workflows in parallel (default: CPU count).')
+    compile_parser.add_argument('--schedule', choices=SCHEDULES, default='dynamic',
+                                help='How the workflow runs its components. static runs the main chain as straight-line '
+                                     'code, which logs the steps itself, unless the run is debugged or profiled. dataflow '
+                                     'runs components that do not depend on each other concurrently (default: dynamic).')
+    compile_parser.add_argument('--lazy-imports', action='store_true', default=False,
+                                help='Import the component libraries of each workflow and nested workflow when it first '
+                                     'runs instead of when the workflow module is loaded.')
     compile_parser.set_defaults(func=cmd_compile)
 
     # 'list' command.
@@ -298,8 +373,61 @@ def main():
                             help="JSON file mapping component names to python paths. e.g. {'MyComponent': '/some/path'}")
     run_parser.add_argument('--non-recursive', action='store_false', dest='recursive', default=True,
                             help='Do not recursively compile Xircuits workflow files.')
+    run_parser.add_argument('--no-cache', action='store_false', dest='use_cache', default=True,
+                            help='Ignore the compile cache in .xircuits/ and always regenerate the workflow code.')
+    run_parser.add_argument('--jobs', type=int, default=None,
+                            help='Number of processes used to compile nested workflows in parallel (default: CPU count).')
+    run_parser.add_argument('--schedule', choices=SCHEDULES, default='dynamic',
+                            help='How the workflow runs its components. static runs the main chain as straight-line '
+                                 'code, which logs the steps itself, unless the run is debugged or profiled. dataflow '
+                                 'runs components that do not depend on each other concurrently (default: dynamic).')
+    run_parser.add_argument('--lazy-imports', action='store_true', default=False,
+                            help='Import the component libraries of each workflow and nested workflow when it first '
+                                 'runs, and report the import time of each library and the ones that were not needed.')
+    run_parser.add_argument('--profile', nargs='?', const='xircuits_profile.json', default=None, metavar='REPORT',
+                            help='Profile every component and write a report (.json or .csv) and a .folded flamegraph '
+                                 'file when the workflow exits (default: xircuits_profile.json).')
+    run_parser.add_argument('--no-runner', action='store_false', dest='use_runner', default=True,
+                            help='Start a new interpreter even if a runner started with `xircuits serve-runner` '
+                                 'is listening.')
     run_parser.set_defaults(func=cmd_run)
 
+    # 'serve-runner' command.
+    serve_runner_parser = subparsers.add_parser(
+        'serve-runner', help='Keep an interpreter with the component libraries imported and run the workflows '
+                             'of `xircuits run` in it.')
+    serve_runner_parser.add_argument('--mode', choices=RUNNER_MODES, default='fork',
+                                     help='fork runs every workflow in a pre-forked child, inprocess runs them one '
+                                          'at a time in the runner itself (default: fork).')
+    serve_runner_parser.add_argument('--workers', type=int, default=2,
+                                     help='Children forked ahead of time in fork mode (default: 2).')
+    serve_runner_parser.add_argument('--no-preload', action='store_false', dest='preload', default=True,
+                                     help='Do not import the component libraries when the runner starts.')
+    serve_runner_parser.set_defaults(func=cmd_serve_runner)
+
+    # 'bench' command.
+    bench_parser = subparsers.add_parser('bench', help='Benchmark Xircuits component libraries.')
+    bench_subparsers = bench_parser.add_subparsers(dest="bench_command", required=True)
+    bench_imports_parser = bench_subparsers.add_parser(
+        'imports', help='Measure the cold import time and memory of every component module in a fresh interpreter. '
+                        'Fails if a module cannot be imported or exceeds the budget.')
+    bench_imports_parser.add_argument('modules', nargs='*',
+                                      help='Component modules to measure, e.g. xai_components.xai_utils.utils '
+                                           '(default: every module in xai_components/xai_*).')
+    bench_imports_parser.add_argument('--repeat', type=int, default=3,
+                                      help='Fresh interpreters per module, the fastest import counts (default: 3).')
+    bench_imports_parser.add_argument('--top', type=int, default=None,
+                                      help='Only list the N slowest modules.')
+    bench_imports_parser.add_argument('--budget-ms', type=float, default=None,
+                                      help='Fail if a module takes longer to import (default: IMPORT_BUDGET_MS in the '
+                                           '[BENCH] section of .xircuits/config.ini).')
+    bench_imports_parser.add_argument('--budget-mb', type=float, default=None,
+                                      help='Fail if importing a module grows the memory in use by more (default: '
+                                           'IMPORT_BUDGET_MB in the [BENCH] section of .xircuits/config.ini).')
+    bench_imports_parser.add_argument('--json', dest='json_file', default=None, metavar='FILE',
+                                      help='Also write the measurements to a JSON file.')
+    bench_imports_parser.set_defaults(func=cmd_bench_imports)
+
     args, unknown_args = parser.parse_known_args()
 
     # For the 'run' command, capture the original working directory before any directory changes.
@@ -0,0 +1,111 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Runs in a fresh interpreter: imports one module and reports what it cost.
+# Memory is the resident set from /proc on Linux. Elsewhere it falls back to the
+# peak resident set (KiB on Linux, bytes on macOS), and is unavailable on Windows.
+# The peak is a last resort, since a child may keep its parent's peak across exec.
+_MEASURE_IMPORT = """
+import importlib, json, os, sys, time
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def memory():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+module = sys.argv[1]
+modules_before = len(sys.modules)
+memory_before = memory()
+started = time.perf_counter()
+importlib.import_module(module)
+seconds = time.perf_counter() - started
+memory_after = memory()
+print(json.dumps({
+    'seconds': seconds,
+    'memory': memory_after - memory_before if memory_before is not None else None,
+    'modules': len(sys.modules) - modules_before
+}))
+"""
+
+
+def component_modules(working_dir):
+    """
+    Dotted names of the component modules in the `xai_components` libraries
+    of a working directory, the same files the component palette lists.
+    """
+    components_dir = Path(working_dir) / "xai_components"
+    modules = []
+    for path in sorted(components_dir.glob("xai_*/*.py")):
+        if path.name.startswith(".") or path.name == "__init__.py":
+            continue
+        modules.append(f"xai_components.{path.parent.name}.{path.stem}")
+    return modules
+
+
+def measure_import(module, working_dir, repeat=3):
+    """
+    Imports `module` in `repeat` fresh interpreters started in `working_dir`
+    and keeps the fastest run, so the numbers reflect the import itself and
+    not a busy machine. Returns a dict with the seconds, the memory growth
+    in bytes (None where it cannot be measured), the number of modules the
+    import loaded and the error if the import failed.
+    """
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, "-c", _MEASURE_IMPORT, module],
+                                   cwd=working_dir, capture_output=True, text=True)
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()
+            return {"module": module, "seconds": None, "memory": None, "modules": None,
+                    "error": error[-1] if error else f"exit status {completed.returncode}"}
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return dict(best, module=module, error=None)
+
+
+def bench_imports(modules, working_dir, repeat=3):
+    """
+    Measures every module one after the other, so that the measurements do
+    not compete for the CPU, and ranks them from the slowest import down.
+    Failed imports come last.
+    """
+    results = [measure_import(module, working_dir, repeat) for module in modules]
+    results.sort(key=lambda r: (r["error"] is not None, -(r["seconds"] or 0)))
+    return results
+
+
+def over_budget(result, budget_ms=None, budget_mb=None):
+    if result["error"] is not None:
+        return False
+    if budget_ms is not None and result["seconds"] * 1000 > budget_ms:
+        return True
+    if budget_mb is not None and result["memory"] is not None and result["memory"] / 2 ** 20 > budget_mb:
+        return True
+    return False
+
+
+def format_report(results, budget_ms=None, budget_mb=None, top=None):
+    lines = [f"{'rank':>4} {'import (ms)':>12} {'memory (MB)':>12} {'modules':>8}  module"]
+    measured = [r for r in results if r["error"] is None]
+    for rank, result in enumerate(measured[:top] if top else measured, start=1):
+        memory = f"{result['memory'] / 2 ** 20:.1f}" if result["memory"] is not None else "n/a"
+        marker = "  over budget" if over_budget(result, budget_ms, budget_mb) else ""
+        lines.append(f"{rank:>4} {result['seconds'] * 1000:>12.1f} {memory:>12} {result['modules']:>8}  "
+                     f"{result['module']}{marker}")
+    for result in results:
+        if result["error"] is not None:
+            lines.append(f"{'':>4} {'failed':>12} {'':>12} {'':>8}  {result['module']}: {result['error']}")
+    return "\n".join(lines)